@@ -1,25 +1,43 @@
 import streamlit as st
-from sentence_transformers import SentenceTransformer
 import base64
 from streamlit_pdf_viewer import pdf_viewer
+from streamlit.runtime.scriptrunner import get_script_run_ctx
 
 import os 
 import re 
+import time
+import zipfile
+
+from assets import asset_bytes, pdf_thumbnails
+from blobs import get_blob_store
+from cache import cached_extract, cached_render, content_hash
+from dedupe import get_duplicate_index
+from jobs import PENDING, QueueFull, get_job_queue
+import metrics
+from response_cache import get_response_cache
+from skills import get_normalizer
+from talent_index import entry_from_formatted, get_talent_index
+from batch import TEMPLATES, format_batch, iter_zip_members
+from preprocess import prepare_resume_pages, prepare_resume_text
+from resume_schema import json_prompt, looks_like_json, parse_any, to_template_1_text, to_template_2_text
+from resume_schema import prompt as unified_prompt, project as project_resume
 
 try:
     from template_2 import (
-        extract_text_from_pdf as t2_extract_pdf,
+        iter_text_from_pdf as t2_iter_pdf,
         extract_text_from_docx as t2_extract_docx,
         prompt as t2_prompt,
-        call_portkey_api as t2_call_portkey,
+        stream_portkey_api as t2_stream_portkey,
         convert_to_docx as t2_convert_to_docx,
+        parse_portkey_text as t2_parse,
     )
     from template_1 import (
-        extract_text_from_pdf as t1_extract_pdf,
+        iter_text_from_pdf as t1_iter_pdf,
         extract_text_from_docx as t1_extract_docx,
         prompt as t1_prompt,
-        call_portkey_api as t1_call_portkey,
+        stream_portkey_api as t1_stream_portkey,
         convert_to_docx as t1_convert_to_docx,
+        parse_portkey_text as t1_parse,
     )
 except ImportError:
     st.error("Could not import from template_1.py or template_2.py. Make sure those files are in your GitHub repository.")
@@ -36,6 +54,452 @@ def clean_output_text(text):
     return text.strip()
 
 
+def completed_prefix(text):
+    """
+    Returns the part of a partially streamed response that is safe to preview:
+    whole lines before the first job block, then only jobs whose ---JOB END--- has arrived.
+    """
+    last_start = text.rfind("---JOB START---")
+    if last_start == -1:
+        return text[:text.rfind("\n") + 1]
+    last_end = text.rfind("---JOB END---")
+    if last_end > last_start:
+        return text[:last_end + len("---JOB END---")]
+    return text[:last_start]
+
+
+def preview_text(formatted_resume, template_id):
+    """Returns markdown for the preview; structured JSON output is shown in the template's tagged layout."""
+    if looks_like_json(formatted_resume):
+        resume = parse_any(formatted_resume)
+        formatted_resume = to_template_1_text(resume) if template_id == "T1" else to_template_2_text(resume)
+    return clean_output_text(formatted_resume)
+
+
+def session_id():
+    ctx = get_script_run_ctx()
+    return ctx.session_id if ctx is not None else None
+
+
+def blob_store():
+    return get_blob_store(st.secrets.get("BLOB_SPILL_DIR"), st.secrets.get("BLOB_MEMORY_MB"))
+
+
+def put_blob(name, value):
+    """
+    Keeps a large value (text or bytes) in the shared blob store and only a reference to it
+    in st.session_state[name]; identical values across sessions are stored once.
+    """
+    st.session_state[name] = blob_store().put(value, session=session_id()) if value else None
+
+
+def get_blob(name, default=""):
+    ref = st.session_state.get(name)
+    return default if ref is None else ref.value
+
+
+def structured_output_enabled():
+    """Structured (JSON) output replaces the tagged-text prompts when STRUCTURED_OUTPUT is set in secrets."""
+    return str(st.secrets.get("STRUCTURED_OUTPUT", "")).lower() in ("1", "true", "yes")
+
+
+def stream_to_preview(chunks, structured=False):
+    """Renders a streamed response into the preview as it arrives and returns the full text, or None on error."""
+    placeholder = st.empty()
+    parts = []
+    shown = ""
+    received = 0
+    try:
+        for chunk in chunks:
+            parts.append(chunk)
+            received += len(chunk)
+            if structured:
+                # Partial JSON cannot be rendered, so only report progress.
+                placeholder.caption(f"Receiving structured output... {received} characters")
+                continue
+            if "\n" not in chunk:
+                continue
+            preview = completed_prefix("".join(parts))
+            if preview != shown:
+                shown = preview
+                placeholder.markdown(clean_output_text(preview))
+    except Exception as e:
+        placeholder.empty()
+        st.error(f"Portkey API Error: {str(e)}. Check your Portkey credentials and base_url in Streamlit Secrets.")
+        return None
+    placeholder.empty()
+    return "".join(parts) or None
+
+
+PDF_MIME = "application/pdf"
+DOCX_MIME = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+
+
+def extract_resume_text(uploaded_file, iter_pdf_pages, extract_docx, tab):
+    """
+    Extracts text from an upload, reusing the cached result when the same bytes were seen before.
+    Returns (text, pages): PDFs are cached as their page texts, which prepare_prompt_input()
+    needs to find page furniture; pages is None for DOCX, which has no pages.
+    """
+    if uploaded_file.type == PDF_MIME:
+        pages = cached_extract(uploaded_file.getvalue(), "pdf-pages",
+                               lambda: extract_pdf_streaming(uploaded_file, iter_pdf_pages, tab))
+        return "\n".join(text for text in pages if text) + "\n", pages
+    if uploaded_file.type == DOCX_MIME:
+        return cached_extract(uploaded_file.getvalue(), "docx", lambda: extract_docx(uploaded_file)), None
+    return None, None
+
+
+def prompt_input_options():
+    return {
+        "api_key": st.secrets.get("PORTKEY_API_KEY"),
+        "base_url": st.secrets.get("PORTKEY_BASE_URL"),
+        "map_reduce_tokens": int(st.secrets.get("MAP_REDUCE_TOKENS", 0)),
+        "cache": get_response_cache(st.secrets.get("LLM_CACHE_PATH")),
+    }
+
+
+def remove_furniture_enabled():
+    """Running headers, footers and page numbers are dropped from PDFs when REMOVE_PAGE_FURNITURE is set in secrets."""
+    return str(st.secrets.get("REMOVE_PAGE_FURNITURE", "")).lower() in ("1", "true", "yes")
+
+
+def prompt_input_key(resume_text, paged):
+    """Identifies a prepared prompt input: the extracted text and every option that changes it."""
+    options = prompt_input_options()
+    return (content_hash(resume_text), paged, paged and remove_furniture_enabled(),
+            options["map_reduce_tokens"], options["base_url"])
+
+
+def store_prompt_input(tab, key, prepared, stats):
+    put_blob(f"prompt_input_{tab}", prepared)
+    st.session_state[f"prompt_input_key_{tab}"] = key
+    st.session_state[f"prompt_input_stats_{tab}"] = stats
+
+
+def extract_pdf_streaming(uploaded_file, iter_pdf_pages, tab):
+    """
+    Extracts a PDF page by page behind a progress bar and returns the page texts. Pages
+    flow straight into prepare_resume_pages(), so a long resume starts condensing while
+    later pages are still being read. That is the same computation prepare_prompt_input()
+    runs on the cached pages, so its result is stored for this tab under the same key.
+    """
+    progress = st.progress(0.0, text="Extracting resume text...")
+    pages = []
+
+    def tracked_pages():
+        for number, total, text in iter_pdf_pages(uploaded_file):
+            pages.append(text)
+            progress.progress(number / total, text=f"Extracted page {number} of {total}")
+            yield text
+
+    prepared, stats = prepare_resume_pages(tracked_pages(), remove_furniture=remove_furniture_enabled(),
+                                           **prompt_input_options())
+    progress.empty()
+    resume_text = "\n".join(text for text in pages if text) + "\n"
+    store_prompt_input(tab, prompt_input_key(resume_text, True), prepared, stats)
+    return pages
+
+
+def prepare_prompt_input(tab, resume_text, pages=None):
+    """
+    Compresses extracted text, and condenses very long resumes, before it goes into a prompt.
+    The result depends only on the text, the PDF pages it came from and the options, never
+    on whether extraction was cached; it is kept per tab. Returns (text, stats).
+    """
+    key = prompt_input_key(resume_text, pages is not None)
+    if st.session_state.get(f"prompt_input_key_{tab}") == key:
+        return get_blob(f"prompt_input_{tab}"), st.session_state[f"prompt_input_stats_{tab}"]
+    if pages is None:
+        prepared, stats = prepare_resume_text(resume_text, **prompt_input_options())
+    else:
+        prepared, stats = prepare_resume_pages(pages, remove_furniture=remove_furniture_enabled(),
+                                               **prompt_input_options())
+    store_prompt_input(tab, key, prepared, stats)
+    return prepared, stats
+
+
+def show_prompt_size(stats):
+    """Reports the size of the prompt input that the Format buttons send, as prepare_prompt_input() built it."""
+    how = "condensing long sections" if stats.get("map_reduce") else "removing repeated whitespace and boilerplate"
+    st.caption(f"Prompt input: {stats['tokens_before']} → {stats['tokens_after']} estimated tokens "
+               f"({stats['saved_ratio']:.0%} saved by {how})")
+
+
+def talent_index():
+    return get_talent_index(st.secrets.get("TALENT_INDEX_PATH"))
+
+
+def add_to_talent_search(candidate_id, file_name, formatted_resume, template_id):
+    """Indexes a formatted resume for the Talent Search tab when an index is configured."""
+    index = talent_index()
+    if index is None:
+        return
+    parse = t1_parse if template_id == "T1" else t2_parse
+    try:
+        index.add([entry_from_formatted(candidate_id, formatted_resume, parse, template=template_id, source=file_name)])
+    except Exception as e:
+        st.warning(f"The resume was formatted but could not be added to talent search: {e}")
+
+
+def duplicate_index():
+    return get_duplicate_index(st.secrets.get("DUPLICATE_INDEX_PATH"))
+
+
+def offer_duplicate(resume_text, template_id, candidate_id):
+    """Offers an earlier result when this resume nearly matches one formatted from another upload."""
+    index = duplicate_index()
+    if index is None:
+        return
+    match = index.find(resume_text, [template_id], exclude_candidate=candidate_id)
+    if match is None:
+        return
+    st.info(f"This resume is {match['similarity']:.0%} similar to {match['source']}, which was formatted before. "
+            "Reusing that result skips the LLM call.")
+    if st.button("Reuse Previous Result", key=f"reuse_duplicate_{template_id}"):
+        put_blob(f"formatted_resume_{template_id[1]}", match["results"][template_id])
+        st.session_state.both_templates_source = None
+
+
+def remember_for_duplicates(resume_text, results, candidate_id, file_name):
+    """Records formatted results ({template: text}) so near-duplicate uploads can reuse them."""
+    index = duplicate_index()
+    if index is None:
+        return
+    try:
+        index.add(resume_text, results, source=file_name, candidate_id=candidate_id)
+    except Exception as e:
+        st.warning(f"The resume was formatted but could not be recorded for duplicate detection: {e}")
+
+
+def apply_formatted(results, tab, resume_text, candidate_id, file_name, index=True):
+    """
+    Stores formatted results ({template: text}) for the template tabs and, with index, records
+    them for talent search and duplicate detection. tab is the tab ("1" or "2") that asked for them.
+    """
+    for template_id, formatted_resume in results.items():
+        put_blob(f"formatted_resume_{template_id[1]}", formatted_resume)
+    st.session_state.both_templates_source = tab if len(results) > 1 else None
+    if not index:
+        return
+    indexed_id = "T1" if "T1" in results else "T2"
+    add_to_talent_search(candidate_id, file_name, results[indexed_id], indexed_id)
+    remember_for_duplicates(resume_text, results, candidate_id, file_name)
+
+
+JOB_POLL_SECONDS = 1.0
+JOB_PUBLISH_SECONDS = 1.0
+
+
+def format_job_handler(api_key, base_url, cache):
+    """Returns the "format" job handler: one streamed LLM call, publishing the text received so far."""
+    def run(payload, update):
+        update(progress="Waiting for the model")
+        parts = []
+        published = time.monotonic()
+        for chunk in t1_stream_portkey(payload["prompt"], portkey_api_key=api_key, portkey_base_url=base_url,
+                                       cache=cache, refresh=payload["refresh"]):
+            parts.append(chunk)
+            if time.monotonic() - published >= JOB_PUBLISH_SECONDS:
+                update(progress="Receiving the formatted resume", partial="".join(parts))
+                published = time.monotonic()
+        formatted_resume = "".join(parts)
+        if not formatted_resume:
+            raise ValueError("Empty response from model")
+        if payload["template"] != "both":
+            return {payload["template"]: formatted_resume}
+        if payload["structured"]:
+            # Both renderers read the JSON document directly.
+            return {"T1": formatted_resume, "T2": formatted_resume}
+        return project_resume(formatted_resume)
+
+    return run
+
+
+def job_queue():
+    """The shared format job queue, or None when JOB_QUEUE_PATH is not set (formatting then runs inline)."""
+    queue = get_job_queue(st.secrets.get("JOB_QUEUE_PATH"), workers=st.secrets.get("JOB_WORKERS"),
+                          max_pending=st.secrets.get("JOB_MAX_PENDING"))
+    if queue is not None:
+        queue.register("format", format_job_handler(st.secrets.get("PORTKEY_API_KEY"), st.secrets.get("PORTKEY_BASE_URL"),
+                                                    get_response_cache(st.secrets.get("LLM_CACHE_PATH"))))
+    return queue
+
+
+def submit_format_job(queue, tab, template, prompt, refresh, structured, resume_text, uploaded_file):
+    """Queues a format job and keeps its id in the page URL, so a refresh resumes following it."""
+    payload = {"template": template, "tab": tab, "prompt": prompt, "refresh": refresh, "structured": structured,
+               "resume_text": resume_text, "candidate_id": content_hash(uploaded_file.getvalue()),
+               "file_name": uploaded_file.name}
+    try:
+        st.query_params[f"job_{tab}"] = queue.submit("format", payload)
+    except QueueFull as e:
+        st.warning(f"The formatting queue is full: {e}")
+
+
+@st.fragment(run_every=JOB_POLL_SECONDS)
+def show_job_progress(job_id, structured):
+    """Polls a running job without rerunning the page; a full rerun picks the result up."""
+    job = job_queue().get(job_id)
+    if job is None or job["status"] not in PENDING:
+        st.rerun()
+    if job["status"] == "queued":
+        st.info(f"Queued for formatting (position {job['position']}). Job id: {job_id}")
+        return
+    st.info(f"{job['progress'] or 'Formatting'}... Job id: {job_id}")
+    if job["partial"] and not structured:
+        st.markdown(clean_output_text(completed_prefix(job["partial"])))
+
+
+def follow_format_job(tab):
+    """
+    Shows progress of this tab's format job and applies its result once per session when it
+    finishes. Only the first session to apply a job adds it to talent search and duplicates.
+    """
+    job_id = st.query_params.get(f"job_{tab}")
+    queue = job_queue() if job_id else None
+    if queue is None:
+        return
+    job = queue.get(job_id)
+    if job is None:
+        st.warning("That formatting job has expired or could not be found.")
+        del st.query_params[f"job_{tab}"]
+        return
+    if job["status"] in PENDING:
+        show_job_progress(job_id, job["payload"]["structured"])
+        return
+    if st.session_state.get(f"applied_job_{tab}") == job_id:
+        return
+    st.session_state[f"applied_job_{tab}"] = job_id
+    if job["status"] == "failed":
+        st.error(f"Portkey API Error: {job['error']}. Check your Portkey credentials and base_url in Streamlit Secrets.")
+        return
+    payload = job["payload"]
+    apply_formatted(job["result"], tab, payload["resume_text"], payload["candidate_id"], payload["file_name"],
+                    index=queue.mark_applied(job_id))
+
+
+def format_both_templates(resume_text, prompt_input, refresh, source, uploaded_file):
+    """Runs one LLM call with the canonical prompt and fills the results of both templates."""
+    api_key = st.secrets.get("PORTKEY_API_KEY")
+    base_url = st.secrets.get("PORTKEY_BASE_URL")
+    structured = structured_output_enabled()
+    prompt = json_prompt(prompt_input) if structured else unified_prompt(prompt_input)
+    queue = job_queue()
+    if queue is not None:
+        submit_format_job(queue, source, "both", prompt, refresh, structured, resume_text, uploaded_file)
+        return
+    formatted_resume = stream_to_preview(t1_stream_portkey(prompt,
+                                                           portkey_api_key=api_key,
+                                                           portkey_base_url=base_url,
+                                                           cache=get_response_cache(st.secrets.get("LLM_CACHE_PATH")),
+                                                           refresh=refresh), structured=structured)
+    if formatted_resume:
+        # Structured output: both renderers read the JSON document directly.
+        results = {"T1": formatted_resume, "T2": formatted_resume} if structured else project_resume(formatted_resume)
+        apply_formatted(results, source, resume_text, content_hash(uploaded_file.getvalue()), uploaded_file.name)
+
+
+def other_template_download(template_id):
+    """Offers the other template's DOCX in this tab when both were produced from here."""
+    formatted_resume = get_blob(f"formatted_resume_{template_id[1]}")
+    if not formatted_resume:
+        return
+    convert = t1_convert_to_docx if template_id == "T1" else t2_convert_to_docx
+    file_buffer, candidate_name = cached_render(template_id, formatted_resume, convert, assets=TEMPLATES[template_id]["assets"])
+    file_name_safe = "".join(c for c in candidate_name if c.isalnum() or c in (' ', '_')).rstrip()
+    label = "Old Template" if template_id == "T1" else "New Template"
+    st.download_button(
+        f"Download {label} DOCX",
+        file_buffer,
+        f"{file_name_safe}_PRFT_Resume_{template_id}.docx",
+        mime=DOCX_MIME,
+        key=f"download_other_{template_id}"
+    )
+
+
+def show_sample_template(path, width, key):
+    """Shows the sample template as page thumbnails rendered once per process, not the full PDF."""
+    try:
+        st.image(pdf_thumbnails(path), width=width // 2)
+    except Exception:
+        pdf_viewer(asset_bytes(path), width=width, height=250, zoom_level=1.2, viewer_align="center",
+                   show_page_separator=True, key=key)
+
+
+def show_formatted_resume(template_id):
+    """Shows the preview and DOCX download of the formatted resume held for template_id."""
+    formatted_resume = get_blob(f"formatted_resume_{template_id[1]}")
+    if not formatted_resume:
+        return
+    convert = t1_convert_to_docx if template_id == "T1" else t2_convert_to_docx
+    cleaned_output = preview_text(formatted_resume, template_id)
+    file_buffer, candidate_name = cached_render(template_id, formatted_resume, convert, assets=TEMPLATES[template_id]["assets"])
+    file_size_kb = len(file_buffer) / 1024
+
+    st.subheader(" DOCX Content Preview (Structured Text)")
+    st.markdown(cleaned_output)
+
+    file_name_safe = "".join(c for c in candidate_name if c.isalnum() or c in (' ', '_')).rstrip()
+    dynamic_file_name = f"{file_name_safe}_PRFT_Resume_{template_id}.docx"
+
+    st.success(f"Document ready! File size: {file_size_kb:.2f} KB")
+
+    st.download_button(
+        "Download Final DOCX",
+        file_buffer,
+        dynamic_file_name,
+        mime=DOCX_MIME
+    )
+
+    if st.session_state.get("both_templates_source") == template_id[1]:
+        other_template_download("T2" if template_id == "T1" else "T1")
+
+
+def metrics_requested():
+    """Per-stage metrics are recorded, and shown in the sidebar, when METRICS is set in secrets."""
+    return str(st.secrets.get("METRICS", "")).lower() in ("1", "true", "yes")
+
+
+def show_blob_memory():
+    """Session payload memory: what this session references and what the shared blob store holds."""
+    store = blob_store()
+    mine = store.session_stats(session_id())
+    stats = store.stats()
+    kb = 1024
+    st.write(f"This session: {mine['bytes'] / kb:.1f} KB in {mine['blobs']} blobs "
+             f"({mine['shared_bytes'] / kb:.1f} KB shared with other sessions)")
+    st.write(f"All sessions ({stats['sessions']}): {stats['stored_bytes'] / kb:.1f} KB stored for "
+             f"{stats['logical_bytes'] / kb:.1f} KB referenced; {stats['memory_bytes'] / kb:.1f} KB in memory "
+             f"(budget {stats['max_memory_bytes'] / kb / kb:.0f} MB), {stats['spilled_bytes'] / kb:.1f} KB spilled to disk")
+
+
+def metrics_panel():
+    """Sidebar admin panel with per-stage latencies; exports the histograms as JSON or Prometheus text."""
+    if not metrics_requested():
+        return
+    with st.sidebar.expander("Pipeline metrics"):
+        snapshot = metrics.REGISTRY.snapshot()
+        if not snapshot["stages"]:
+            st.info("No stages recorded yet in this process.")
+        else:
+            st.dataframe([{"stage": row["stage"], **row["labels"], "count": row["count"],
+                           "mean ms": round(row["mean"] * 1000, 1), "p50 ms": round(row["p50"] * 1000, 1),
+                           "p95 ms": round(row["p95"] * 1000, 1)} for row in snapshot["stages"]],
+                         hide_index=True)
+        for counter in snapshot["counters"]:
+            labels = ", ".join(f"{name}={value}" for name, value in counter["labels"].items())
+            st.write(f"{counter['name']}{f' ({labels})' if labels else ''}: {counter['value']}")
+        st.download_button("Export JSON", metrics.export("json"), "talenttune_metrics.json",
+                           mime="application/json", key="metrics_json")
+        st.download_button("Export Prometheus", metrics.export("prometheus"), "talenttune_metrics.prom",
+                           mime="text/plain", key="metrics_prometheus")
+        show_blob_memory()
+        if st.button("Reset metrics", key="metrics_reset"):
+            metrics.REGISTRY.reset()
+            st.rerun()
+
+
 def display_user_guide():
     """Displays guidelines focusing on PII related to images."""
     st.markdown("---")
@@ -47,159 +511,230 @@ def display_user_guide():
 
 def template_1():
     st.write("Old Template Format:")
-    pdf_viewer(
-    "ui/sample_template-1.pdf",
-    width=750,
-    height=250,
-    zoom_level=1.2,
-    viewer_align="center",
-    show_page_separator=True,
-    key="pdf_viewer_t1"
-)
+    show_sample_template("ui/sample_template-1.pdf", width=750, key="pdf_viewer_t1")
     st.markdown("<h3 style='color: rgb(186, 43, 43);'> Format Resume to Company Template (Old)</h3>", unsafe_allow_html=True)
     uploaded_file = st.file_uploader("Upload Resume (PDF or DOCX)", type=["pdf", "docx"], key="formatter-1")
 
-    if "t1_resume_text" not in st.session_state: st.session_state.t1_resume_text = ""
 
     if uploaded_file:
         try:
             
-            if uploaded_file.type == "application/pdf":
-                resume_text = t1_extract_pdf(uploaded_file)
-            elif uploaded_file.type == "application/vnd.openxmlformats-officedocument.wordprocessingml.document":
-                resume_text = t1_extract_docx(uploaded_file)
-            else:
+            resume_text, pages = extract_resume_text(uploaded_file, t1_iter_pdf, t1_extract_docx, "1")
+            if resume_text is None:
                 st.error("Unsupported file type.")
                 return
-            st.session_state.t1_resume_text = resume_text
+            put_blob("t1_resume_text", resume_text)
 
             st.subheader("Extracted Resume Text")
             st.text_area("Resume Content (First 1000 Chars)", resume_text[:1000] + "..." if len(resume_text) > 1000 else resume_text, height=150, key="text_1")
+            prompt_input, stats = prepare_prompt_input("1", resume_text, pages)
+            show_prompt_size(stats)
 
-            if "formatted_resume_1" not in st.session_state:
-                st.session_state.formatted_resume_1 = ""
             
           
+            refresh = st.checkbox("Regenerate (ignore cached response)", key="refresh_1")
+            offer_duplicate(resume_text, "T1", content_hash(uploaded_file.getvalue()))
             if st.button("Format Resume", key="format_btn_1"):
                 with st.spinner("Formatting... (Template 1)"):
                     api_key = st.secrets.get("PORTKEY_API_KEY")
                     base_url = st.secrets.get("PORTKEY_BASE_URL")
-                    prompt = t1_prompt(st.session_state.t1_resume_text)
-                    
-                    formatted_resume = t1_call_portkey(prompt,
-                                                 portkey_api_key=api_key,
-                                                 portkey_base_url=base_url
-                                                                    ) 
-                    
-                    st.session_state.formatted_resume_1 = formatted_resume
-
-            if st.session_state.formatted_resume_1:
-                
-                cleaned_output = clean_output_text(st.session_state.formatted_resume_1)
-              
-                file_buffer, candidate_name = t1_convert_to_docx(st.session_state.formatted_resume_1)
-                file_size_kb = len(file_buffer.getvalue()) / 1024
-                
-                st.subheader(" DOCX Content Preview (Structured Text)")
-                st.markdown(cleaned_output)
-
-                file_name_safe = "".join(c for c in candidate_name if c.isalnum() or c in (' ', '_')).rstrip()
-                dynamic_file_name = f"{file_name_safe}_PRFT_Resume_T1.docx"
-                
-                st.success(f"Document ready! File size: {file_size_kb:.2f} KB")
-
-                st.download_button(
-                    "Download Final DOCX",
-                    file_buffer,
-                    dynamic_file_name,
-                    mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document"
-                )
-                
+                    structured = structured_output_enabled()
+                    prompt = json_prompt(prompt_input) if structured else t1_prompt(prompt_input)
+                    queue = job_queue()
+                    if queue is not None:
+                        submit_format_job(queue, "1", "T1", prompt, refresh, structured,
+                                          resume_text, uploaded_file)
+                    else:
+                        formatted_resume = stream_to_preview(t1_stream_portkey(prompt,
+                                                     portkey_api_key=api_key,
+                                                     portkey_base_url=base_url,
+                                                     cache=get_response_cache(st.secrets.get("LLM_CACHE_PATH")),
+                                                     refresh=refresh
+                                                                        ), structured=structured)
+                        # Keep the previous result if every retry failed instead of storing None.
+                        if formatted_resume:
+                            apply_formatted({"T1": formatted_resume}, "1", resume_text,
+                                            content_hash(uploaded_file.getvalue()), uploaded_file.name)
+
+            if st.button("Format for Both Templates", key="format_both_btn_1"):
+                with st.spinner("Formatting... (Both Templates)"):
+                    format_both_templates(resume_text, prompt_input, refresh, source="1", uploaded_file=uploaded_file)
+
+            follow_format_job("1")
+            show_formatted_resume("T1")
+
         except Exception as e:
             st.error(f"An error occurred in Template 1: {e}")
             st.warning("Ensure your API key is set in Streamlit secrets and your template_1.py file is correct.")
+    elif st.query_params.get("job_1"):
+        # The page was refreshed while a job was queued or running: keep following it.
+        follow_format_job("1")
+        show_formatted_resume("T1")
 
 
 def template_2():
     st.write("New Template Format:")
-    pdf_viewer(
-    "ui/sample_template-2.pdf",
-    width=700,
-    height=250,
-    zoom_level=1.2,
-    viewer_align="center",
-    show_page_separator=True,
-    key="pdf_viewer_t2"
-)
+    show_sample_template("ui/sample_template-2.pdf", width=700, key="pdf_viewer_t2")
     st.markdown("<h3 style='color: rgb(186, 43, 43);'> Format Resume to Company Template (New Template)</h3>", unsafe_allow_html=True)
     uploaded_file = st.file_uploader("Upload Resume (PDF or DOCX)", type=["pdf", "docx"], key="formatter-2")
 
     # Session state to store the extracted text needed for processing
-    if "t2_resume_text" not in st.session_state: st.session_state.t2_resume_text = ""
 
     if uploaded_file:
         try:
             # --- Text Extraction Logic ---
-            if uploaded_file.type == "application/pdf":
-                resume_text = t2_extract_pdf(uploaded_file)
-            elif uploaded_file.type == "application/vnd.openxmlformats-officedocument.wordprocessingml.document":
-                resume_text = t2_extract_docx(uploaded_file)
-            else:
+            resume_text, pages = extract_resume_text(uploaded_file, t2_iter_pdf, t2_extract_docx, "2")
+            if resume_text is None:
                 st.error("Unsupported file type.")
                 return
-            st.session_state.t2_resume_text = resume_text
+            put_blob("t2_resume_text", resume_text)
 
             st.subheader("Extracted Resume Text")
             st.text_area("Resume Content (First 1000 Chars)", resume_text[:1000] + "..." if len(resume_text) > 1000 else resume_text, height=150, key="text_2")
+            prompt_input, stats = prepare_prompt_input("2", resume_text, pages)
+            show_prompt_size(stats)
 
-            if "formatted_resume_2" not in st.session_state:
-                st.session_state.formatted_resume_2 = ""
 
             # --- Format Button (Removed regeneration logic) ---
+            refresh = st.checkbox("Regenerate (ignore cached response)", key="refresh_2")
+            offer_duplicate(resume_text, "T2", content_hash(uploaded_file.getvalue()))
             if st.button("Format Resume", key="format_btn_2"):
                 with st.spinner("Formatting... (Template 2)"):
                     api_key = st.secrets.get("PORTKEY_API_KEY")
                     base_url = st.secrets.get("PORTKEY_BASE_URL")
-                    prompt = t2_prompt(st.session_state.t2_resume_text)
-                    formatted_resume = t2_call_portkey(prompt,
-                                                 portkey_api_key=api_key,
-                                                 portkey_base_url=base_url
-                                                                    ) 
-                    st.session_state.formatted_resume_2 = formatted_resume
-
-            if st.session_state.formatted_resume_2:
-                
-                
-                cleaned_output = clean_output_text(st.session_state.formatted_resume_2)
-                
-               
-                file_buffer, candidate_name = t2_convert_to_docx(st.session_state.formatted_resume_2)
-                file_size_kb = len(file_buffer.getvalue()) / 1024
-
-              
-                st.subheader(" DOCX Content Preview (Structured Text)")
-                st.markdown(cleaned_output)
-
-                file_name_safe = "".join(c for c in candidate_name if c.isalnum() or c in (' ', '_')).rstrip()
-                dynamic_file_name = f"{file_name_safe}_PRFT_Resume_T2.docx"
-                
-                st.success(f" Document ready! File size: {file_size_kb:.2f} KB")
-
-                st.download_button(
-                    "Download Final DOCX",
-                    file_buffer,
-                    dynamic_file_name,
-                    mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document"
-                )
+                    structured = structured_output_enabled()
+                    prompt = json_prompt(prompt_input) if structured else t2_prompt(prompt_input)
+                    queue = job_queue()
+                    if queue is not None:
+                        submit_format_job(queue, "2", "T2", prompt, refresh, structured,
+                                          resume_text, uploaded_file)
+                    else:
+                        formatted_resume = stream_to_preview(t2_stream_portkey(prompt,
+                                                     portkey_api_key=api_key,
+                                                     portkey_base_url=base_url,
+                                                     cache=get_response_cache(st.secrets.get("LLM_CACHE_PATH")),
+                                                     refresh=refresh
+                                                                        ), structured=structured)
+                        # Keep the previous result if every retry failed instead of storing None.
+                        if formatted_resume:
+                            apply_formatted({"T2": formatted_resume}, "2", resume_text,
+                                            content_hash(uploaded_file.getvalue()), uploaded_file.name)
+
+            if st.button("Format for Both Templates", key="format_both_btn_2"):
+                with st.spinner("Formatting... (Both Templates)"):
+                    format_both_templates(resume_text, prompt_input, refresh, source="2", uploaded_file=uploaded_file)
+
+            follow_format_job("2")
+            show_formatted_resume("T2")
 
         except Exception as e:
             st.error(f"An error occurred in Template 2: {e}")
             st.warning("Make sure your PORTKEY_API_KEY is set in Streamlit secrets and your template_2.py file is correct.")
+    elif st.query_params.get("job_2"):
+        # The page was refreshed while a job was queued or running: keep following it.
+        follow_format_job("2")
+        show_formatted_resume("T2")
 
 
 
 
 
+def batch_mode():
+    st.markdown("<h3 style='color: rgb(186, 43, 43);'> Batch Format Resumes</h3>", unsafe_allow_html=True)
+    uploaded_files = st.file_uploader("Upload Resumes (PDF, DOCX or ZIP of resumes)", type=["pdf", "docx", "zip"],
+                                      accept_multiple_files=True, key="formatter-batch")
+    template_ids = st.multiselect("Templates", sorted(TEMPLATES), default=["T1"],
+                                  format_func=lambda t: "Old Template" if t == "T1" else "New Template",
+                                  key="batch_templates")
+    normalize_skills = st.checkbox("Normalize skills (adds skills.csv and skills_summary.csv to the ZIP)",
+                                   key="batch_skills")
+    reuse_duplicates = duplicate_index() is not None and st.checkbox(
+        "Reuse earlier results for near-duplicate resumes (see duplicate_of in the report)", key="batch_duplicates")
+
+    if "batch_report" not in st.session_state: st.session_state.batch_report = []
+
+    if uploaded_files and template_ids and st.button("Format All", key="format_btn_batch"):
+        files = []
+        for uploaded_file in uploaded_files:
+            if uploaded_file.name.lower().endswith(".zip"):
+                with zipfile.ZipFile(uploaded_file) as archive:
+                    files.extend(iter_zip_members(archive))
+            else:
+                files.append((uploaded_file.name, uploaded_file.getvalue()))
+
+        progress_bar = st.progress(0.0, text=f"Formatting {len(files)} resumes...")
+
+        def update_progress(done, total, message):
+            progress_bar.progress(done / total, text=message)
+
+        try:
+            zip_bytes, report = format_batch(
+                files,
+                template_ids=template_ids,
+                api_key=st.secrets.get("PORTKEY_API_KEY"),
+                base_url=st.secrets.get("PORTKEY_BASE_URL"),
+                llm_concurrency=int(st.secrets.get("BATCH_LLM_CONCURRENCY", 4)),
+                rate_limit_per_minute=int(st.secrets.get("BATCH_RATE_LIMIT", 0)),
+                cache=get_response_cache(st.secrets.get("LLM_CACHE_PATH")),
+                talent_index=talent_index(),
+                skill_normalizer=get_normalizer() if normalize_skills else None,
+                duplicate_index=duplicate_index() if reuse_duplicates else None,
+                progress=update_progress,
+            )
+            put_blob("batch_zip", zip_bytes)
+            st.session_state.batch_report = report
+        except Exception as e:
+            st.error(f"An error occurred in batch mode: {e}")
+
+    batch_zip = get_blob("batch_zip", None)
+    if batch_zip:
+        report = st.session_state.batch_report
+        succeeded = sum(1 for row in report if row["status"] == "ok")
+        st.success(f"{succeeded} of {len(report)} documents ready!")
+        st.dataframe(report, use_container_width=True)
+        st.download_button(
+            "Download All (ZIP)",
+            batch_zip,
+            "PRFT_Resumes.zip",
+            mime="application/zip"
+        )
+
+
+def talent_search():
+    st.markdown("<h3 style='color: rgb(186, 43, 43);'> Talent Search</h3>", unsafe_allow_html=True)
+    index = talent_index()
+    if index is None:
+        st.info("Talent search is not configured. Set TALENT_INDEX_PATH in Streamlit secrets to index formatted resumes.")
+        return
+
+    stats = index.stats()
+    st.caption(f"{stats['candidates']} candidates indexed ({stats['sections']} resume sections)")
+    job_description = st.text_area("Job Description", height=150, key="search_query")
+    top_k = st.slider("Candidates to show", 1, 50, 10, key="search_k")
+
+    if "search_results" not in st.session_state: st.session_state.search_results = []
+
+    if st.button("Search", key="search_btn") and job_description.strip():
+        try:
+            started = time.perf_counter()
+            st.session_state.search_results = index.search(job_description, k=top_k)
+            st.session_state.search_ms = (time.perf_counter() - started) * 1000
+        except Exception as e:
+            st.error(f"An error occurred in talent search: {e}")
+
+    results = st.session_state.search_results
+    if results:
+        st.caption(f"Top {len(results)} candidates in {st.session_state.get('search_ms', 0):.0f} ms")
+    for result in results:
+        with st.expander(f"{result['name']} — match {result['score']:.2f} ({result['source']})"):
+            st.markdown(f"**Best matching section:** {result['section']}")
+            st.text(result["text"])
+            if st.button("Remove from index", key=f"remove_{result['candidate_id']}"):
+                index.remove([result["candidate_id"]])
+                st.session_state.search_results = [r for r in results if r["candidate_id"] != result["candidate_id"]]
+                st.rerun()
+
+
 def main():
     
     
@@ -212,9 +747,12 @@ def main():
     unsafe_allow_html=True
 )
     
+    if metrics_requested():
+        metrics.enable()
+
     display_user_guide()
 
-    tab1, tab2 = st.tabs(["Old Template", "New Template"]) 
+    tab1, tab2, tab3, tab4 = st.tabs(["Old Template", "New Template", "Batch", "Talent Search"]) 
 
     with tab1:
         template_1()
@@ -222,6 +760,14 @@ def main():
     with tab2:
         template_2()
 
+    with tab3:
+        batch_mode()
+
+    with tab4:
+        talent_search()
+
+    metrics_panel()
+
     # Footer
     st.markdown("<hr style='margin-top: 50px;'>", unsafe_allow_html=True)
     st.markdown("<p style='text-align: center; color: grey;'>Powered by ModelMinds</p>", unsafe_allow_html=True)
@@ -0,0 +1,65 @@
+"""
+Static assets (template images, the template DOCX and the sample template PDFs) loaded
+once per process.
+
+Each file is read the first time it is needed and kept in memory under its asset
+version (mtime and size), so an edited file is picked up without a restart; only the
+current version of each file is kept. The sample
+PDFs are served as small pre-rendered PNG thumbnails rather than as full documents.
+pypdfium2 and Pillow are imported only when thumbnails are first rendered.
+"""
+import io
+import threading
+
+from cache import asset_version
+from resources import drop_resource, get_resource
+
+
+LOGO_PATH = "ui/logo.png"
+THUMBNAIL_WIDTH = 360
+
+# The asset version each cached entry was last built from, so it can be dropped once stale.
+_versions = {}
+_versions_lock = threading.Lock()
+
+
+def _read(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def _current(key, path, build):
+    """The resource under key for the current version of path; the one for the previous version is dropped."""
+    version = asset_version(path)
+    with _versions_lock:
+        previous = _versions.get(key)
+        _versions[key] = version
+    if previous is not None and previous != version:
+        drop_resource((*key, previous))
+    return get_resource((*key, version), build)
+
+
+def asset_bytes(path):
+    """The contents of path, read once per process and asset version."""
+    return _current(("asset", path), path, lambda: _read(path))
+
+
+def pdf_thumbnails(path, width=THUMBNAIL_WIDTH):
+    """PNG thumbnails, width pixels wide, of every page of the PDF at path; rendered once per version."""
+    def render():
+        import pypdfium2
+
+        document = pypdfium2.PdfDocument(asset_bytes(path))
+        try:
+            thumbnails = []
+            for page in document:
+                image = page.render(scale=width / page.get_width()).to_pil()
+                buffer = io.BytesIO()
+                image.save(buffer, format="PNG", optimize=True)
+                thumbnails.append(buffer.getvalue())
+                page.close()
+            return thumbnails
+        finally:
+            document.close()
+
+    return _current(("pdf_thumbnails", path, width), path, render)
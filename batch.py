@@ -0,0 +1,353 @@
+"""
+Batch formatting: converts many resumes to the company templates in one run.
+
+Extraction and DOCX rendering run in a process pool, LLM calls run on a bounded thread
+pool behind a rate limiter, and the three stages overlap so a slow model response never
+holds up parsing or rendering of other files.
+
+Headless usage (run from the repository root so template assets resolve):
+    python batch.py resumes/ more.zip cv.pdf -o formatted.zip --templates T1 T2
+"""
+import argparse
+import csv
+import importlib
+import io
+import os
+import sys
+import threading
+import time
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+
+import resume_schema
+from cache import content_hash, extraction_cache, render_cache, render_key
+from llm import complete
+from preprocess import compress
+from skills import skills_from_resume_data
+from talent_index import entry_from_resume_data
+
+
+SUPPORTED_EXTENSIONS = (".pdf", ".docx")
+
+TEMPLATES = {
+    "T1": {"module": "template_1", "assets": ("ui/logo.png",)},
+    "T2": {"module": "template_2", "assets": ("template_doc.docx",)},
+}
+
+REPORT_FIELDS = ["file", "template", "status", "output", "error", "seconds", "duplicate_of"]
+SKILL_FIELDS = ["file", "candidate", "skill", "canonical", "score"]
+
+
+class RateLimiter:
+    """Token bucket that allows at most per_minute acquisitions per rolling minute."""
+
+    def __init__(self, per_minute):
+        self.per_minute = per_minute
+        self._lock = threading.Lock()
+        self._tokens = float(per_minute or 0)
+        self._updated = time.monotonic()
+
+    def acquire(self):
+        if not self.per_minute:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.per_minute, self._tokens + (now - self._updated) * self.per_minute / 60.0)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait_seconds = (1 - self._tokens) * 60.0 / self.per_minute
+            time.sleep(wait_seconds)
+
+
+def iter_input_files(paths):
+    """Yields (name, bytes) for every PDF/DOCX in the given files, folders and ZIP archives."""
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, names in os.walk(path):
+                for name in sorted(names):
+                    yield from iter_input_files([os.path.join(root, name)])
+        elif path.lower().endswith(".zip"):
+            with zipfile.ZipFile(path) as archive:
+                yield from iter_zip_members(archive)
+        elif path.lower().endswith(SUPPORTED_EXTENSIONS):
+            with open(path, "rb") as f:
+                yield os.path.basename(path), f.read()
+
+
+def iter_zip_members(archive):
+    for info in archive.infolist():
+        name = os.path.basename(info.filename)
+        if info.is_dir() or name.startswith(".") or not name.lower().endswith(SUPPORTED_EXTENSIONS):
+            continue
+        yield name, archive.read(info)
+
+
+def _template_module(template_id):
+    return importlib.import_module(TEMPLATES[template_id]["module"])
+
+
+def _extract(name, data):
+    """Process-pool worker: extracts PII-cleaned text from one file."""
+    module = _template_module("T1")
+    if name.lower().endswith(".pdf"):
+        # Already inside a worker process: extract pages in-process rather than nesting pools.
+        return module.extract_text_from_pdf(io.BytesIO(data), workers=1)
+    return module.extract_text_from_docx(io.BytesIO(data))
+
+
+def _render(template_id, formatted_text):
+    """Process-pool worker: builds and serializes one DOCX."""
+    buffer, candidate_name = _template_module(template_id).convert_to_docx(formatted_text)
+    return buffer.getvalue(), candidate_name
+
+
+def output_file_name(candidate_name, template_id, taken):
+    file_name_safe = "".join(c for c in candidate_name if c.isalnum() or c in (' ', '_')).rstrip() or "Candidate"
+    file_name = f"{file_name_safe}_PRFT_Resume_{template_id}.docx"
+    counter = 2
+    while file_name in taken:
+        file_name = f"{file_name_safe} ({counter})_PRFT_Resume_{template_id}.docx"
+        counter += 1
+    taken.add(file_name)
+    return file_name
+
+
+def format_batch(files, template_ids=("T1",), api_key=None, base_url=None, process_workers=None,
+                 llm_concurrency=4, rate_limit_per_minute=0, cache=None, client=None, talent_index=None,
+                 skill_normalizer=None, duplicate_index=None, progress=None):
+    """
+    Formats every (name, bytes) pair in files into each requested template.
+    Returns (zip_bytes, report) where the ZIP holds the DOCX outputs plus report.csv and
+    report is a list of per-file, per-template status dicts.
+    When a TalentIndex is given, every formatted resume is added to it in one batch at the end.
+    When a SkillNormalizer is given, all extracted skills are normalized in one batch and the
+    ZIP also holds skills.csv (per resume) and skills_summary.csv (resumes per canonical skill).
+    When a DuplicateIndex is given, a resume that nearly matches one formatted before reuses
+    that result instead of calling the LLM (report.csv names the earlier file in duplicate_of),
+    and every newly formatted resume is recorded for later runs.
+    progress, if given, is called as progress(done, total, message) after each item finishes.
+    """
+    files = list(files)
+    total = len(files) * len(template_ids)
+    report = []
+    outputs = {}
+    taken = set()
+    started = {}
+    limiter = RateLimiter(rate_limit_per_minute)
+    index_entries = []
+    skill_rows = []
+    resume_texts = {}
+    duplicates = {}
+
+    def finish(index, template_id, status, output="", error=""):
+        name = files[index][0]
+        seconds = round(time.monotonic() - started[index], 3)
+        report.append({"file": name, "template": template_id, "status": status,
+                       "output": output, "error": error, "seconds": seconds,
+                       "duplicate_of": duplicates.get(index, "")})
+        if progress:
+            progress(len(report), total, f"{name} ({template_id}): {status}")
+
+    def call_llm(template_id, resume_text):
+        limiter.acquire()
+        module = _template_module(template_id)
+        return complete(module.prompt(compress(resume_text)[0]), api_key, base_url, client=client, cache=cache)
+
+    def call_llm_unified(resume_text):
+        # One canonical extraction projected into every template halves calls for dual output.
+        limiter.acquire()
+        formatted = complete(resume_schema.prompt(compress(resume_text)[0]), api_key, base_url, client=client, cache=cache)
+        return resume_schema.project(formatted) if formatted else None
+
+    def store_render(index, template_id, docx_bytes, candidate_name):
+        file_name = output_file_name(candidate_name, template_id, taken)
+        outputs[file_name] = docx_bytes
+        finish(index, template_id, "ok", output=file_name)
+
+    with ProcessPoolExecutor(max_workers=process_workers) as processes, \
+            ThreadPoolExecutor(max_workers=max(1, llm_concurrency)) as threads:
+        pending = {}
+
+        def submit_render(index, template_id, formatted_text):
+            key = render_key(template_id, formatted_text, TEMPLATES[template_id]["assets"])
+            cached = render_cache.get(key)
+            if cached is not None:
+                store_render(index, template_id, *cached)
+                return
+            future = processes.submit(_render, template_id, formatted_text)
+            pending[future] = ("render", index, template_id, key)
+
+        def formatted_done(index, template_id, result):
+            """Handles an LLM result: a template's text, or {template: text} when template_id is None."""
+            if not result:
+                for failed in (template_ids if template_id is None else (template_id,)):
+                    finish(index, failed, "llm failed", error="Empty response from model")
+                return
+            if duplicate_index is not None and index not in duplicates:
+                duplicate_index.add(resume_texts[index], result if template_id is None else {template_id: result},
+                                    source=files[index][0], candidate_id=content_hash(files[index][1]))
+            if talent_index is not None or skill_normalizer is not None:
+                parsed_id = template_id or template_ids[0]
+                formatted = result if template_id else result[parsed_id]
+                resume_data = _template_module(parsed_id).parse_portkey_text(formatted)
+                if talent_index is not None:
+                    index_entries.append(entry_from_resume_data(content_hash(files[index][1]), resume_data,
+                                                                template=parsed_id, source=files[index][0]))
+                if skill_normalizer is not None:
+                    candidate = (resume_data.get("FullName") or "").strip()
+                    skill_rows.extend({"file": files[index][0], "candidate": candidate, "skill": skill}
+                                      for skill in skills_from_resume_data(resume_data))
+            if template_id is None:
+                for projected_id in template_ids:
+                    submit_render(index, projected_id, result[projected_id])
+            else:
+                submit_render(index, template_id, result)
+
+        def submit_llm(index, resume_text):
+            if duplicate_index is not None:
+                resume_texts[index] = resume_text
+                match = duplicate_index.find(resume_text, template_ids)
+                if match is not None:
+                    duplicates[index] = match["source"]
+                    formatted_done(index, None, {template_id: match["results"][template_id]
+                                                 for template_id in template_ids})
+                    return
+            if len(template_ids) > 1:
+                future = threads.submit(call_llm_unified, resume_text)
+                pending[future] = ("llm", index, None, None)
+                return
+            for template_id in template_ids:
+                future = threads.submit(call_llm, template_id, resume_text)
+                pending[future] = ("llm", index, template_id, None)
+
+        for index, (name, data) in enumerate(files):
+            started[index] = time.monotonic()
+            kind = "pdf" if name.lower().endswith(".pdf") else "docx"
+            key = (kind, content_hash(data))
+            cached = extraction_cache.get(key)
+            if cached is not None:
+                submit_llm(index, cached)
+                continue
+            future = processes.submit(_extract, name, data)
+            pending[future] = ("extract", index, None, key)
+
+        while pending:
+            done, _ = wait(list(pending), return_when=FIRST_COMPLETED)
+            for future in done:
+                stage, index, template_id, key = pending.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    for failed in (template_ids if template_id is None else (template_id,)):
+                        finish(index, failed, f"{stage} failed", error=str(e))
+                    continue
+
+                if stage == "extract":
+                    extraction_cache.put(key, result)
+                    submit_llm(index, result)
+                elif stage == "llm":
+                    formatted_done(index, template_id, result)
+                else:
+                    render_cache.put(key, result)
+                    store_render(index, template_id, *result)
+
+    if index_entries:
+        talent_index.add(index_entries)
+    extra_files = {}
+    if skill_normalizer is not None:
+        extra_files = skill_files(skill_rows, skill_normalizer)
+    report.sort(key=lambda row: (row["file"], row["template"]))
+    return build_zip(outputs, report, extra_files), report
+
+
+def _csv(rows, fieldnames):
+    text = io.StringIO()
+    writer = csv.DictWriter(text, fieldnames=fieldnames)
+    writer.writeheader()
+    writer.writerows(rows)
+    return text.getvalue()
+
+
+def skill_files(skill_rows, skill_normalizer):
+    """Normalizes every collected skill in one call and renders the two skills CSVs."""
+    matches = skill_normalizer.normalize([row["skill"] for row in skill_rows])
+    resumes_per_skill = {}
+    for row, (canonical, score) in zip(skill_rows, matches):
+        row["canonical"] = canonical or ""
+        row["score"] = round(score, 3)
+        if canonical:
+            resumes_per_skill.setdefault(canonical, set()).add(row["file"])
+    summary = sorted(({"canonical": canonical, "resumes": len(names)} for canonical, names in resumes_per_skill.items()),
+                     key=lambda row: (-row["resumes"], row["canonical"]))
+    return {"skills.csv": _csv(skill_rows, SKILL_FIELDS),
+            "skills_summary.csv": _csv(summary, ["canonical", "resumes"])}
+
+
+def build_zip(outputs, report, extra_files=None):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        for file_name, docx_bytes in outputs.items():
+            archive.writestr(file_name, docx_bytes)
+        archive.writestr("report.csv", _csv(report, REPORT_FIELDS))
+        for file_name, content in (extra_files or {}).items():
+            archive.writestr(file_name, content)
+    return buffer.getvalue()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Format a batch of resumes into the company templates.")
+    parser.add_argument("inputs", nargs="+", help="PDF/DOCX files, folders or ZIP archives")
+    parser.add_argument("-o", "--output", default="formatted_resumes.zip", help="output ZIP path")
+    parser.add_argument("--templates", nargs="+", choices=sorted(TEMPLATES), default=["T1"])
+    parser.add_argument("--workers", type=int, default=None, help="process pool size for extraction and rendering")
+    parser.add_argument("--concurrency", type=int, default=4, help="maximum LLM calls in flight")
+    parser.add_argument("--rate-limit", type=int, default=0, help="maximum LLM calls per minute (0 = unlimited)")
+    parser.add_argument("--skills", action="store_true", help="normalize skills and add skills CSVs to the ZIP")
+    parser.add_argument("--reuse-duplicates", action="store_true",
+                        help="reuse earlier results for near-duplicate resumes (needs TALENTTUNE_DUPLICATE_INDEX)")
+    parser.add_argument("--metrics", metavar="PATH",
+                        help="record per-stage timings and write them to PATH (Prometheus text for .prom, else JSON)")
+    args = parser.parse_args(argv)
+
+    import metrics
+    from dedupe import get_duplicate_index
+    from response_cache import get_response_cache
+    from skills import get_normalizer
+    from talent_index import get_talent_index
+
+    if args.metrics:
+        metrics.enable()
+
+    def print_progress(done, total, message):
+        print(f"[{done}/{total}] {message}", file=sys.stderr)
+
+    zip_bytes, report = format_batch(
+        iter_input_files(args.inputs),
+        template_ids=args.templates,
+        api_key=os.environ.get("PORTKEY_API_KEY"),
+        base_url=os.environ.get("PORTKEY_BASE_URL"),
+        process_workers=args.workers,
+        llm_concurrency=args.concurrency,
+        rate_limit_per_minute=args.rate_limit,
+        cache=get_response_cache(),
+        talent_index=get_talent_index(),
+        skill_normalizer=get_normalizer() if args.skills else None,
+        duplicate_index=get_duplicate_index() if args.reuse_duplicates else None,
+        progress=print_progress,
+    )
+    with open(args.output, "wb") as f:
+        f.write(zip_bytes)
+    if args.metrics:
+        with open(args.metrics, "w") as f:
+            f.write(metrics.export("prometheus" if args.metrics.endswith(".prom") else "json"))
+
+    failed = [row for row in report if row["status"] != "ok"]
+    print(f"Wrote {len(report) - len(failed)} documents to {args.output} ({len(failed)} failed).")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,88 @@
+"""
+DOCX ingestion: the original python-docx extraction (body paragraphs only) against the
+streaming docx_extract engine, on large synthetic CVs or real files. Reports time, peak
+Python heap, characters extracted and how many skills-table rows made it into the text.
+
+    python -m benchmarks.bench_docx_extract                      # 300-job CV with a 100-row skills table
+    python -m benchmarks.bench_docx_extract --jobs 1000 --table-rows 400
+    python -m benchmarks.bench_docx_extract --docx cv1.docx cv2.docx
+
+Peak KiB is the Python heap (tracemalloc). The lxml tree python-docx builds lives outside
+it, so the original's real footprint is larger than shown.
+"""
+import argparse
+import io
+import random
+import statistics
+import time
+import tracemalloc
+
+import docx
+
+import docx_extract
+from benchmarks.synthetic import resume_docx, synthetic_resume
+
+
+def original_extract(data):
+    """extract_text_from_docx as it was before docx_extract, without the PII pass."""
+    doc = docx.Document(io.BytesIO(data))
+    return "\n".join([para.text for para in doc.paragraphs])
+
+
+def streaming_extract(data):
+    return docx_extract.extract_text(io.BytesIO(data))
+
+
+def measure(extract, data, repeats):
+    times = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        text = extract(data)
+        times.append(time.perf_counter() - started)
+    tracemalloc.start()
+    try:
+        extract(data)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return text, {"median_ms": round(statistics.median(times) * 1000, 1), "peak_kib": round(peak / 1024),
+                  "chars": len(text)}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().split("\n")[0])
+    parser.add_argument("--docx", nargs="+", help="real DOCX files instead of a synthetic CV")
+    parser.add_argument("--jobs", type=int, default=300)
+    parser.add_argument("--table-rows", type=int, default=100)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args(argv)
+
+    if args.docx:
+        documents = []
+        for path in args.docx:
+            with open(path, "rb") as f:
+                documents.append((path, f.read(), []))
+    else:
+        rng = random.Random(args.seed)
+        resume = synthetic_resume(rng, jobs=args.jobs, table_rows=args.table_rows)
+        documents = [(f"synthetic ({args.jobs} jobs, {args.table_rows} table rows)", resume_docx(resume, rng),
+                      [category for category, _ in resume.technologies])]
+
+    results = {}
+    print(f"{'document':<44}{'engine':<12}{'ms':>9}{'peak KiB':>10}{'chars':>9}{'table rows':>12}")
+    for name, data, table_keys in documents:
+        print(f"{name[:43]:<44}{len(data) / 1024:.0f} KiB DOCX")
+        for engine, extract in (("python-docx", original_extract), ("streaming", streaming_extract)):
+            text, row = measure(extract, data, args.repeats)
+            lines = set(text.split("\n"))
+            row["table_rows"] = sum(any(line.startswith(key + docx_extract.CELL_SEPARATOR) for line in lines)
+                                    for key in table_keys)
+            results[(name, engine)] = row
+            found = f"{row['table_rows']}/{len(table_keys)}" if table_keys else "-"
+            print(f"{'':<44}{engine:<12}{row['median_ms']:>9.1f}{row['peak_kib']:>10}{row['chars']:>9}{found:>12}")
+    return results
+
+
+if __name__ == "__main__":
+    main()
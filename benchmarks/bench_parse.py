@@ -0,0 +1,117 @@
+"""
+Compares the tagged-text parsers with the structured JSON path: parse cost per document
+and failure rate (documents whose parsed fields disagree with the source resume).
+
+    python -m benchmarks.bench_parse                  # synthetic corpus
+    python -m benchmarks.bench_parse --corpus outputs/ # real *.txt / *.json LLM outputs
+
+On a real corpus there is no ground truth, so a document counts as failed when parsing
+raises or yields no candidate name or no jobs.
+"""
+import argparse
+import json
+import os
+import random
+import time
+
+import resume_schema
+import template_1
+import template_2
+from benchmarks.synthetic import raw_template_2_text, synthetic_resume
+
+
+def _strip(resp):
+    return resp.lstrip("- ").strip()
+
+
+def check_template_1(data, resume):
+    jobs = data.get("Jobs", [])
+    return (data.get("FullName") == resume.full_name and len(jobs) == len(resume.jobs)
+            and all(j.get("Description") == src.description
+                    and [_strip(r) for r in j.get("Responsibilities", []) if r.strip()] == src.responsibilities
+                    for j, src in zip(jobs, resume.jobs)))
+
+
+def check_template_2(data, resume):
+    jobs = data.get("Jobs", [])
+    rows = [row for row in data.get("KeyEngagementsTable", "").strip().split("\n")[1:] if row.strip()]
+    return (data.get("FullName") == resume.full_name and len(jobs) == len(resume.jobs)
+            and len(rows) == len(resume.jobs)
+            and all([_strip(r) for r in j.get("Responsibilities", []) if r.strip()] == src.responsibilities
+                    for j, src in zip(jobs, resume.jobs)))
+
+
+def check_schema(parsed, resume):
+    return parsed == resume
+
+
+def run_case(name, documents, parse, check):
+    failures = 0
+    started = time.perf_counter()
+    results = []
+    for text, _ in documents:
+        try:
+            results.append(parse(text))
+        except Exception:
+            results.append(None)
+    elapsed = time.perf_counter() - started
+    for result, (_, truth) in zip(results, documents):
+        if result is None or not check(result, truth):
+            failures += 1
+    return {"case": name, "documents": len(documents),
+            "us_per_doc": round(elapsed / max(len(documents), 1) * 1e6, 1),
+            "failure_rate": round(failures / max(len(documents), 1), 4)}
+
+
+def synthetic_cases(count, seed):
+    rng = random.Random(seed)
+    resumes = [synthetic_resume(rng) for _ in range(count)]
+    t1_docs = [(resume_schema.to_template_1_text(r), r) for r in resumes]
+    t2_docs = [(raw_template_2_text(r), r) for r in resumes]
+    json_docs = [(json.dumps(resume_schema.to_dict(r)), r) for r in resumes]
+    canonical_docs = [(resume_schema.to_template_1_text(r), r) for r in resumes]
+    return [
+        run_case("template_1 tagged", t1_docs, template_1.parse_portkey_text, check_template_1),
+        run_case("template_2 tagged", t2_docs, template_2.parse_portkey_text, check_template_2),
+        run_case("template_1 json", json_docs, template_1.parse_portkey_text, check_template_1),
+        run_case("template_2 json", json_docs, template_2.parse_portkey_text, check_template_2),
+        run_case("schema json", json_docs, resume_schema.parse_json, check_schema),
+        run_case("schema tagged (t1 layout)", canonical_docs, resume_schema.parse_any,
+                 lambda parsed, truth: parsed.full_name == truth.full_name and len(parsed.jobs) == len(truth.jobs)),
+    ]
+
+
+def corpus_cases(directory):
+    documents = []
+    for name in sorted(os.listdir(directory)):
+        if name.endswith((".txt", ".json")):
+            with open(os.path.join(directory, name), encoding="utf-8") as f:
+                documents.append((f.read(), None))
+
+    def usable_1(data, _):
+        return bool(data.get("FullName")) and bool(data.get("Jobs"))
+
+    return [
+        run_case("template_1", documents, template_1.parse_portkey_text, usable_1),
+        run_case("template_2", documents, template_2.parse_portkey_text, usable_1),
+        run_case("schema", documents, resume_schema.parse_any,
+                 lambda parsed, _: bool(parsed.full_name) and bool(parsed.jobs)),
+    ]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().split("\n")[0])
+    parser.add_argument("--corpus", help="directory of real LLM outputs (*.txt tagged, *.json structured)")
+    parser.add_argument("--count", type=int, default=500, help="synthetic documents per case")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args(argv)
+
+    results = corpus_cases(args.corpus) if args.corpus else synthetic_cases(args.count, args.seed)
+    print(f"{'case':<28}{'docs':>6}{'us/doc':>10}{'failure':>10}")
+    for row in results:
+        print(f"{row['case']:<28}{row['documents']:>6}{row['us_per_doc']:>10}{row['failure_rate']:>10.2%}")
+    return results
+
+
+if __name__ == "__main__":
+    main()
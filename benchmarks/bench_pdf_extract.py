@@ -0,0 +1,83 @@
+"""
+Per-page PDF extraction throughput for each backend, sequential and page-parallel.
+
+    python -m benchmarks.bench_pdf_extract                         # ui/sample_template-2.pdf repeated to 40 pages
+    python -m benchmarks.bench_pdf_extract --pdf cv.pdf --pages 0  # a real PDF as-is
+
+The original loop (pdfplumber, text += page_text) is included as the baseline, and the
+parallel output is checked against the sequential output of the same backend.
+"""
+import argparse
+import io
+import time
+
+import pdfplumber
+import pypdfium2 as pdfium
+
+import pdf_extract
+
+
+def original_extract(data):
+    text = ""
+    with pdfplumber.open(io.BytesIO(data)) as pdf:
+        for page in pdf.pages:
+            page_text = page.extract_text()
+            if page_text:
+                text += page_text + "\n"
+    return text
+
+
+def repeat_pages(data, pages):
+    """Builds a PDF of `pages` pages by cycling through the pages of data."""
+    source = pdfium.PdfDocument(data)
+    target = pdfium.PdfDocument.new()
+    while len(target) < pages:
+        count = min(len(source), pages - len(target))
+        target.import_pages(source, list(range(count)))
+    buffer = io.BytesIO()
+    target.save(buffer)
+    return buffer.getvalue()
+
+
+def timed(fn, repeats):
+    started = time.perf_counter()
+    for _ in range(repeats):
+        result = fn()
+    return result, (time.perf_counter() - started) / repeats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().split("\n")[0])
+    parser.add_argument("--pdf", default="ui/sample_template-2.pdf")
+    parser.add_argument("--pages", type=int, default=40, help="repeat the PDF's pages up to this count (0 = as-is)")
+    parser.add_argument("--workers", type=int, default=pdf_extract.WORKERS)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    with open(args.pdf, "rb") as f:
+        data = f.read()
+    if args.pages:
+        data = repeat_pages(data, args.pages)
+    pages = pdf_extract.page_count(data)
+    print(f"{args.pdf}: {pages} pages, {args.workers} workers")
+
+    # Start the worker processes up front so pool start-up is not charged to the first case.
+    pdf_extract.extract_pages(data, "pdfium", workers=args.workers)
+
+    rows = []
+    _, seconds = timed(lambda: original_extract(data), args.repeats)
+    rows.append(("original loop", seconds, ""))
+    for backend in pdf_extract.BACKENDS:
+        sequential, seconds = timed(lambda: pdf_extract.extract_pages(data, backend, workers=1), args.repeats)
+        rows.append((f"{backend} sequential", seconds, ""))
+        parallel, seconds = timed(lambda: pdf_extract.extract_pages(data, backend, workers=args.workers), args.repeats)
+        rows.append((f"{backend} parallel", seconds, "identical" if parallel == sequential else "MISMATCH"))
+
+    print(f"{'case':<24}{'ms':>10}{'pages/s':>10}  output")
+    for name, seconds, note in rows:
+        print(f"{name:<24}{seconds * 1000:>10.1f}{pages / seconds:>10.1f}  {note}")
+    return rows
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Measures prompt preprocessing: compression latency and estimated token savings per
+fixture, and optionally end-to-end LLM latency with and without preprocessing. PDFs and
+synthetic resumes are compressed page by page, so page furniture removal is included.
+
+    python -m benchmarks.bench_preprocess                     # bundled sample PDFs + synthetic resumes
+    python -m benchmarks.bench_preprocess --fixtures resumes/  # your own PDF/DOCX/TXT files
+    python -m benchmarks.bench_preprocess --live              # also time real calls (needs PORTKEY_API_KEY)
+"""
+import argparse
+import glob
+import os
+import random
+import time
+
+import pdf_extract
+import template_1
+from benchmarks.synthetic import synthetic_resume
+from llm import complete
+from preprocess import compress
+from resume_schema import to_template_1_text
+
+SAMPLE_PDFS = ("ui/sample_template-1.pdf", "ui/sample_template-2.pdf")
+
+
+def paginated_pages(resume, rng, lines_per_page=40):
+    """Lays a resume out the way PDF extraction returns it, one text per page with running header/footer and page numbers."""
+    body = to_template_1_text(resume).split("\n")
+    chunks = [body[i:i + lines_per_page] for i in range(0, len(body), lines_per_page)]
+    pages = []
+    for number, chunk in enumerate(chunks, 1):
+        lines = [f"{resume.full_name}    |    Curriculum   Vitae", "Confidential - for recruitment use only", ""]
+        lines += [line + " " * rng.randint(0, 6) for line in chunk]
+        lines += ["", f"Page {number} of {len(chunks)}", "", ""]
+        pages.append("\n".join(lines))
+    return pages
+
+
+def load_fixture(path):
+    """(text, pages) of a fixture file; pages is None where the file has no pages."""
+    if path.lower().endswith(".pdf"):
+        with open(path, "rb") as f:
+            pages = pdf_extract.extract_pages(f.read())
+        return "\n".join(pages), pages
+    if path.lower().endswith(".docx"):
+        with open(path, "rb") as f:
+            return template_1.extract_text_from_docx(f), None
+    with open(path, encoding="utf-8") as f:
+        return f.read(), None
+
+
+def fixtures(directory, synthetic, seed):
+    paths = SAMPLE_PDFS
+    if directory:
+        paths = sorted(p for p in glob.glob(os.path.join(directory, "*"))
+                       if p.lower().endswith((".pdf", ".docx", ".txt")))
+    documents = [(os.path.basename(p), *load_fixture(p)) for p in paths if os.path.exists(p)]
+    rng = random.Random(seed)
+    for i in range(synthetic):
+        resume = synthetic_resume(rng, jobs=rng.randint(3, 12), responsibilities=rng.randint(4, 10))
+        pages = paginated_pages(resume, rng)
+        documents.append((f"synthetic-{i}", "\n".join(pages), pages))
+    return documents
+
+
+def measure(name, text, pages, repeats):
+    started = time.perf_counter()
+    for _ in range(repeats):
+        _, stats = compress(text, pages)
+    elapsed = (time.perf_counter() - started) / repeats
+    return {"fixture": name, "tokens_before": stats["tokens_before"], "tokens_after": stats["tokens_after"],
+            "saved_ratio": stats["saved_ratio"], "ms": round(elapsed * 1000, 3)}
+
+
+def live_latency(text, pages, api_key, base_url):
+    """Seconds for one template_1 call on the raw and on the compressed text."""
+    timings = {}
+    for label, prompt_text in (("raw", text), ("compressed", compress(text, pages)[0])):
+        started = time.perf_counter()
+        complete(template_1.prompt(prompt_text), api_key, base_url)
+        timings[label] = round(time.perf_counter() - started, 2)
+    return timings
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().split("\n")[0])
+    parser.add_argument("--fixtures", help="directory of PDF/DOCX/TXT resumes (default: bundled sample PDFs)")
+    parser.add_argument("--synthetic", type=int, default=20, help="synthetic paginated resumes to add")
+    parser.add_argument("--repeats", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--live", action="store_true", help="time real LLM calls with and without preprocessing")
+    args = parser.parse_args(argv)
+
+    documents = fixtures(args.fixtures, args.synthetic, args.seed)
+    results = [measure(name, text, pages, args.repeats) for name, text, pages in documents]
+
+    print(f"{'fixture':<28}{'tokens':>9}{'after':>9}{'saved':>8}{'ms':>9}")
+    for row in results:
+        print(f"{row['fixture']:<28}{row['tokens_before']:>9}{row['tokens_after']:>9}"
+              f"{row['saved_ratio']:>8.1%}{row['ms']:>9}")
+    before = sum(row["tokens_before"] for row in results)
+    after = sum(row["tokens_after"] for row in results)
+    if before:
+        print(f"{'total':<28}{before:>9}{after:>9}{1 - after / before:>8.1%}")
+
+    if args.live:
+        api_key, base_url = os.environ.get("PORTKEY_API_KEY"), os.environ.get("PORTKEY_BASE_URL")
+        if not api_key:
+            parser.error("--live needs PORTKEY_API_KEY (and PORTKEY_BASE_URL) in the environment")
+        for name, text, pages in documents[:3]:
+            print(f"{name}: {live_latency(text, pages, api_key, base_url)}")
+    return results
+
+
+if __name__ == "__main__":
+    main()
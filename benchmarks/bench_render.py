@@ -0,0 +1,67 @@
+"""
+DOCX render cost for both templates on a long resume: time per render, output size and
+how much direct run formatting (w:rFonts / w:sz / w:color) ends up in document.xml.
+
+    python -m benchmarks.bench_render               # 30-job synthetic resume
+    python -m benchmarks.bench_render --jobs 60 --repeats 20
+
+Run from the repository root so template assets resolve. The first render per template
+also compiles the template; it is reported separately.
+"""
+import argparse
+import random
+import statistics
+import time
+import zipfile
+
+import resume_schema
+import template_1
+import template_2
+from benchmarks.synthetic import synthetic_resume
+
+RENDERERS = {
+    "T1": (template_1.convert_to_docx, resume_schema.to_template_1_text),
+    "T2": (template_2.convert_to_docx, resume_schema.to_template_2_text),
+}
+DIRECT_FORMATTING = (b"<w:rFonts", b"<w:sz ", b"<w:color")
+
+
+def measure(convert, text, repeats):
+    started = time.perf_counter()
+    buffer, _ = convert(text)
+    first = time.perf_counter() - started
+    times = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        buffer, _ = convert(text)
+        times.append(time.perf_counter() - started)
+    data = buffer.getvalue()
+    with zipfile.ZipFile(buffer) as archive:
+        document_xml = archive.read("word/document.xml")
+    return {"first_ms": round(first * 1000, 1), "median_ms": round(statistics.median(times) * 1000, 1),
+            "docx_bytes": len(data), "document_xml_bytes": len(document_xml),
+            "direct_formatting": sum(document_xml.count(tag) for tag in DIRECT_FORMATTING)}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().split("\n")[0])
+    parser.add_argument("--jobs", type=int, default=30)
+    parser.add_argument("--responsibilities", type=int, default=6)
+    parser.add_argument("--repeats", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args(argv)
+
+    resume = synthetic_resume(random.Random(args.seed), jobs=args.jobs, responsibilities=args.responsibilities)
+    results = {template_id: measure(convert, to_text(resume), args.repeats)
+               for template_id, (convert, to_text) in RENDERERS.items()}
+
+    print(f"{args.jobs} jobs x {args.responsibilities} responsibilities, {args.repeats} renders each")
+    print(f"{'template':<10}{'first ms':>10}{'median ms':>11}{'docx KB':>10}{'xml KB':>9}{'direct fmt':>12}")
+    for template_id, row in results.items():
+        print(f"{template_id:<10}{row['first_ms']:>10.1f}{row['median_ms']:>11.1f}{row['docx_bytes'] / 1024:>10.1f}"
+              f"{row['document_xml_bytes'] / 1024:>9.1f}{row['direct_formatting']:>12}")
+    return results
+
+
+if __name__ == "__main__":
+    main()
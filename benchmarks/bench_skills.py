@@ -0,0 +1,102 @@
+"""
+Skill normalization throughput: tens of thousands of raw skill strings mapped onto the
+taxonomy by skills.SkillNormalizer (batched embedding, LRU cache, blockwise matrix
+similarity) against a per-skill loop that embeds and scores one string at a time.
+
+    python -m benchmarks.bench_skills                     # 20k skills, hashing encoder
+    python -m benchmarks.bench_skills --skills 50000
+    python -m benchmarks.bench_skills --model             # real sentence-transformers model
+
+The default encoder hashes character trigrams so the benchmark measures the pipeline
+itself; --model measures end to end with the configured embedding model.
+"""
+import argparse
+import random
+import time
+import zlib
+
+import numpy as np
+
+import skills
+
+DIMENSION = 384
+NOISE = ("", " ", "  ", ".", " (advanced)", " 2.x", " development", " ecosystem")
+
+
+def hashing_encoder(texts):
+    """Deterministic stand-in embedding: character trigrams hashed into DIMENSION buckets."""
+    vectors = np.zeros((len(texts), DIMENSION), dtype="float32")
+    for row, text in enumerate(texts):
+        padded = f"  {text.lower()}  "
+        for i in range(len(padded) - 2):
+            vectors[row, zlib.crc32(padded[i:i + 3].encode()) % DIMENSION] += 1.0
+    return vectors
+
+
+def synthetic_skills(count, seed):
+    """Raw skills as an LLM writes them: aliases, case and spacing variants, plus noise suffixes."""
+    rng = random.Random(seed)
+    names = [name for canonical, aliases in skills.SKILL_TAXONOMY.items() for name in [canonical, *aliases]]
+    result = []
+    for _ in range(count):
+        name = rng.choice(names)
+        name = rng.choice((name, name.lower(), name.upper(), name.title()))
+        result.append(name + rng.choice(NOISE))
+    return result
+
+
+def per_item(raw_skills, encoder, taxonomy_names, taxonomy_matrix, threshold):
+    """One encoder call and one vector-matrix product per skill, no caching."""
+    results = []
+    for skill in raw_skills:
+        vector = np.asarray(encoder([skill]), dtype="float32")[0]
+        vector /= max(np.linalg.norm(vector), 1e-12)
+        scores = taxonomy_matrix @ vector
+        best = int(scores.argmax())
+        results.append((taxonomy_names[best], float(scores[best])) if scores[best] >= threshold
+                       else (None, float(scores[best])))
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().split("\n")[0])
+    parser.add_argument("--skills", type=int, default=20_000, help="number of raw skill strings")
+    parser.add_argument("--model", action="store_true", help="use the real embedding model")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args(argv)
+
+    encoder = None if args.model else hashing_encoder
+    raw_skills = synthetic_skills(args.skills, args.seed)
+    normalizer = skills.SkillNormalizer(embedder=skills.EmbeddingService(encoder=encoder))
+    matrix = normalizer._taxonomy_matrix()  # built once in both cases
+    canonical_names = [normalizer._aliases[name] for name in normalizer._names]
+
+    started = time.perf_counter()
+    cold = normalizer.normalize(raw_skills)
+    cold_seconds = time.perf_counter() - started
+    started = time.perf_counter()
+    normalizer.normalize(raw_skills)
+    warm_seconds = time.perf_counter() - started
+
+    sample = raw_skills[:min(len(raw_skills), 2000)]
+    started = time.perf_counter()
+    per_item(sample, encoder or skills.get_encoder(skills.MODEL_NAME), canonical_names, matrix,
+             normalizer.threshold)
+    per_item_seconds = (time.perf_counter() - started) * len(raw_skills) / len(sample)
+
+    exact = sum(score == 1.0 for _, score in cold)
+    matched = sum(canonical is not None for canonical, _ in cold)
+    unique = len({skills.normalize_key(skill) for skill in raw_skills})
+    print(f"{len(raw_skills)} skills, {unique} unique, {len(normalizer._names)} taxonomy names")
+    print(f"{'case':<34}{'ms':>10}{'skills/s':>12}")
+    for label, seconds in (("per-item loop (extrapolated)", per_item_seconds),
+                           ("SkillNormalizer, cold cache", cold_seconds),
+                           ("SkillNormalizer, warm cache", warm_seconds)):
+        print(f"{label:<34}{seconds * 1000:>10.1f}{len(raw_skills) / seconds:>12.0f}")
+    print(f"exact alias hits {exact}, matched {matched} ({matched / len(cold):.0%}), "
+          f"embedding cache {normalizer.embedder.cache.stats()}")
+    return {"cold_seconds": cold_seconds, "warm_seconds": warm_seconds, "per_item_seconds": per_item_seconds}
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Cold-start cost of the app: wall time of `import app` in a fresh interpreter, the slowest
+imports it triggers, and which heavy libraries were loaded before first use.
+
+    python -m benchmarks.bench_startup               # 5 cold starts
+    python -m benchmarks.bench_startup --json out.json
+
+Run from the repository root. Streamlit calls in app.py run in bare mode and only warn.
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+
+# Libraries that should only load when a feature needs them.
+HEAVY = ("torch", "sentence_transformers", "transformers", "portkey_ai", "openai", "faiss", "numpy",
+         "pandas", "pdfplumber", "pdfminer", "pypdfium2")
+
+PROBE = ("import sys, json, app; "
+         "print(json.dumps(sorted(m for m in %r if m in sys.modules)))" % (HEAVY,))
+
+
+def cold_start(module):
+    started = time.perf_counter()
+    subprocess.run([sys.executable, "-c", f"import {module}"], check=True, capture_output=True)
+    return time.perf_counter() - started
+
+
+def slowest_imports(module, count):
+    """Top-level modules by cumulative import time, from python -X importtime."""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            check=True, capture_output=True, text=True)
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if (len(name) - len(name.lstrip()) - 1) // 2 != 1:  # modules imported directly by `module`
+            continue
+        try:
+            rows.append((int(cumulative), name.strip()))
+        except ValueError:
+            continue
+    return sorted(rows, reverse=True)[:count]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().split("\n")[0])
+    parser.add_argument("--module", default="app")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args(argv)
+
+    cold_start(args.module)  # warm the OS file cache and __pycache__ so runs are comparable
+    runs = [cold_start(args.module) for _ in range(args.runs)]
+    loaded = json.loads(subprocess.run([sys.executable, "-c", PROBE], check=True, capture_output=True,
+                                       text=True).stdout.strip().splitlines()[-1]) if args.module == "app" else []
+    slowest = slowest_imports(args.module, args.top)
+
+    print(f"import {args.module}: median {statistics.median(runs) * 1000:.0f} ms, "
+          f"min {min(runs) * 1000:.0f} ms over {len(runs)} runs")
+    print("heavy libraries loaded at start-up:", ", ".join(loaded) or "none")
+    print(f"{'module':<32}{'ms':>10}")
+    for microseconds, name in slowest:
+        print(f"{name:<32}{microseconds / 1000:>10.1f}")
+
+    results = {"module": args.module, "runs_ms": [round(r * 1000, 1) for r in runs],
+               "median_ms": round(statistics.median(runs) * 1000, 1), "heavy_loaded": loaded,
+               "slowest_imports": [{"module": name, "ms": round(us / 1000, 1)} for us, name in slowest]}
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Table building cost: the original per-cell w:tcBorders and table.cell(r, c) filling
+against docx_render's table-level w:tblBorders and table_rows().
+
+    python -m benchmarks.bench_tables                 # 100-row, 4-column tables
+    python -m benchmarks.bench_tables --rows 300 --cols 6
+"""
+import argparse
+import statistics
+import time
+
+from docx import Document
+from docx.oxml import OxmlElement
+from docx.oxml.ns import qn
+
+from docx_render import set_table_no_border, table_rows
+
+
+def original_set_table_no_border(table):
+    """set_table_no_border as it was copied in both templates before docx_render."""
+    for row in table.rows:
+        for cell in row.cells:
+            tcPr = cell._tc.get_or_add_tcPr()
+            tcBorders = OxmlElement('w:tcBorders')
+            for border_name in ['top', 'left', 'bottom', 'right', 'insideH', 'insideV']:
+                border = OxmlElement(f'w:{border_name}')
+                border.set(qn('w:val'), 'nil')
+                tcBorders.append(border)
+            tcPr.append(tcBorders)
+
+
+def original_table(doc, data, cols):
+    table = doc.add_table(rows=len(data), cols=cols)
+    table.style = 'Table Grid'
+    original_set_table_no_border(table)
+    for r, row_data in enumerate(data):
+        for c, cell_data in enumerate(row_data[:cols]):
+            table.cell(r, c).text = cell_data
+    return table
+
+
+def compiled_table(doc, data, cols):
+    table = doc.add_table(rows=len(data), cols=cols)
+    table.style = 'Table Grid'
+    set_table_no_border(table)
+    for row_data, row_cells in zip(data, table_rows(table)):
+        for cell, cell_data in zip(row_cells, row_data):
+            cell.text = cell_data
+    return table
+
+
+def timed(build, data, cols, repeats):
+    times = []
+    for _ in range(repeats):
+        doc = Document()
+        started = time.perf_counter()
+        build(doc, data, cols)
+        times.append(time.perf_counter() - started)
+    return statistics.median(times), doc
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().split("\n")[0])
+    parser.add_argument("--rows", type=int, default=100)
+    parser.add_argument("--cols", type=int, default=4)
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    data = [[f"Engagement {r} field {c}" for c in range(args.cols)] for r in range(args.rows)]
+    results = {}
+    print(f"{args.rows} x {args.cols} table, median of {args.repeats}")
+    print(f"{'case':<34}{'ms':>10}{'border elements':>17}")
+    for label, build in (("per-cell borders + table.cell", original_table),
+                         ("tblBorders + table_rows", compiled_table)):
+        seconds, doc = timed(build, data, args.cols, args.repeats)
+        body = doc.element.body
+        borders = len(body.findall(".//" + qn("w:tcBorders"))) + len(body.findall(".//" + qn("w:tblBorders")))
+        results[label] = {"ms": round(seconds * 1000, 1), "border_elements": borders}
+        print(f"{label:<34}{seconds * 1000:>10.1f}{borders:>17}")
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+"""
+Pipeline benchmark suite on synthetic resumes of several sizes: extraction (PDF, DOCX),
+PII scrubbing, parsing and convert_to_docx (render + serialize) for both templates, and
+an end-to-end upload -> DOCX run through a stubbed LLM. Reports median time and peak
+memory per stage and can compare against an earlier run.
+
+    python -m benchmarks.suite --json bench.json                 # small, medium and large resumes
+    python -m benchmarks.suite --sizes large --repeats 10
+    python -m benchmarks.suite --compare bench.json              # exit 1 on a regression
+
+Runs offline from the repository root. peak_kib is the Python heap high-water mark
+(tracemalloc); peak_rss_kib is the resident-set growth of a forked run, which also counts
+lxml and pdfium memory (None where fork is unavailable). The PDF backend in use
+(TALENTTUNE_PDF_BACKEND) is recorded with the sizes.
+"""
+import argparse
+import io
+import json
+import multiprocessing
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import pdf_extract
+import pii
+import template_1
+import template_2
+from benchmarks.synthetic import llm_outputs, resume_docx, resume_lines, resume_pdf, synthetic_resume
+from fake_portkey import FakePortkey
+from llm import complete
+
+SIZES = {
+    "small": {"pages": 1, "jobs": 3, "responsibilities": 4, "table_rows": 3},
+    "medium": {"pages": 4, "jobs": 12, "responsibilities": 6, "table_rows": 8},
+    "large": {"pages": 12, "jobs": 40, "responsibilities": 8, "table_rows": 20},
+}
+TEMPLATES = {"T1": template_1, "T2": template_2}
+
+
+def build_inputs(size, seed):
+    rng = random.Random(seed)
+    resume = synthetic_resume(rng, jobs=size["jobs"], responsibilities=size["responsibilities"],
+                              table_rows=size["table_rows"])
+    return {"pdf": resume_pdf(resume, rng, size["pages"]), "docx": resume_docx(resume, rng),
+            "raw_text": "\n".join(resume_lines(resume, rng)), "outputs": llm_outputs(resume)}
+
+
+def end_to_end(template_id, inputs):
+    """Upload to DOCX bytes: extraction, prompt, a stubbed LLM answer, parse and render."""
+    module = TEMPLATES[template_id]
+    resume_text = module.extract_text_from_pdf(io.BytesIO(inputs["pdf"]), workers=1)
+    client = FakePortkey(reply=lambda prompt: inputs["outputs"][template_id])
+    formatted = complete(module.prompt(resume_text), None, None, client=client)
+    buffer, _ = module.convert_to_docx(formatted)
+    return buffer.getvalue()
+
+
+def stages(inputs):
+    """(name, callable) for every measured stage; each callable runs the stage once."""
+    cases = [
+        ("extract_pdf", lambda: template_1.extract_text_from_pdf(io.BytesIO(inputs["pdf"]), workers=1)),
+        ("extract_docx", lambda: template_1.extract_text_from_docx(io.BytesIO(inputs["docx"]))),
+        ("clean_pii", lambda: pii.clean_pii(inputs["raw_text"])),
+    ]
+    for template_id, module in TEMPLATES.items():
+        text = inputs["outputs"][template_id]
+        cases += [
+            (f"parse_{template_id}", lambda module=module, text=text: module.parse_portkey_text(text)),
+            (f"render_{template_id}", lambda module=module, text=text: module.convert_to_docx(text)[0].getvalue()),
+            (f"end_to_end_{template_id}", lambda template_id=template_id: end_to_end(template_id, inputs)),
+        ]
+    return cases
+
+
+def _rss_growth(fn, conn):
+    import resource  # Unix only, like fork
+
+    before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    fn()
+    conn.send(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - before)
+    conn.close()
+
+
+def peak_rss_kib(fn):
+    """Growth of the peak resident set while fn runs in a forked copy of this process."""
+    if "fork" not in multiprocessing.get_all_start_methods():
+        return None
+    context = multiprocessing.get_context("fork")
+    receiver, sender = context.Pipe(duplex=False)
+    process = context.Process(target=_rss_growth, args=(fn, sender))
+    process.start()
+    growth = receiver.recv()
+    process.join()
+    # ru_maxrss is in KiB on Linux and in bytes on macOS.
+    return growth // 1024 if sys.platform == "darwin" else growth
+
+
+def measure(fn, repeats):
+    fn()  # first call compiles templates and warms caches; the suite measures steady state
+    times = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - started)
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {"median_ms": round(statistics.median(times) * 1000, 2), "min_ms": round(min(times) * 1000, 2),
+            "peak_kib": round(peak / 1024, 1), "peak_rss_kib": peak_rss_kib(fn)}
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], check=True, capture_output=True,
+                              text=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline, threshold):
+    """Rows of (size, stage, baseline ms, current ms, ratio) and whether any ratio exceeds threshold."""
+    rows, regressed = [], False
+    for size, stage_results in results.items():
+        for stage, row in stage_results.items():
+            before = baseline.get(size, {}).get(stage)
+            if not before:
+                continue
+            ratio = row["median_ms"] / before["median_ms"] if before["median_ms"] else float("inf")
+            rows.append((size, stage, before["median_ms"], row["median_ms"], ratio))
+            regressed = regressed or ratio > threshold
+    return rows, regressed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().split("\n")[0])
+    parser.add_argument("--sizes", nargs="+", choices=sorted(SIZES), default=list(SIZES))
+    parser.add_argument("--stages", nargs="+", help="only run stages whose name starts with one of these")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--json", help="write the results to this file")
+    parser.add_argument("--compare", help="results file of an earlier run to compare against")
+    parser.add_argument("--threshold", type=float, default=1.25,
+                        help="median time ratio over the baseline that counts as a regression")
+    args = parser.parse_args(argv)
+
+    results = {}
+    print(f"{'size':<8}{'stage':<18}{'median ms':>11}{'min ms':>10}{'peak KiB':>11}{'RSS KiB':>10}")
+    for size_name in args.sizes:
+        inputs = build_inputs(SIZES[size_name], args.seed)
+        results[size_name] = {}
+        for stage, fn in stages(inputs):
+            if args.stages and not stage.startswith(tuple(args.stages)):
+                continue
+            row = results[size_name][stage] = measure(fn, args.repeats)
+            rss = "-" if row["peak_rss_kib"] is None else row["peak_rss_kib"]
+            print(f"{size_name:<8}{stage:<18}{row['median_ms']:>11.2f}{row['min_ms']:>10.2f}"
+                  f"{row['peak_kib']:>11.1f}{rss:>10}")
+
+    report = {"commit": git_commit(), "python": platform.python_version(), "platform": platform.platform(),
+              "created": time.strftime("%Y-%m-%dT%H:%M:%S"), "repeats": args.repeats, "seed": args.seed,
+              "sizes": {name: {**SIZES[name], "pdf_backend": pdf_extract.choose_backend()}
+                        for name in args.sizes}, "results": results}
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        rows, regressed = compare(results, baseline["results"], args.threshold)
+        print(f"\nagainst {args.compare} (commit {baseline.get('commit')}), regression above {args.threshold:g}x")
+        print(f"{'size':<8}{'stage':<18}{'before ms':>11}{'now ms':>10}{'ratio':>8}")
+        for size_name, stage, before, now, ratio in rows:
+            flag = "  REGRESSION" if ratio > args.threshold else ""
+            print(f"{size_name:<8}{stage:<18}{before:>11.2f}{now:>10.2f}{ratio:>8.2f}{flag}")
+        if regressed:
+            sys.exit(1)
+    return report
+
+
+if __name__ == "__main__":
+    main()
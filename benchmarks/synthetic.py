@@ -0,0 +1,161 @@
+"""
+Synthetic resumes of controlled size for the benchmarks: the Resume itself, the LLM
+outputs both templates parse, and the uploads (PDF and DOCX) they would come from.
+
+Everything is built from a seeded random.Random and needs no network or model. PDFs are
+written directly (Helvetica text, one content stream per page) so no PDF library is
+needed to generate them; pdfplumber and pdfium read them like any text PDF.
+"""
+import io
+import textwrap
+
+from docx import Document
+
+from benchmarks.bench_pii import PII_SAMPLES
+from resume_schema import Job, Resume, to_template_1_text
+
+WORDS = ("data platform pipeline migration cloud analytics reporting warehouse service "
+         "integration security automation dashboard model api latency customer").split()
+COLON_PHRASES = ("Key result: reduced cost by 20%", "Stack: Python, Spark", "Scope: 3 regions",
+                 "Note: delivered ahead of schedule")
+SKILL_CATEGORIES = ("Cloud", "Languages", "Databases", "ETL Tools", "Orchestration", "Visualization",
+                    "DevOps", "Testing", "Streaming", "Security")
+SKILLS = ("AWS", "Azure", "GCP", "Python", "SQL", "Scala", "Spark", "Kafka", "Airflow", "dbt", "Snowflake",
+          "Postgres", "Tableau", "Power BI", "Docker", "Kubernetes", "Terraform", "pytest", "Informatica")
+
+
+def _sentence(rng, words=8, colon_rate=0.3):
+    text = " ".join(rng.choice(WORDS) for _ in range(words)).capitalize()
+    if rng.random() < colon_rate:
+        text += ". " + rng.choice(COLON_PHRASES)
+    return text
+
+
+def synthetic_resume(rng, jobs=6, responsibilities=5, colon_rate=0.3, table_rows=2):
+    """A Resume with jobs jobs and table_rows skill categories (the template 1 technologies table)."""
+    resume = Resume(
+        full_name=f"Candidate {rng.randint(1000, 9999)}",
+        designation="Senior Engineer",
+        summary=_sentence(rng, 30, colon_rate),
+        roles=["Engineer", "Lead", "Architect"],
+        solutions=["Data Platforms", "Cloud Migration"],
+        industries=["Retail", "Healthcare"],
+        key_technologies=["AWS", "Python", "Spark"],
+        technologies=[(f"{SKILL_CATEGORIES[i % len(SKILL_CATEGORIES)]}{'' if i < len(SKILL_CATEGORIES) else f' {i}'}",
+                       ", ".join(rng.sample(SKILLS, 3))) for i in range(table_rows)],
+        education="B.Tech Computer Science",
+        certifications=["AWS Solutions Architect"],
+        geographic_locale="Hyderabad, India",
+    )
+    for i in range(jobs):
+        resume.jobs.append(Job(
+            company_name=f"Company {i}",
+            role=f"Engineer {i}",
+            duration="2019 - 2021",
+            client=f"Client {i}",
+            description=_sentence(rng, 15, colon_rate),
+            responsibilities=[_sentence(rng, 10, colon_rate) for _ in range(responsibilities)],
+        ))
+    return resume
+
+
+def raw_template_2_text(resume):
+    """Tagged text as the template 2 prompt asks for it, without the colon escaping used by projection."""
+    lines = [f"FullName: {resume.full_name}", f"Designation: {resume.designation}", "",
+             "ProfessionalOverviewSummary:", resume.summary, "", "ProfessionalOverviewTable:",
+             f"Roles | {', '.join(resume.roles)}", f"Technologies | {', '.join(resume.key_technologies)}", "",
+             "KeyEngagementsTable:", "Client | Role | Description"]
+    lines += [f"{job.client} | {job.role} | {job.description}" for job in resume.jobs]
+    lines += ["", "Education:", resume.education, "", "GeographicLocale:", resume.geographic_locale, ""]
+    for job in resume.jobs:
+        lines += ["---JOB START---", f"CompanyName: {job.company_name}", f"Role: {job.role}",
+                  f"Duration: {job.duration}", f"Client: {job.client}", "Responsibilities:"]
+        lines += [f"- {resp}" for resp in job.responsibilities]
+        lines += ["---JOB END---", ""]
+    return "\n".join(lines)
+
+
+def llm_outputs(resume):
+    """The model's answer to each template's prompt for this resume: {"T1": text, "T2": text}."""
+    return {"T1": to_template_1_text(resume), "T2": raw_template_2_text(resume)}
+
+
+def resume_lines(resume, rng):
+    """The resume as a candidate writes it, with contact details and other PII to scrub."""
+    lines = [resume.full_name, resume.designation, " | ".join(rng.sample(PII_SAMPLES, 4)), "",
+             "Summary", resume.summary, "", "Skills"]
+    lines += [f"{category}: {skills}" for category, skills in resume.technologies]
+    lines += ["", "Experience"]
+    for job in resume.jobs:
+        lines += [f"{job.role}, {job.company_name} ({job.duration})", f"Client: {job.client}", job.description]
+        lines += [f"- {resp}" for resp in job.responsibilities]
+        lines.append("")
+    lines += ["Education", resume.education, "", "Certifications", *resume.certifications, "",
+              "Address: " + rng.choice(PII_SAMPLES[-2:])]
+    return lines
+
+
+def resume_docx(resume, rng):
+    """A DOCX upload for resume: a page header, paragraphs and a skills table with one row per category."""
+    doc = Document()
+    doc.sections[0].header.paragraphs[0].text = f"{resume.full_name} | Curriculum Vitae"
+    lines = resume_lines(resume, rng)
+    skills_start = lines.index("Skills") + 1
+    for line in lines[:skills_start]:
+        doc.add_paragraph(line)
+    table = doc.add_table(rows=len(resume.technologies), cols=2)
+    for row, (category, skills) in zip(table.rows, resume.technologies):
+        row.cells[0].text = category
+        row.cells[1].text = skills
+    for line in lines[skills_start + len(resume.technologies):]:
+        doc.add_paragraph(line)
+    buffer = io.BytesIO()
+    doc.save(buffer)
+    return buffer.getvalue()
+
+
+def _pdf_string(text):
+    text = text.encode("latin-1", "replace").decode("latin-1")
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def text_pdf(lines, pages, width=612, height=792, margin=54):
+    """
+    A PDF of exactly pages pages with lines (wrapped at 95 characters) spread evenly over
+    them; the leading shrinks when a page holds more lines than fit at 12pt.
+    """
+    wrapped = [part for line in lines for part in (textwrap.wrap(line, 95) or [""])]
+    per_page = max(1, -(-len(wrapped) // pages))
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", None,
+               b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>"]
+    kids = []
+    for page in range(pages):
+        chunk = wrapped[page * per_page:(page + 1) * per_page]
+        leading = min(12.0, (height - 2 * margin) / max(len(chunk), 1))
+        stream = [f"BT /F1 {leading * 0.85:.2f} Tf {leading:.2f} TL {margin} {height - margin} Td"]
+        stream += [f"({_pdf_string(line)}) Tj T*" for line in chunk]
+        stream.append("ET")
+        content = "\n".join(stream).encode("latin-1")
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(content), content))
+        content_id = len(objects)
+        objects.append(b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %d %d] /Resources << /Font << /F1 3 0 R >> >> "
+                       b"/Contents %d 0 R >>" % (width, height, content_id))
+        kids.append(len(objects))
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (b" ".join(b"%d 0 R" % k for k in kids), pages)
+
+    out = io.BytesIO()
+    out.write(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(out.tell())
+        out.write(b"%d 0 obj\n%s\nendobj\n" % (number, body))
+    xref = out.tell()
+    out.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+    out.write(b"".join(b"%010d 00000 n \n" % offset for offset in offsets))
+    out.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref))
+    return out.getvalue()
+
+
+def resume_pdf(resume, rng, pages):
+    """A pages-page text PDF upload for resume."""
+    return text_pdf(resume_lines(resume, rng), pages)
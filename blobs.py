@@ -0,0 +1,240 @@
+"""
+Shared store for large session payloads: extracted resume text, LLM output, batch ZIPs.
+
+Sessions keep a small BlobRef in st.session_state instead of the payload. Blobs are
+content-addressed, so the same resume or result held by several sessions is stored once,
+and a blob is dropped when the last BlobRef to it is garbage collected, which happens
+when a session overwrites the value or expires. Past the memory budget the least
+recently used blobs are spilled to files in a per-process directory and read back from
+disk on access. Files are written, read and removed outside the store's lock.
+"""
+import atexit
+import contextlib
+import itertools
+import os
+import queue
+import shutil
+import tempfile
+import threading
+import weakref
+from collections import OrderedDict
+
+from cache import content_hash
+from resources import get_resource
+
+
+DEFAULT_MEMORY_MB = 256
+
+
+class BlobRef:
+    """A session's handle on a stored blob; .value returns the payload (str or bytes)."""
+
+    def __init__(self, store, key, size, session):
+        self.key = key
+        self.size = size
+        self.session = session
+        self._store = store
+        # Finalizers can run from the garbage collector while the store's lock is held, so
+        # they only queue the release; the store applies it the next time it takes the lock.
+        weakref.finalize(self, store._released.put, (key, session))
+
+    @property
+    def value(self):
+        return self._store.get(self.key)
+
+    def __repr__(self):
+        return f"BlobRef({self.key[:16]}..., {self.size} bytes)"
+
+
+class _Blob:
+    __slots__ = ("kind", "size", "data", "path", "spilling", "sessions")
+
+    def __init__(self, kind, data):
+        self.kind = kind
+        self.size = len(data)
+        self.data = data
+        self.path = None
+        self.spilling = False  # being written to its spill file; no longer counted in memory_bytes
+        self.sessions = {}  # session id -> number of BlobRefs it holds
+
+
+class BlobStore:
+    """
+    Content-addressed blobs shared by every session in the process, at most
+    max_memory_bytes of them in memory; the rest live in files under spill_dir
+    (a temporary directory by default).
+    """
+
+    def __init__(self, max_memory_bytes=DEFAULT_MEMORY_MB * 1024 * 1024, spill_dir=None):
+        self.max_memory_bytes = max_memory_bytes
+        self.spill_dir = spill_dir
+        self._blobs = OrderedDict()  # in-memory blobs in LRU order, then spilled ones
+        self._lock = threading.Lock()
+        self._released = queue.SimpleQueue()  # (key, session) of garbage-collected BlobRefs
+        self._directory = None
+        self._spill_numbers = itertools.count()  # a blob dropped and stored again mid-spill gets a new file
+        self.memory_bytes = 0
+        self.spills = 0
+
+    @contextlib.contextmanager
+    def _locked(self):
+        """Holds the lock with queued releases applied; spill files of dropped blobs are removed afterwards."""
+        with self._lock:
+            orphans = self._apply_releases()
+            yield
+        _remove_files(orphans)
+
+    def put(self, value, session=None):
+        """Stores value (str or bytes) and returns a BlobRef to it held on behalf of session."""
+        kind = "str" if isinstance(value, str) else "bytes"
+        data = value.encode("utf-8") if kind == "str" else bytes(value)
+        key = f"{kind}-{content_hash(data)}"
+        with self._locked():
+            blob = self._blobs.get(key)
+            if blob is None:
+                blob = self._blobs[key] = _Blob(kind, data)
+                self.memory_bytes += blob.size
+            elif blob.data is not None:
+                self._blobs.move_to_end(key)
+            blob.sessions[session] = blob.sessions.get(session, 0) + 1
+            ref = BlobRef(self, key, blob.size, session)
+            victims = self._choose_spills()
+        self._spill(victims)
+        return ref
+
+    def get(self, key):
+        with self._locked():
+            blob = self._blobs[key]
+            data, path = blob.data, blob.path
+            if data is not None:
+                self._blobs.move_to_end(key)
+        if data is None:
+            # The caller's BlobRef keeps the blob, and so its spill file, alive during the read.
+            with open(path, "rb") as f:
+                data = f.read()
+        return data.decode("utf-8") if blob.kind == "str" else data
+
+    def _choose_spills(self):
+        """Takes least recently used blobs out of the memory budget; the caller writes them with _spill()."""
+        victims = []
+        for key, blob in self._blobs.items():
+            if self.memory_bytes <= self.max_memory_bytes:
+                break
+            if blob.data is None or blob.spilling:
+                continue
+            blob.spilling = True
+            self.memory_bytes -= blob.size
+            victims.append((key, blob, os.path.join(self._spill_directory(), f"{key}-{next(self._spill_numbers)}")))
+        return victims
+
+    def _spill(self, victims):
+        for key, blob, path in victims:
+            try:
+                with open(path + ".tmp", "wb") as f:
+                    f.write(blob.data)
+                os.replace(path + ".tmp", path)
+            except OSError:
+                _remove_files([path + ".tmp"])
+                with self._lock:
+                    blob.spilling = False
+                    if self._blobs.get(key) is blob:
+                        self.memory_bytes += blob.size
+                raise
+            with self._lock:
+                blob.spilling = False
+                stored = self._blobs.get(key) is blob
+                if stored:
+                    blob.path = path
+                    blob.data = None
+                    self.spills += 1
+            if not stored:
+                _remove_files([path])
+
+    def _spill_directory(self):
+        if self._directory is None:
+            if self.spill_dir:
+                os.makedirs(self.spill_dir, exist_ok=True)
+            # One directory per process: spilled blobs never outlive the references to them.
+            self._directory = tempfile.mkdtemp(prefix="talenttune-blobs-", dir=self.spill_dir or None)
+            atexit.register(shutil.rmtree, self._directory, True)
+        return self._directory
+
+    def _apply_releases(self):
+        """
+        Applies the queued releases; called with the lock held. Returns the spill files of
+        dropped blobs for the caller to remove once the lock is released.
+        """
+        orphans = []
+        while True:
+            try:
+                key, session = self._released.get_nowait()
+            except queue.Empty:
+                return orphans
+            blob = self._blobs.get(key)
+            if blob is None:
+                continue
+            blob.sessions[session] -= 1
+            if blob.sessions[session]:
+                continue
+            del blob.sessions[session]
+            if blob.sessions:
+                continue
+            del self._blobs[key]
+            if blob.path is not None:
+                orphans.append(blob.path)
+            elif not blob.spilling:
+                self.memory_bytes -= blob.size
+
+    def session_stats(self, session):
+        """Blobs and bytes referenced by session; shared_bytes are also referenced by other sessions."""
+        with self._locked():
+            held = [blob for blob in self._blobs.values() if session in blob.sessions]
+            return {"blobs": len(held), "bytes": sum(blob.size for blob in held),
+                    "shared_bytes": sum(blob.size for blob in held if len(blob.sessions) > 1),
+                    "spilled_bytes": sum(blob.size for blob in held if blob.data is None)}
+
+    def sessions(self):
+        """Bytes referenced per session id."""
+        with self._locked():
+            usage = {}
+            for blob in self._blobs.values():
+                for session in blob.sessions:
+                    usage[session] = usage.get(session, 0) + blob.size
+            return usage
+
+    def stats(self):
+        """
+        Store-wide usage: stored_bytes is what the store holds (memory plus spilled files),
+        logical_bytes what the sessions would hold without sharing.
+        """
+        with self._locked():
+            stored = sum(blob.size for blob in self._blobs.values())
+            logical = sum(blob.size * len(blob.sessions) for blob in self._blobs.values())
+            spilled = [blob for blob in self._blobs.values() if blob.data is None]
+            sessions = {session for blob in self._blobs.values() for session in blob.sessions}
+            return {"blobs": len(self._blobs), "sessions": len(sessions), "memory_bytes": self.memory_bytes,
+                    "max_memory_bytes": self.max_memory_bytes, "spilled_blobs": len(spilled),
+                    "spilled_bytes": sum(blob.size for blob in spilled), "stored_bytes": stored,
+                    "logical_bytes": logical, "saved_bytes": logical - stored, "spills": self.spills}
+
+
+def _remove_files(paths):
+    for path in paths:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def get_blob_store(spill_dir=None, max_memory_mb=None):
+    """
+    The process-wide BlobStore. spill_dir and max_memory_mb fall back to the
+    TALENTTUNE_BLOB_SPILL_DIR and TALENTTUNE_BLOB_MEMORY_MB environment variables;
+    the first call configures the store.
+    """
+    def build():
+        memory_mb = max_memory_mb or os.environ.get("TALENTTUNE_BLOB_MEMORY_MB", DEFAULT_MEMORY_MB)
+        return BlobStore(max_memory_bytes=int(float(memory_mb) * 1024 * 1024),
+                         spill_dir=spill_dir or os.environ.get("TALENTTUNE_BLOB_SPILL_DIR"))
+
+    return get_resource("blob_store", build)
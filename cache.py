@@ -0,0 +1,162 @@
+import hashlib
+import os
+import sys
+import threading
+from collections import OrderedDict
+
+
+def content_hash(data):
+    """Returns the SHA-256 hex digest of bytes or text, used as a cache key."""
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    return hashlib.sha256(data).hexdigest()
+
+
+def payload_size(value):
+    """Approximates the memory held by a cached value in bytes."""
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return len(value)
+    if isinstance(value, str):
+        return len(value.encode("utf-8"))
+    if isinstance(value, (tuple, list)):
+        return sum(payload_size(item) for item in value)
+    if isinstance(value, dict):
+        return sum(payload_size(k) + payload_size(v) for k, v in value.items())
+    return sys.getsizeof(value)
+
+
+class LRUCache:
+    """
+    Thread-safe LRU cache bounded by entry count and total payload size.
+    Lives at module level so it is shared by every Streamlit session in the process.
+    """
+
+    def __init__(self, max_entries=128, max_bytes=64 * 1024 * 1024, sizeof=payload_size):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._sizeof = sizeof
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key][0]
+            self.misses += 1
+            return default
+
+    def put(self, key, value):
+        size = self._sizeof(value)
+        with self._lock:
+            if key in self._data:
+                self.current_bytes -= self._data.pop(key)[1]
+            if size > self.max_bytes:
+                # Never cache a single value bigger than the whole budget.
+                return value
+            self._data[key] = (value, size)
+            self.current_bytes += size
+            while len(self._data) > self.max_entries or self.current_bytes > self.max_bytes:
+                _, (_, evicted_size) = self._data.popitem(last=False)
+                self.current_bytes -= evicted_size
+                self.evictions += 1
+        return value
+
+    def get_or_compute(self, key, compute):
+        """Returns the cached value for key, calling compute() and storing it on a miss."""
+        sentinel = object()
+        value = self.get(key, sentinel)
+        if value is sentinel:
+            value = self.put(key, compute())
+        return value
+
+    def pop(self, key, default=None):
+        with self._lock:
+            if key not in self._data:
+                return default
+            value, size = self._data.pop(key)
+            self.current_bytes -= size
+            return value
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.current_bytes = 0
+
+    def stats(self):
+        """Returns hit/miss counters and current usage for display or logging."""
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._data),
+            "bytes": self.current_bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+
+# Extracted (PII-cleaned) resume text, or a PDF's page texts, keyed by kind and a hash of the uploaded file bytes.
+extraction_cache = LRUCache(
+    max_entries=int(os.environ.get("TALENTTUNE_EXTRACT_CACHE_ENTRIES", 256)),
+    max_bytes=int(os.environ.get("TALENTTUNE_EXTRACT_CACHE_MB", 32)) * 1024 * 1024,
+)
+
+
+def cached_extract(file_bytes, kind, extract):
+    """
+    Runs extract() only if this exact upload has not been extracted before.
+    kind distinguishes "pdf" and "docx" so the same bytes never collide across parsers.
+    """
+    key = (kind, content_hash(file_bytes))
+    return extraction_cache.get_or_compute(key, extract)
+
+
+# Serialized DOCX bytes and candidate name keyed by (template id, formatted text hash, asset version).
+render_cache = LRUCache(
+    max_entries=int(os.environ.get("TALENTTUNE_RENDER_CACHE_ENTRIES", 128)),
+    max_bytes=int(os.environ.get("TALENTTUNE_RENDER_CACHE_MB", 64)) * 1024 * 1024,
+)
+
+
+def asset_version(*paths):
+    """Fingerprints template assets by mtime and size so edited files invalidate cached renders."""
+    parts = []
+    for path in paths:
+        try:
+            stat = os.stat(path)
+            parts.append(f"{path}:{stat.st_mtime_ns}:{stat.st_size}")
+        except OSError:
+            parts.append(f"{path}:missing")
+    return "|".join(parts)
+
+
+def render_key(template_id, formatted_text, assets=()):
+    return (template_id, content_hash(formatted_text), asset_version(*assets))
+
+
+def cached_render(template_id, formatted_text, convert, assets=()):
+    """
+    Returns (docx_bytes, candidate_name) for formatted_text, building the document with
+    convert() only on the first request for this template, text and asset version.
+    """
+    key = render_key(template_id, formatted_text, assets)
+
+    def render():
+        buffer, candidate_name = convert(formatted_text)
+        return buffer.getvalue(), candidate_name
+
+    return render_cache.get_or_compute(key, render)
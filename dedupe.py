@@ -0,0 +1,178 @@
+"""
+Near-duplicate resume detection, so a re-uploaded or lightly edited resume can reuse the
+formatted result of an earlier LLM call instead of paying for a new one.
+
+Each resume's cleaned text is reduced to a MinHash signature over word shingles; the
+fraction of equal signature slots estimates the Jaccard similarity of the two texts.
+Signatures are banded for locality-sensitive hashing, so a lookup only compares against
+resumes that share at least one band rather than scanning the whole store.
+numpy is imported where it is used so that importing this module stays cheap.
+"""
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from functools import lru_cache
+
+from preprocess import compress
+
+
+NUM_PERM = 128
+BANDS = 32  # 4 rows per band: pairs above ~0.6 similarity almost always share a band
+SHINGLE_WORDS = 3
+DEFAULT_THRESHOLD = 0.9
+_MERSENNE_PRIME = (1 << 61) - 1
+_WORD = re.compile(r"\w+")
+
+
+@lru_cache(maxsize=None)
+def _permutations(num_perm, seed=1):
+    import numpy as np
+
+    rng = np.random.RandomState(seed)
+    return (rng.randint(1, 1 << 32, size=num_perm, dtype="uint64"),
+            rng.randint(0, 1 << 32, size=num_perm, dtype="uint64"))
+
+
+def shingles(text, size=SHINGLE_WORDS):
+    """32-bit hashes of the overlapping word n-grams of text, after compress() cleans it up."""
+    words = _WORD.findall(compress(text)[0].lower())
+    if len(words) < size:
+        words = words + [""] * (size - len(words))
+    return {zlib.crc32(" ".join(words[i:i + size]).encode("utf-8")) for i in range(len(words) - size + 1)}
+
+
+def minhash(text, num_perm=NUM_PERM):
+    """MinHash signature of text as a uint32 array of num_perm slots."""
+    import numpy as np
+
+    a, b = _permutations(num_perm)
+    hashes = np.fromiter(shingles(text), dtype="uint64")
+    # (a * h + b) mod p stays below 2**64 because a, h and b are all below 2**32.
+    permuted = (np.outer(hashes, a) + b) % _MERSENNE_PRIME
+    return (permuted.min(axis=0) & 0xFFFFFFFF).astype("uint32")
+
+
+def similarity(signature, other):
+    """Estimated Jaccard similarity of the texts behind two signatures."""
+    return float((signature == other).mean())
+
+
+def band_buckets(signature, bands=BANDS):
+    """One signed 64-bit bucket id per band, as stored in SQLite."""
+    rows = len(signature) // bands
+    return [int.from_bytes(hashlib.blake2b(signature[band * rows:(band + 1) * rows].tobytes(), digest_size=8).digest(),
+                           "big", signed=True) for band in range(bands)]
+
+
+class DuplicateIndex:
+    """
+    SQLite-backed store of previously formatted resumes: MinHash signatures, their LSH
+    band buckets and the formatted text produced for each template.
+    """
+
+    def __init__(self, path, threshold=DEFAULT_THRESHOLD):
+        self.path = path
+        self.threshold = threshold
+        self._lock = threading.Lock()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """CREATE TABLE IF NOT EXISTS documents (
+                    doc_id TEXT PRIMARY KEY,
+                    source TEXT NOT NULL,
+                    signature BLOB NOT NULL,
+                    created REAL NOT NULL,
+                    candidate_id TEXT
+                )"""
+            )
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(documents)")}
+            if "candidate_id" not in columns:  # index files created before candidate ids were stored
+                conn.execute("ALTER TABLE documents ADD COLUMN candidate_id TEXT")
+            conn.execute("CREATE TABLE IF NOT EXISTS bands (band INTEGER NOT NULL, bucket INTEGER NOT NULL, doc_id TEXT NOT NULL)")
+            conn.execute("CREATE INDEX IF NOT EXISTS bands_bucket ON bands (bucket)")
+            conn.execute("CREATE INDEX IF NOT EXISTS bands_doc ON bands (doc_id)")
+            conn.execute(
+                """CREATE TABLE IF NOT EXISTS results (
+                    doc_id TEXT NOT NULL,
+                    template TEXT NOT NULL,
+                    formatted TEXT NOT NULL,
+                    PRIMARY KEY (doc_id, template)
+                )"""
+            )
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30)
+
+    def find(self, text, template_ids=None, exclude_candidate=None):
+        """
+        Returns the most similar earlier resume at or above the threshold that has results
+        for every template in template_ids (any template when None), as a dict with
+        doc_id, source, candidate_id, similarity and results ({template: formatted text});
+        else None. Resumes recorded under exclude_candidate (the upload itself) are skipped.
+        """
+        import numpy as np
+
+        signature = minhash(text)
+        buckets = band_buckets(signature)
+        placeholders = ",".join("?" * len(buckets))
+        with self._connect() as conn:
+            rows = conn.execute(f"SELECT DISTINCT band, bucket, doc_id FROM bands WHERE bucket IN ({placeholders})",
+                                buckets).fetchall()
+            candidates = {doc_id for band, bucket, doc_id in rows if buckets[band] == bucket}
+            best = None
+            for doc_id in candidates:
+                source, stored, candidate_id = conn.execute(
+                    "SELECT source, signature, candidate_id FROM documents WHERE doc_id = ?", (doc_id,)).fetchone()
+                if exclude_candidate is not None and candidate_id == exclude_candidate:
+                    continue
+                score = similarity(signature, np.frombuffer(stored, dtype="uint32"))
+                if score >= self.threshold and (best is None or score > best["similarity"]):
+                    results = dict(conn.execute("SELECT template, formatted FROM results WHERE doc_id = ?", (doc_id,)))
+                    if results and all(template_id in results for template_id in (template_ids or ())):
+                        best = {"doc_id": doc_id, "source": source, "candidate_id": candidate_id,
+                                "similarity": score, "results": results}
+        return best
+
+    def add(self, text, results, source="", candidate_id=None):
+        """Records the formatted results ({template: formatted text}) produced for text."""
+        signature = minhash(text)
+        doc_id = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        with self._lock, self._connect() as conn:
+            conn.execute("INSERT OR REPLACE INTO documents (doc_id, source, signature, created, candidate_id) "
+                         "VALUES (?, ?, ?, ?, ?)", (doc_id, source, signature.tobytes(), time.time(), candidate_id))
+            conn.execute("DELETE FROM bands WHERE doc_id = ?", (doc_id,))
+            conn.executemany("INSERT INTO bands (band, bucket, doc_id) VALUES (?, ?, ?)",
+                             [(band, bucket, doc_id) for band, bucket in enumerate(band_buckets(signature))])
+            conn.executemany("INSERT OR REPLACE INTO results (doc_id, template, formatted) VALUES (?, ?, ?)",
+                             [(doc_id, template_id, formatted) for template_id, formatted in results.items()])
+        return doc_id
+
+    def stats(self):
+        with self._connect() as conn:
+            documents = conn.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+        return {"documents": documents, "threshold": self.threshold}
+
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def get_duplicate_index(path=None):
+    """
+    Returns the shared DuplicateIndex for path, falling back to the TALENTTUNE_DUPLICATE_INDEX
+    environment variable. Returns None when duplicate detection is not configured (it is opt-in).
+    """
+    path = path or os.environ.get("TALENTTUNE_DUPLICATE_INDEX")
+    if not path:
+        return None
+    with _indexes_lock:
+        if path not in _indexes:
+            _indexes[path] = DuplicateIndex(
+                path, threshold=float(os.environ.get("TALENTTUNE_DUPLICATE_THRESHOLD", DEFAULT_THRESHOLD)))
+        return _indexes[path]
@@ -0,0 +1,128 @@
+"""
+Streaming DOCX text extraction.
+
+word/document.xml and the header and footer parts are read straight from the ZIP with
+lxml's iterparse, so the python-docx object model is never built and finished body
+elements are freed as the parse moves on. Unlike reading doc.paragraphs it keeps:
+  - table cells, one line per row with cells joined by " | " (nested tables inline);
+  - text boxes (the DrawingML copy; the VML fallback duplicate is skipped);
+  - headers and footers, before and after the body, each distinct line once.
+Runs are joined the way python-docx joins them: w:tab becomes a tab, w:br/w:cr a newline.
+"""
+import io
+import re
+import zipfile
+
+from lxml import etree
+
+
+W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+MC_FALLBACK = "{http://schemas.openxmlformats.org/markup-compatibility/2006}Fallback"
+DOCUMENT_PART = "word/document.xml"
+HEADER_PART = re.compile(r"word/header(\d*)\.xml$")
+FOOTER_PART = re.compile(r"word/footer(\d*)\.xml$")
+CELL_SEPARATOR = " | "
+
+_P, _R, _T, _TC, _TR = W + "p", W + "r", W + "t", W + "tc", W + "tr"
+_RUN_TEXT = {W + "tab": "\t", W + "br": "\n", W + "cr": "\n", W + "noBreakHyphen": "-"}
+# Elements whose children are the top-level blocks of a part; finished blocks are freed.
+_PART_ROOTS = {W + "body", W + "hdr", W + "ftr"}
+
+
+def iter_part_lines(source):
+    """Yields the paragraphs and table rows of one WordprocessingML part in document order."""
+    paragraphs = []  # text pieces of each open paragraph (text boxes nest inside paragraphs)
+    cells = []       # lines of each open table cell
+    rows = []        # cell texts of each open table row
+    fallback = 0
+    lines = []
+
+    def emit(line):
+        if cells:
+            cells[-1].append(line)
+        else:
+            lines.append(line)
+
+    for event, elem in etree.iterparse(source, events=("start", "end"), huge_tree=True):
+        tag = elem.tag
+        if tag == MC_FALLBACK:
+            fallback += 1 if event == "start" else -1
+            continue
+        if fallback:
+            continue
+        if event == "start":
+            if tag == _P:
+                paragraphs.append([])
+            elif tag == _TC:
+                cells.append([])
+            elif tag == _TR:
+                rows.append([])
+            continue
+
+        parent = elem.getparent()
+        if tag == _T:
+            if paragraphs:
+                paragraphs[-1].append(elem.text or "")
+        elif tag in _RUN_TEXT:
+            # w:tab also marks tab stops in paragraph properties; only run children are text.
+            if paragraphs and parent is not None and parent.tag == _R:
+                paragraphs[-1].append(_RUN_TEXT[tag])
+        elif tag == _P:
+            emit("".join(paragraphs.pop()))
+        elif tag == _TC:
+            text = " ".join(line.strip() for line in cells.pop() if line.strip())
+            if rows:
+                rows[-1].append(text)
+        elif tag == _TR:
+            row = rows.pop()
+            if any(row):
+                emit(CELL_SEPARATOR.join(row))
+
+        if parent is not None and parent.tag in _PART_ROOTS:
+            elem.clear()
+            while elem.getprevious() is not None:
+                del parent[0]
+        if lines and not cells:
+            yield from lines
+            lines.clear()
+
+
+def _distinct(lines, seen):
+    for line in lines:
+        key = line.strip()
+        if key and key not in seen:
+            seen.add(key)
+            yield line
+
+
+def iter_lines(file):
+    """
+    Yields the text lines of a DOCX given as a path or a seekable file-like object:
+    header lines, then the body, then footer lines.
+    """
+    with zipfile.ZipFile(file) as archive:
+        names = archive.namelist()
+        if DOCUMENT_PART not in names:
+            raise ValueError("Not a Word document: word/document.xml is missing")
+
+        header_parts = sorted((name for name in names if HEADER_PART.match(name)),
+                              key=lambda name: int(HEADER_PART.match(name).group(1) or 0))
+        footer_parts = sorted((name for name in names if FOOTER_PART.match(name)),
+                              key=lambda name: int(FOOTER_PART.match(name).group(1) or 0))
+        seen = set()
+        for name in header_parts:
+            with archive.open(name) as part:
+                yield from _distinct(iter_part_lines(part), seen)
+        with archive.open(DOCUMENT_PART) as part:
+            yield from iter_part_lines(part)
+        seen = set()
+        for name in footer_parts:
+            with archive.open(name) as part:
+                yield from _distinct(iter_part_lines(part), seen)
+
+
+def extract_text(file):
+    """The text of a DOCX (path, bytes or file-like object), one line per paragraph or table row."""
+    if isinstance(file, (bytes, bytearray)):
+        file = io.BytesIO(file)
+    return "\n".join(iter_lines(file))
@@ -0,0 +1,141 @@
+"""
+Compiled DOCX templates shared by both renderers.
+
+A template document is parsed once per process, the renderer's named paragraph and
+character styles are registered on it, and every render starts from a deep copy. Runs
+then reference a style by name instead of carrying their own font, size and colour
+elements, so building a document is mostly element insertion and the saved XML stays
+small however many jobs a resume has.
+
+Style names are resolved to style ids once per template: python-docx resolves a name on
+every add_run/add_paragraph call by scanning the whole styles part, which would cost more
+than the formatting it replaces. Use add_run/add_paragraph below with template.style_ids.
+"""
+import copy
+
+from docx import Document
+from docx.enum.style import WD_STYLE_TYPE
+from docx.enum.text import WD_TAB_ALIGNMENT
+from docx.oxml import OxmlElement
+from docx.oxml.ns import qn
+
+from resources import get_resource
+
+
+class CompiledTemplate:
+    """A parsed template document prepared by setup(doc); new_document() returns a fresh copy."""
+
+    def __init__(self, path=None, setup=None):
+        self._document = Document(path)
+        if setup is not None:
+            setup(self._document)
+        self.style_ids = {style.name: style.style_id for style in self._document.styles}
+
+    def new_document(self):
+        return copy.deepcopy(self._document)
+
+
+def compiled_template(key, path=None, setup=None):
+    """The process-wide CompiledTemplate registered under key, built on first use."""
+    return get_resource(("docx_template", key), lambda: CompiledTemplate(path, setup))
+
+
+def add_paragraph(container, text="", style_id=None):
+    """container.add_paragraph(text, style) taking a style id from CompiledTemplate.style_ids."""
+    paragraph = container.add_paragraph(text)
+    if style_id is not None:
+        paragraph._p.style = style_id
+    return paragraph
+
+
+def set_paragraph_style(paragraph, style_id):
+    paragraph._p.style = style_id
+
+
+def add_run(paragraph, text, style_id=None):
+    """paragraph.add_run(text, style) taking a style id from CompiledTemplate.style_ids."""
+    run = paragraph.add_run(text)
+    if style_id is not None:
+        run._r.style = style_id
+    return run
+
+
+def _no_borders():
+    borders = OxmlElement("w:tblBorders")
+    for border_name in ("top", "left", "bottom", "right", "insideH", "insideV"):
+        border = OxmlElement(f"w:{border_name}")
+        border.set(qn("w:val"), "nil")
+        borders.append(border)
+    return borders
+
+
+_NO_BORDERS = _no_borders()
+# Children of w:tblPr that must come after w:tblBorders in the schema sequence.
+_AFTER_TBL_BORDERS = ("w:shd", "w:tblLayout", "w:tblCellMar", "w:tblLook", "w:tblCaption", "w:tblDescription")
+
+
+def set_table_no_border(table):
+    """
+    Removes every border of table with one table-level w:tblBorders, which also overrides
+    the borders of a table style such as 'Table Grid', instead of a w:tcBorders per cell.
+    """
+    tbl_pr = table._tbl.tblPr
+    existing = tbl_pr.find(qn("w:tblBorders"))
+    if existing is not None:
+        tbl_pr.remove(existing)
+    tbl_pr.insert_element_before(copy.deepcopy(_NO_BORDERS), *_AFTER_TBL_BORDERS)
+
+
+def table_rows(table):
+    """
+    The cells of table as a list of rows, collected in one pass. table.cell(r, c) walks
+    every cell of the table on each call, so filling a table through it is quadratic.
+    """
+    return [row.cells for row in table.rows]
+
+
+def set_font(font, name=None, size=None, bold=None, italic=None, underline=None, color=None):
+    if name is not None:
+        font.name = name
+        # Theme font attributes win over an explicit name, so drop them (headings use them).
+        r_fonts = font.element.rPr.find(qn("w:rFonts"))
+        for attribute in ("w:asciiTheme", "w:hAnsiTheme", "w:eastAsiaTheme", "w:cstheme"):
+            r_fonts.attrib.pop(qn(attribute), None)
+    if size is not None:
+        font.size = size
+    if bold is not None:
+        font.bold = bold
+    if italic is not None:
+        font.italic = italic
+    if underline is not None:
+        font.underline = underline
+    if color is not None:
+        font.color.rgb = color
+
+
+def add_character_style(doc, style_name, **font):
+    """Registers a character style; font takes the keyword arguments of set_font()."""
+    style = doc.styles.add_style(style_name, WD_STYLE_TYPE.CHARACTER)
+    set_font(style.font, **font)
+    return style
+
+
+def add_paragraph_style(doc, style_name, base="Normal", space_before=None, space_after=None, left_indent=None,
+                        first_line_indent=None, right_tab=None, **font):
+    """Registers a paragraph style based on base, with optional spacing, indents and a right tab stop."""
+    style = doc.styles.add_style(style_name, WD_STYLE_TYPE.PARAGRAPH)
+    style.base_style = doc.styles[base]
+    paragraph_format = style.paragraph_format
+    if space_before is not None:
+        paragraph_format.space_before = space_before
+    if space_after is not None:
+        paragraph_format.space_after = space_after
+    if left_indent is not None:
+        paragraph_format.left_indent = left_indent
+    if first_line_indent is not None:
+        paragraph_format.first_line_indent = first_line_indent
+    if right_tab is not None:
+        paragraph_format.tab_stops.add_tab_stop(right_tab, WD_TAB_ALIGNMENT.RIGHT)
+    if font:
+        set_font(style.font, **font)
+    return style
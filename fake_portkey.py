@@ -0,0 +1,263 @@
+"""
+Offline stand-ins for the Portkey client. FakePortkey and FakeAsyncPortkey mirror the
+small part of the SDK the app uses (chat.completions.create) so the pipeline can run
+without credentials or network access. FakePortkeyServer goes one level lower: a local
+HTTP endpoint the real SDK can be pointed at, to exercise connection pooling end to end.
+"""
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+
+
+SAMPLE_TEMPLATE_1 = """FullName: Jane Doe
+
+Professional Summary:
+Data engineer with 8 years of experience building cloud data platforms.
+
+Roles:
+Data Engineer, ETL Developer
+
+Technologies:
+ETL Tools: Informatica, IICS
+Cloud: AWS S3, Glue, Redshift
+
+Education:
+B.Tech Computer Science
+
+Certifications:
+- AWS Certified Solutions Architect
+
+Geographic locale:
+Hyderabad, India
+
+---JOB START---
+CompanyName: Acme Corp
+Role: Senior Data Engineer
+Duration: Jan 2020 - Present
+Client: Globex
+Description: Built an enterprise data lake on AWS.
+Responsibilities:
+- Designed batch and streaming ingestion pipelines
+- Led a team of four engineers
+---JOB END---
+"""
+
+SAMPLE_TEMPLATE_2 = """FullName: Jane Doe
+Designation: Senior Data Engineer
+
+ProfessionalOverviewSummary:
+Data engineer with 8 years of experience building cloud data platforms.
+
+ProfessionalOverviewTable:
+Roles | Data Engineer, ETL Developer
+Solutions | Data Lakes, Data Warehousing
+Industries | Retail, Financial Services
+Technologies | AWS, Informatica, Python
+
+KeyEngagementsTable:
+Client | Role | Description
+Globex | Senior Data Engineer | Enterprise data lake on AWS
+
+Education:
+B.Tech Computer Science
+
+Publications:
+None
+
+ProfessionalTrainingCertifications:
+AWS Certified Solutions Architect
+
+GeographicLocale:
+Hyderabad, India
+
+---JOB START---
+CompanyName: Acme Corp
+Role: Senior Data Engineer
+Duration: Jan 2020 – Present
+Client: Globex
+Responsibilities:
+- Designed batch and streaming ingestion pipelines
+- Led a team of four engineers
+---JOB END---
+"""
+
+
+def default_reply(prompt):
+    """Returns a canned response in whichever tagged format the prompt asks for."""
+    if "ProfessionalOverviewTable" in prompt:
+        return SAMPLE_TEMPLATE_2
+    return SAMPLE_TEMPLATE_1
+
+
+def _response(content):
+    message = SimpleNamespace(role="assistant", content=content)
+    return SimpleNamespace(choices=[SimpleNamespace(index=0, message=message, finish_reason="stop")])
+
+
+def _stream(content, chunk_size, delay):
+    for start in range(0, len(content), chunk_size):
+        if delay:
+            time.sleep(delay)
+        delta = SimpleNamespace(role="assistant", content=content[start:start + chunk_size])
+        yield SimpleNamespace(choices=[SimpleNamespace(index=0, delta=delta, finish_reason=None)])
+
+
+class _Completions:
+    def __init__(self, owner):
+        self._owner = owner
+
+    def create(self, model, messages, stream=False, **kwargs):
+        owner = self._owner
+        prompt = messages[-1]["content"]
+        owner.calls.append({"model": model, "prompt": prompt, "stream": stream, **kwargs})
+        if owner.latency:
+            time.sleep(owner.latency)
+        if owner.error is not None:
+            raise owner.error
+        if stream:
+            return _stream(owner.reply(prompt), owner.chunk_size, owner.chunk_delay)
+        return _response(owner.reply(prompt))
+
+
+class FakePortkey:
+    """
+    Records every request in .calls and answers with reply(prompt).
+    latency simulates time to first token and chunk_delay the gap between streamed
+    chunks; error, when set, is raised instead of answering.
+    """
+
+    def __init__(self, reply=default_reply, latency=0.0, error=None, chunk_size=16, chunk_delay=0.0, **kwargs):
+        self.reply = reply
+        self.latency = latency
+        self.error = error
+        self.chunk_size = chunk_size
+        self.chunk_delay = chunk_delay
+        self.calls = []
+        self.chat = SimpleNamespace(completions=_Completions(self))
+
+
+class _AsyncCompletions:
+    def __init__(self, owner):
+        self._owner = owner
+
+    async def create(self, model, messages, **kwargs):
+        owner = self._owner
+        prompt = messages[-1]["content"]
+        owner.calls.append({"model": model, "prompt": prompt, **kwargs})
+        if owner.latency:
+            await asyncio.sleep(owner.latency)
+        if owner.error is not None:
+            raise owner.error
+        return _response(owner.reply(prompt))
+
+
+class FakeAsyncPortkey(FakePortkey):
+    """asyncio counterpart of FakePortkey; latency is awaited so concurrent calls overlap."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.chat = SimpleNamespace(completions=_AsyncCompletions(self))
+        self.closed = False
+
+    async def close(self):
+        self.closed = True
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        server = self.server
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        prompt = body.get("messages", [{}])[-1].get("content", "")
+        with server.lock:
+            server.requests += 1
+            server.connections.add(self.client_address)
+        if server.latency:
+            time.sleep(server.latency)
+        content = server.reply(prompt)
+
+        if body.get("stream"):
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            for start in range(0, len(content), 16):
+                delta = {"role": "assistant", "content": content[start:start + 16]}
+                event = {"id": "fake", "object": "chat.completion.chunk", "created": int(time.time()),
+                         "model": body.get("model"), "choices": [{"index": 0, "delta": delta, "finish_reason": None}]}
+                self._write_chunk(f"data: {json.dumps(event)}\n\n".encode())
+            self._write_chunk(b"data: [DONE]\n\n")
+            self._write_chunk(b"")
+            return
+
+        payload = json.dumps({
+            "id": "fake", "object": "chat.completion", "created": int(time.time()), "model": body.get("model"),
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": len(prompt) // 4, "completion_tokens": len(content) // 4,
+                      "total_tokens": (len(prompt) + len(content)) // 4},
+        }).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _write_chunk(self, data):
+        self.wfile.write(f"{len(data):X}\r\n".encode() + data + b"\r\n")
+        self.wfile.flush()
+
+
+class FakePortkeyServer:
+    """
+    Local OpenAI-compatible /chat/completions endpoint for exercising the real SDK.
+    .requests counts calls and .connections records distinct client sockets, so
+    connection reuse can be checked (many requests, few connections).
+
+        with FakePortkeyServer(latency=0.2) as server:
+            complete(prompt, "key", server.base_url)
+    """
+
+    def __init__(self, reply=default_reply, latency=0.0, host="127.0.0.1", port=0):
+        self._httpd = ThreadingHTTPServer((host, port), _Handler)
+        self._httpd.daemon_threads = True
+        self._httpd.reply = reply
+        self._httpd.latency = latency
+        self._httpd.lock = threading.Lock()
+        self._httpd.requests = 0
+        self._httpd.connections = set()
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    @property
+    def requests(self):
+        return self._httpd.requests
+
+    @property
+    def connections(self):
+        return self._httpd.connections
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
@@ -0,0 +1,194 @@
+"""
+Background job queue for work that should not hold a Streamlit script thread, such as
+the LLM round-trip behind "Format Resume".
+
+Jobs and their results are stored in SQLite under a job id, and run on an in-process
+worker pool. The UI keeps only the id (in the page URL), so it can poll a job and pick
+the result up again after a page refresh. Payloads are stored too: jobs left queued or
+running by a restart are run again once a handler for their kind is registered.
+mark_applied() records that a result's side effects have happened, so a job reopened
+from its URL in another session does not repeat them.
+One process should own a queue file; separate processes would each re-run those jobs.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+
+DEFAULT_WORKERS = 4
+DEFAULT_MAX_PENDING = 32
+DEFAULT_TTL_SECONDS = 24 * 3600
+PENDING = ("queued", "running")
+
+
+class QueueFull(Exception):
+    """Raised by submit() when max_pending jobs are already queued or running."""
+
+
+class JobQueue:
+    """
+    SQLite-backed job store with an in-process worker pool. Handlers are registered per
+    job kind as handler(payload, update) and return a JSON-serializable result; they may
+    call update(progress=..., partial=...) to publish progress while they run.
+    Finished jobs are kept for ttl_seconds.
+    """
+
+    def __init__(self, path, workers=DEFAULT_WORKERS, max_pending=DEFAULT_MAX_PENDING, ttl_seconds=DEFAULT_TTL_SECONDS):
+        self.path = path
+        self.workers = workers
+        self.max_pending = max_pending
+        self.ttl_seconds = ttl_seconds
+        self._handlers = {}
+        self._running = set()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="talenttune-job")
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """CREATE TABLE IF NOT EXISTS jobs (
+                    job_id TEXT PRIMARY KEY,
+                    kind TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    result TEXT,
+                    error TEXT,
+                    progress TEXT,
+                    partial TEXT,
+                    created REAL NOT NULL,
+                    updated REAL NOT NULL,
+                    applied INTEGER NOT NULL DEFAULT 0
+                )"""
+            )
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(jobs)")}
+            if "applied" not in columns:  # queue files created before mark_applied()
+                conn.execute("ALTER TABLE jobs ADD COLUMN applied INTEGER NOT NULL DEFAULT 0")
+            conn.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created)")
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30)
+
+    def register(self, kind, handler):
+        """Sets the handler for kind; the first registration also resumes interrupted jobs of that kind."""
+        with self._lock:
+            first = kind not in self._handlers
+            self._handlers[kind] = handler
+        if not first:
+            return
+        with self._connect() as conn:
+            interrupted = [row[0] for row in conn.execute(
+                f"SELECT job_id FROM jobs WHERE kind = ? AND status IN {PENDING} ORDER BY created", (kind,))]
+        for job_id in interrupted:
+            self._start(job_id)
+
+    def _start(self, job_id):
+        with self._lock:
+            if job_id in self._running:
+                return
+            self._running.add(job_id)
+        self._executor.submit(self._run, job_id)
+
+    def submit(self, kind, payload):
+        """Queues a job and returns its id. Raises QueueFull when the queue is at max_pending."""
+        if kind not in self._handlers:
+            raise KeyError(f"No handler registered for job kind {kind!r}")
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            pending = conn.execute(f"SELECT COUNT(*) FROM jobs WHERE status IN {PENDING}").fetchone()[0]
+            if pending >= self.max_pending:
+                raise QueueFull(f"{pending} jobs are already waiting; try again shortly.")
+            if self.ttl_seconds:
+                conn.execute(f"DELETE FROM jobs WHERE status NOT IN {PENDING} AND updated < ?", (now - self.ttl_seconds,))
+            conn.execute(
+                "INSERT INTO jobs (job_id, kind, status, payload, created, updated) VALUES (?, ?, 'queued', ?, ?, ?)",
+                (job_id, kind, json.dumps(payload), now, now),
+            )
+        self._start(job_id)
+        return job_id
+
+    def _set(self, job_id, **fields):
+        fields["updated"] = time.time()
+        assignments = ", ".join(f"{name} = ?" for name in fields)
+        with self._connect() as conn:
+            conn.execute(f"UPDATE jobs SET {assignments} WHERE job_id = ?", (*fields.values(), job_id))
+
+    def _run(self, job_id):
+        try:
+            with self._connect() as conn:
+                kind, payload = conn.execute("SELECT kind, payload FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+            self._set(job_id, status="running", progress="Started")
+
+            def update(progress=None, partial=None):
+                fields = {name: value for name, value in (("progress", progress), ("partial", partial))
+                          if value is not None}
+                if fields:
+                    self._set(job_id, **fields)
+
+            result = self._handlers[kind](json.loads(payload), update)
+            self._set(job_id, status="done", result=json.dumps(result), progress="Done", partial=None)
+        except Exception as e:
+            self._set(job_id, status="failed", error=str(e) or type(e).__name__, partial=None)
+        finally:
+            with self._lock:
+                self._running.discard(job_id)
+
+    def get(self, job_id):
+        """
+        Returns the job as a dict (job_id, kind, status, payload, progress, partial, result,
+        error, created, updated, position for queued jobs), or None for an unknown or expired id.
+        """
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT kind, status, payload, result, error, progress, partial, created, updated FROM jobs WHERE job_id = ?",
+                (job_id,)).fetchone()
+            if row is None:
+                return None
+            kind, status, payload, result, error, progress, partial, created, updated = row
+            position = 0
+            if status == "queued":
+                position = conn.execute("SELECT COUNT(*) FROM jobs WHERE status = 'queued' AND created < ?",
+                                        (created,)).fetchone()[0] + 1
+        return {"job_id": job_id, "kind": kind, "status": status, "payload": json.loads(payload),
+                "progress": progress, "partial": partial,
+                "result": json.loads(result) if result is not None else None, "error": error,
+                "created": created, "updated": updated, "position": position}
+
+    def mark_applied(self, job_id):
+        """Marks a finished job's result as applied. True only for the first call per job."""
+        with self._connect() as conn:
+            return conn.execute("UPDATE jobs SET applied = 1 WHERE job_id = ? AND status = 'done' AND applied = 0",
+                                (job_id,)).rowcount == 1
+
+    def stats(self):
+        with self._connect() as conn:
+            counts = dict(conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+        return {"workers": self.workers, "max_pending": self.max_pending, **counts}
+
+
+_queues = {}
+_queues_lock = threading.Lock()
+
+
+def get_job_queue(path=None, workers=None, max_pending=None):
+    """
+    Returns the shared JobQueue for path, falling back to the TALENTTUNE_JOB_QUEUE environment
+    variable. Returns None when the queue is not configured (it is opt-in). workers and
+    max_pending fall back to TALENTTUNE_JOB_WORKERS and TALENTTUNE_JOB_MAX_PENDING.
+    """
+    path = path or os.environ.get("TALENTTUNE_JOB_QUEUE")
+    if not path:
+        return None
+    with _queues_lock:
+        if path not in _queues:
+            _queues[path] = JobQueue(
+                path,
+                workers=int(workers or os.environ.get("TALENTTUNE_JOB_WORKERS", DEFAULT_WORKERS)),
+                max_pending=int(max_pending or os.environ.get("TALENTTUNE_JOB_MAX_PENDING", DEFAULT_MAX_PENDING)),
+            )
+        return _queues[path]
@@ -0,0 +1,455 @@
+import asyncio
+import collections
+import os
+import random
+import sys
+import threading
+import time
+import weakref
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import metrics
+
+
+MODEL = "@aws-bedrock-use2/us.anthropic.claude-sonnet-4-20250514-v1:0"
+
+# Upper bound on LLM requests in flight per process, shared by every session, batch job and
+# event loop: threads and coroutines take their slots from the same semaphore.
+MAX_IN_FLIGHT = int(os.environ.get("TALENTTUNE_LLM_MAX_IN_FLIGHT", 8))
+REQUEST_TIMEOUT = float(os.environ.get("TALENTTUNE_LLM_TIMEOUT", 120))
+
+# Retry policy: exponential backoff with full jitter inside an overall deadline.
+RETRIES = int(os.environ.get("TALENTTUNE_LLM_RETRIES", 3))
+DEADLINE = float(os.environ.get("TALENTTUNE_LLM_DEADLINE", 300))
+BACKOFF_BASE = float(os.environ.get("TALENTTUNE_LLM_BACKOFF_BASE", 1.0))
+BACKOFF_MAX = float(os.environ.get("TALENTTUNE_LLM_BACKOFF_MAX", 30.0))
+RETRYABLE_STATUS = {408, 409, 425, 429, 500, 502, 503, 504, 529}
+
+# Hedging is off unless enabled: once a request outlives the observed p95 latency
+# (or HEDGE_AFTER until enough samples exist) a duplicate is sent and the first answer wins.
+HEDGE = os.environ.get("TALENTTUNE_LLM_HEDGE", "").lower() in ("1", "true", "yes")
+HEDGE_AFTER = float(os.environ.get("TALENTTUNE_LLM_HEDGE_AFTER", 45))
+HEDGE_MIN_SAMPLES = 20
+
+_clients = {}
+_clients_lock = threading.Lock()
+_in_flight = threading.BoundedSemaphore(MAX_IN_FLIGHT)
+
+# Async clients are bound to the event loop that created them.
+_async_state = weakref.WeakKeyDictionary()
+# How often a coroutine waiting for an in-flight slot checks again, at most.
+SLOT_POLL_MAX = 0.05
+
+_latencies = collections.deque(maxlen=500)
+_hedge_pool = None
+_hedge_pool_lock = threading.Lock()
+
+
+class LLMDeadlineExceeded(TimeoutError):
+    """Raised when retries or hedged attempts cannot finish before the overall deadline."""
+
+
+def status_code(error):
+    code = getattr(error, "status_code", None)
+    if code is None:
+        code = getattr(getattr(error, "response", None), "status_code", None)
+    return code
+
+
+def is_retryable(error):
+    """Throttling, gateway/server errors and dropped connections are worth another attempt."""
+    code = status_code(error)
+    if code is not None:
+        return code in RETRYABLE_STATUS
+    if isinstance(error, (ConnectionError, TimeoutError)):
+        return True
+    # httpx is only loaded once a client exists; an error cannot come from it before then.
+    httpx = sys.modules.get("httpx")
+    if httpx is not None and isinstance(error, httpx.TransportError):
+        return True
+    # The SDK raises OpenAI-style connection/timeout errors; match by name to avoid importing them.
+    return any(cls.__name__ in ("APIConnectionError", "APITimeoutError") for cls in type(error).__mro__)
+
+
+def retry_delay(error, attempt, base=None, cap=None):
+    """Seconds to wait before the next attempt, honouring Retry-After on 429 responses."""
+    base = BACKOFF_BASE if base is None else base
+    cap = BACKOFF_MAX if cap is None else cap
+    if status_code(error) == 429:
+        headers = getattr(getattr(error, "response", None), "headers", None) or {}
+        retry_after = headers.get("retry-after")
+        try:
+            if retry_after is not None:
+                return min(cap, float(retry_after)) + random.uniform(0, base)
+        except ValueError:
+            pass
+        # No hint from the gateway: back off harder than for transient errors.
+        base *= 2
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+def call_with_retry(fn, retries=None, deadline=None, sleep=time.sleep):
+    """
+    Calls fn(end) until it succeeds, retrying retryable errors with jittered backoff.
+    end is the monotonic time by which the whole call must finish (None for no limit).
+    """
+    retries = RETRIES if retries is None else retries
+    deadline = DEADLINE if deadline is None else deadline
+    end = time.monotonic() + deadline if deadline else None
+    attempt = 0
+    while True:
+        try:
+            return fn(end)
+        except Exception as e:
+            if attempt >= retries or not is_retryable(e):
+                raise
+            delay = retry_delay(e, attempt)
+            if end is not None and time.monotonic() + delay >= end:
+                raise LLMDeadlineExceeded(f"LLM call did not succeed within {deadline:g}s: {e}") from e
+            sleep(delay)
+            attempt += 1
+
+
+async def acall_with_retry(fn, retries=None, deadline=None):
+    """asyncio variant of call_with_retry; fn is an async callable taking end."""
+    retries = RETRIES if retries is None else retries
+    deadline = DEADLINE if deadline is None else deadline
+    end = time.monotonic() + deadline if deadline else None
+    attempt = 0
+    while True:
+        try:
+            if end is None:
+                return await fn(end)
+            return await asyncio.wait_for(fn(end), timeout=max(0.0, end - time.monotonic()))
+        except asyncio.TimeoutError as e:
+            raise LLMDeadlineExceeded(f"LLM call did not succeed within {deadline:g}s") from e
+        except Exception as e:
+            if attempt >= retries or not is_retryable(e):
+                raise
+            delay = retry_delay(e, attempt)
+            if end is not None and time.monotonic() + delay >= end:
+                raise LLMDeadlineExceeded(f"LLM call did not succeed within {deadline:g}s: {e}") from e
+            await asyncio.sleep(delay)
+            attempt += 1
+
+
+def hedge_delay():
+    """p95 of recent successful call latencies, or HEDGE_AFTER until enough samples exist."""
+    samples = sorted(_latencies)
+    if len(samples) < HEDGE_MIN_SAMPLES:
+        return HEDGE_AFTER
+    return samples[int(0.95 * (len(samples) - 1))]
+
+
+def _get_hedge_pool():
+    global _hedge_pool
+    with _hedge_pool_lock:
+        if _hedge_pool is None:
+            _hedge_pool = ThreadPoolExecutor(max_workers=MAX_IN_FLIGHT * 2, thread_name_prefix="llm-hedge")
+        return _hedge_pool
+
+
+def hedged_call(fn, hedge_after, end=None):
+    """
+    Runs fn(False); if it has not finished after hedge_after seconds, starts a second copy and
+    returns whichever succeeds first. Raises the first error only if both attempts fail.
+    The copy is only sent when an in-flight slot is free: it takes the slot and runs fn(True),
+    so fn must release one slot without acquiring it. A losing attempt that has not started is
+    cancelled; one already sent ends at its request timeout, which never outlasts end.
+    """
+    pool = _get_hedge_pool()
+    futures = [pool.submit(fn, False)]
+    timeout = hedge_after if end is None else max(0.0, min(hedge_after, end - time.monotonic()))
+    done, _ = wait(futures, timeout=timeout)
+    hedge = None
+    if not done and _in_flight.acquire(blocking=False):
+        try:
+            hedge = pool.submit(fn, True)
+        except BaseException:
+            _in_flight.release()
+            raise
+        futures.append(hedge)
+
+    errors = []
+    try:
+        while futures:
+            timeout = None if end is None else max(0.0, end - time.monotonic())
+            done, _ = wait(futures, timeout=timeout, return_when=FIRST_COMPLETED)
+            if not done:
+                raise LLMDeadlineExceeded("Hedged LLM call did not finish before the deadline")
+            for future in done:
+                futures.remove(future)
+                if future.exception() is None:
+                    return future.result()
+                errors.append(future.exception())
+        raise errors[0]
+    finally:
+        for future in futures:
+            if future.cancel() and future is hedge:
+                _in_flight.release()
+
+
+def _http_limits():
+    import httpx
+    return httpx.Limits(max_connections=MAX_IN_FLIGHT, max_keepalive_connections=MAX_IN_FLIGHT)
+
+
+def make_client(api_key, base_url):
+    """
+    Creates a Portkey client, or the offline stand-in when TALENTTUNE_FAKE_LLM is set.
+    portkey_ai (with the OpenAI SDK it vendors) takes over a second to import, so it is
+    loaded here, on first use, rather than at app start-up.
+    """
+    if os.environ.get("TALENTTUNE_FAKE_LLM"):
+        from fake_portkey import FakePortkey
+        return FakePortkey()
+    import httpx
+    from portkey_ai import Portkey
+    http_client = httpx.Client(limits=_http_limits(), timeout=REQUEST_TIMEOUT)
+    return Portkey(base_url=base_url, api_key=api_key, http_client=http_client)
+
+
+def get_client(api_key, base_url):
+    """
+    Returns the long-lived client for these credentials, creating it on first use.
+    Reusing it keeps HTTP connections and TLS sessions warm across requests.
+    """
+    key = (api_key, base_url)
+    with _clients_lock:
+        if key not in _clients:
+            _clients[key] = make_client(api_key, base_url)
+        return _clients[key]
+
+
+def make_async_client(api_key, base_url):
+    if os.environ.get("TALENTTUNE_FAKE_LLM"):
+        from fake_portkey import FakeAsyncPortkey
+        return FakeAsyncPortkey()
+    import httpx
+    from portkey_ai import AsyncPortkey
+    http_client = httpx.AsyncClient(limits=_http_limits(), timeout=REQUEST_TIMEOUT)
+    return AsyncPortkey(base_url=base_url, api_key=api_key, http_client=http_client)
+
+
+async def _close_clients(clients):
+    while clients:
+        _, client = clients.popitem()
+        close = getattr(client, "close", None)
+        if close is not None:
+            await close()
+
+
+async def _close_at_shutdown(clients):
+    """
+    Parked in every loop that has clients. asyncio.run() and loop.shutdown_asyncgens()
+    finalize pending async generators before the loop closes, which closes the clients.
+    """
+    try:
+        yield
+    finally:
+        await _close_clients(clients)
+
+
+async def _loop_state():
+    loop = asyncio.get_running_loop()
+    state = _async_state.get(loop)
+    if state is None:
+        state = _async_state[loop] = {"clients": {}}
+        state["closer"] = _close_at_shutdown(state["clients"])
+        await state["closer"].asend(None)
+    return state
+
+
+async def get_async_client(api_key, base_url):
+    """Async counterpart of get_client(), shared within the running event loop and closed with it."""
+    clients = (await _loop_state())["clients"]
+    key = (api_key, base_url)
+    if key not in clients:
+        clients[key] = make_async_client(api_key, base_url)
+    return clients[key]
+
+
+async def aclose_async_clients():
+    """Closes the running loop's clients now, for loops that are closed without shutdown_asyncgens()."""
+    state = _async_state.get(asyncio.get_running_loop())
+    if state is not None:
+        await _close_clients(state["clients"])
+
+
+def _messages(prompt):
+    return [{"role": "user", "content": prompt}]
+
+
+def record_tokens(prompt, content, usage=None):
+    """
+    Counts prompt and completion tokens for metrics, from the response usage when the gateway
+    reports it and estimated at four characters per token otherwise.
+    """
+    if not metrics.enabled():
+        return
+    prompt_tokens = getattr(usage, "prompt_tokens", None)
+    completion_tokens = getattr(usage, "completion_tokens", None)
+    counted = "usage"
+    if prompt_tokens is None or completion_tokens is None:
+        prompt_tokens, completion_tokens = (len(prompt) + 3) // 4, (len(content or "") + 3) // 4
+        counted = "estimate"
+    metrics.inc("llm_tokens", prompt_tokens, kind="prompt", counted=counted)
+    metrics.inc("llm_tokens", completion_tokens, kind="completion", counted=counted)
+
+
+def _request_timeout(end):
+    """Timeout for one request: REQUEST_TIMEOUT, cut to the time left before end."""
+    if end is None:
+        return REQUEST_TIMEOUT
+    remaining = end - time.monotonic()
+    if remaining <= 0:
+        raise LLMDeadlineExceeded("LLM call did not finish before the deadline")
+    return min(REQUEST_TIMEOUT, remaining)
+
+
+def _acquire_slot(end):
+    if not _in_flight.acquire(timeout=-1 if end is None else _request_timeout(end)):
+        raise LLMDeadlineExceeded("No LLM request slot became free before the deadline")
+
+
+async def _aacquire_slot(end):
+    """_acquire_slot() for coroutines: polls the shared semaphore so the event loop never blocks."""
+    delay = 0.001
+    while not _in_flight.acquire(blocking=False):
+        if end is not None and time.monotonic() + delay >= end:
+            raise LLMDeadlineExceeded("No LLM request slot became free before the deadline")
+        await asyncio.sleep(delay)
+        delay = min(delay * 2, SLOT_POLL_MAX)
+
+
+def _create(client, model, prompt, end=None, slot_held=False):
+    """One chat completion within an in-flight slot (already taken when slot_held), finishing by end."""
+    if not slot_held:
+        _acquire_slot(end)
+    try:
+        # Timed from here, so the p95 used for hedging excludes waiting for a slot.
+        started = time.monotonic()
+        response = client.chat.completions.create(model=model, messages=_messages(prompt),
+                                                  timeout=_request_timeout(end))
+        _latencies.append(time.monotonic() - started)
+    finally:
+        _in_flight.release()
+    content = response.choices[0].message.content
+    record_tokens(prompt, content, getattr(response, "usage", None))
+    return content
+
+
+def complete(prompt, api_key, base_url, model=MODEL, client=None, cache=None, refresh=False, hedge=None):
+    """
+    Sends prompt to the model and returns the response text.
+    When a ResponseCache is given, a stored response is reused unless refresh is True,
+    and fresh responses are written back to it. Transient failures are retried within
+    DEADLINE, and each request's timeout is cut to the time left before it; hedge
+    (default HEDGE) duplicates requests that outlive the p95 latency.
+    """
+    if cache is not None and not refresh:
+        cached = cache.get(model, prompt)
+        if cached is not None:
+            metrics.inc("llm_cache_hits")
+            return cached
+
+    client = client or get_client(api_key, base_url)
+    hedge = HEDGE if hedge is None else hedge
+
+    def attempt(end):
+        if hedge:
+            return hedged_call(lambda slot_held: _create(client, model, prompt, end, slot_held), hedge_delay(), end)
+        return _create(client, model, prompt, end)
+
+    with metrics.timed("llm_call", mode="complete"):
+        content = call_with_retry(attempt)
+
+    if cache is not None and content:
+        cache.put(model, prompt, content)
+    return content
+
+
+def stream_complete(prompt, api_key, base_url, model=MODEL, client=None, cache=None, refresh=False):
+    """
+    Streaming variant of complete(): yields text chunks as the model produces them.
+    The joined chunks equal what complete() would return; the full text is cached only
+    once the stream finishes, so an interrupted generation is never stored.
+    """
+    if cache is not None and not refresh:
+        cached = cache.get(model, prompt)
+        if cached is not None:
+            metrics.inc("llm_cache_hits")
+            yield cached
+            return
+
+    client = client or get_client(api_key, base_url)
+
+    def open_stream(end):
+        _acquire_slot(end)
+        try:
+            return client.chat.completions.create(model=model, messages=_messages(prompt), stream=True,
+                                                  timeout=_request_timeout(end))
+        except Exception:
+            _in_flight.release()
+            raise
+
+    # Only opening the stream is retried; once text has been yielded a retry would duplicate it.
+    started = time.perf_counter()
+    stream = call_with_retry(open_stream)
+    parts = []
+    usage = None
+    try:
+        for chunk in stream:
+            usage = getattr(chunk, "usage", None) or usage
+            if not chunk.choices:
+                continue
+            piece = chunk.choices[0].delta.content
+            if piece:
+                if not parts:
+                    metrics.observe("llm_first_token", time.perf_counter() - started)
+                parts.append(piece)
+                yield piece
+    finally:
+        _in_flight.release()
+    # Includes the time the consumer spends between chunks: streams are paced by their reader.
+    metrics.observe("llm_call", time.perf_counter() - started, mode="stream")
+    record_tokens(prompt, "".join(parts), usage)
+
+    if cache is not None and parts:
+        cache.put(model, prompt, "".join(parts))
+
+
+async def acomplete(prompt, api_key, base_url, model=MODEL, client=None, cache=None, refresh=False):
+    """
+    asyncio variant of complete(). Requests from the same event loop share one pooled
+    client and take their slots from the same MAX_IN_FLIGHT limit as the threaded calls, so
+    many calls overlap without flooding the gateway. Each request's timeout is cut to the
+    time left before DEADLINE, as in complete().
+    """
+    if cache is not None and not refresh:
+        cached = await asyncio.to_thread(cache.get, model, prompt)
+        if cached is not None:
+            metrics.inc("llm_cache_hits")
+            return cached
+
+    client = client or await get_async_client(api_key, base_url)
+
+    async def attempt(end):
+        await _aacquire_slot(end)
+        try:
+            started = time.monotonic()
+            response = await client.chat.completions.create(model=model, messages=_messages(prompt),
+                                                            timeout=_request_timeout(end))
+            _latencies.append(time.monotonic() - started)
+        finally:
+            _in_flight.release()
+        content = response.choices[0].message.content
+        record_tokens(prompt, content, getattr(response, "usage", None))
+        return content
+
+    with metrics.timed("llm_call", mode="async"):
+        content = await acall_with_retry(attempt)
+
+    if cache is not None and content:
+        await asyncio.to_thread(cache.put, model, prompt, content)
+    return content
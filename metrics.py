@@ -0,0 +1,256 @@
+"""
+Per-stage latency histograms and counters for the formatting pipeline.
+
+Recording is off unless enabled (TALENTTUNE_METRICS=1, or enable() from the app); while
+off, instrumented functions cost one flag check per call. Stages nest: extract_pdf
+includes the clean_pii time of its pages, convert_to_docx includes docx_save. Generator
+stages (page-by-page extraction) count only the time spent producing items, not the
+time the consumer holds each one.
+
+Metrics live in this process. Batch extraction and rendering run in worker processes,
+so those stages are only recorded when the batch runs them in-process.
+"""
+import bisect
+import functools
+import inspect
+import json
+import math
+import os
+import threading
+import time
+
+
+# Upper bounds in seconds, from a regex pass over one page to a slow LLM call.
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, math.inf)
+PREFIX = "talenttune"
+
+_enabled = os.environ.get("TALENTTUNE_METRICS", "").lower() in ("1", "true", "yes")
+
+
+class Histogram:
+    """Counts of observations per bucket (non-cumulative) with their sum, as Prometheus buckets them."""
+
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q):
+        """Estimate of the q-quantile, interpolating linearly inside the bucket that holds it."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            if count and seen + count >= rank:
+                lower = self.buckets[index - 1] if index else 0.0
+                upper = self.buckets[index]
+                if math.isinf(upper):
+                    return lower
+                return lower + (upper - lower) * (rank - seen) / count
+            seen += count
+        return self.buckets[-2]
+
+
+def _key(name, labels):
+    return name, tuple(sorted(labels.items()))
+
+
+def _format_labels(labels, **extra):
+    items = list(labels) + list(extra.items())
+    if not items:
+        return ""
+    return "{" + ",".join(f'{name}="{value}"' for name, value in items) + "}"
+
+
+def _format_bound(bound):
+    return "+Inf" if math.isinf(bound) else repr(bound)
+
+
+class Registry:
+    """Stage histograms (seconds) and counters, keyed by name and labels."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms = {}
+        self._counters = {}
+
+    def observe(self, stage, seconds, **labels):
+        key = _key(stage, labels)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram()
+            histogram.observe(seconds)
+
+    def inc(self, name, value=1, **labels):
+        key = _key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+
+    def snapshot(self):
+        """
+        {"stages": [...], "counters": [...]}: one entry per stage and label set with count,
+        sum, mean and estimated p50/p95 in seconds plus the bucket counts, and one per counter.
+        """
+        with self._lock:
+            histograms = [(key, h.count, h.sum, list(h.counts), h.quantile(0.5), h.quantile(0.95))
+                          for key, h in self._histograms.items()]
+            counters = list(self._counters.items())
+        stages = []
+        for (stage, labels), count, total, counts, p50, p95 in sorted(histograms):
+            stages.append({"stage": stage, "labels": dict(labels), "count": count, "sum": total,
+                           "mean": total / count if count else None, "p50": p50, "p95": p95,
+                           "buckets": {_format_bound(bound): n for bound, n in zip(BUCKETS, counts)}})
+        return {"stages": stages,
+                "counters": [{"name": name, "labels": dict(labels), "value": value}
+                             for (name, labels), value in sorted(counters)]}
+
+    def to_json(self):
+        return json.dumps(self.snapshot(), indent=2)
+
+    def to_prometheus(self):
+        """The metrics in the Prometheus text exposition format."""
+        with self._lock:
+            histograms = sorted((key, list(h.counts), h.sum, h.count) for key, h in self._histograms.items())
+            counters = sorted(self._counters.items())
+        histogram_name = f"{PREFIX}_stage_seconds"
+        lines = [f"# HELP {histogram_name} Time spent in each formatting pipeline stage.",
+                 f"# TYPE {histogram_name} histogram"]
+        for (stage, labels), counts, total, count in histograms:
+            labels = (("stage", stage),) + labels
+            cumulative = 0
+            for bound, n in zip(BUCKETS, counts):
+                cumulative += n
+                lines.append(f"{histogram_name}_bucket{_format_labels(labels, le=_format_bound(bound))} {cumulative}")
+            lines.append(f"{histogram_name}_sum{_format_labels(labels)} {total}")
+            lines.append(f"{histogram_name}_count{_format_labels(labels)} {count}")
+        typed = set()
+        for (name, labels), value in counters:
+            counter_name = f"{PREFIX}_{name}_total"
+            if counter_name not in typed:
+                lines.append(f"# TYPE {counter_name} counter")
+                typed.add(counter_name)
+            lines.append(f"{counter_name}{_format_labels(labels)} {value}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+
+def enable(on=True):
+    global _enabled
+    _enabled = bool(on)
+
+
+def enabled():
+    return _enabled
+
+
+def observe(stage, seconds, **labels):
+    """Records seconds spent in stage; a no-op while metrics are disabled."""
+    if _enabled:
+        REGISTRY.observe(stage, seconds, **labels)
+
+
+def inc(name, value=1, **labels):
+    """Adds value to the counter name; a no-op while metrics are disabled."""
+    if _enabled:
+        REGISTRY.inc(name, value, **labels)
+
+
+class _Timer:
+    __slots__ = ("stage", "labels", "started")
+
+    def __init__(self, stage, labels):
+        self.stage = stage
+        self.labels = labels
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        REGISTRY.observe(self.stage, time.perf_counter() - self.started, **self.labels)
+        return False
+
+
+class _NoTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NO_TIMER = _NoTimer()
+
+
+def timed(stage, **labels):
+    """Context manager recording the time its block takes under stage."""
+    return _Timer(stage, labels) if _enabled else _NO_TIMER
+
+
+def _timed_generator(generator, stage, labels):
+    elapsed = 0.0
+    try:
+        while True:
+            started = time.perf_counter()
+            try:
+                item = next(generator)
+            except StopIteration:
+                elapsed += time.perf_counter() - started
+                return
+            elapsed += time.perf_counter() - started
+            yield item
+    finally:
+        generator.close()
+        REGISTRY.observe(stage, elapsed, **labels)
+
+
+def instrument(stage, **labels):
+    """
+    Decorator recording each call of the function under stage. For generator functions the
+    time spent producing items is summed and recorded once the generator finishes or is closed.
+    """
+    def decorate(fn):
+        if inspect.isgeneratorfunction(fn):
+            @functools.wraps(fn)
+            def generator_wrapper(*args, **kwargs):
+                if not _enabled:
+                    return fn(*args, **kwargs)
+                return _timed_generator(fn(*args, **kwargs), stage, labels)
+
+            return generator_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return fn(*args, **kwargs)
+            started = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                REGISTRY.observe(stage, time.perf_counter() - started, **labels)
+
+        return wrapper
+
+    return decorate
+
+
+def export(fmt="json"):
+    """The current metrics as JSON ("json") or Prometheus text ("prometheus")."""
+    return REGISTRY.to_prometheus() if fmt == "prometheus" else REGISTRY.to_json()
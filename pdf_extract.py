@@ -0,0 +1,184 @@
+"""
+Page-level PDF text extraction with pluggable backends.
+
+Two backends produce text for a range of pages:
+  - "pdfplumber": orders words by position, best layout fidelity (the original behaviour).
+  - "pdfium": pypdfium2's text layer, several times faster, for plain text PDFs. It orders
+    tables, columns and footers differently, so it is only used when asked for.
+
+Long documents are split into page ranges and extracted in a process pool. Output is
+normalized the same way for every backend and worker count, so callers see one format.
+Both libraries are imported on first use so that importing this module stays cheap.
+"""
+import atexit
+import io
+import multiprocessing
+import os
+import re
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+
+# "auto" is pdfplumber; set "pdfium" for the fast path when its text order is acceptable.
+BACKEND = os.environ.get("TALENTTUNE_PDF_BACKEND", "auto")
+# Below this many pages, starting worker processes costs more than it saves.
+PARALLEL_MIN_PAGES = int(os.environ.get("TALENTTUNE_PDF_PARALLEL_MIN_PAGES", 8))
+WORKERS = int(os.environ.get("TALENTTUNE_PDF_WORKERS", os.cpu_count() or 1))
+# Small tasks let the first pages come back early when results are streamed.
+PAGES_PER_TASK = 2
+
+INLINE_SPACE = re.compile(r"[ \t\u00a0]+")
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def normalize_page(text):
+    """Unifies line endings and inline whitespace and drops blank lines."""
+    lines = (INLINE_SPACE.sub(" ", line).strip() for line in text.replace("\r\n", "\n").replace("\r", "\n").split("\n"))
+    return "\n".join(line for line in lines if line)
+
+
+def _pdfium():
+    try:
+        import pypdfium2
+    except ImportError:  # pypdfium2 ships with pdfplumber, but it is only needed for the fast path
+        return None
+    return pypdfium2
+
+
+def _pdfplumber_pages(data, start, stop):
+    import pdfplumber
+    with pdfplumber.open(io.BytesIO(data)) as pdf:
+        for i in range(start, stop):
+            yield pdf.pages[i].extract_text() or ""
+
+
+def _pdfium_pages(data, start, stop):
+    pdf = _pdfium().PdfDocument(data)
+    try:
+        for i in range(start, stop):
+            page = pdf[i]
+            textpage = page.get_textpage()
+            text = textpage.get_text_range()
+            textpage.close()
+            page.close()
+            yield text
+    finally:
+        pdf.close()
+
+
+BACKENDS = {"pdfplumber": _pdfplumber_pages, "pdfium": _pdfium_pages}
+
+
+def page_count(data):
+    pdfium = _pdfium()
+    if pdfium is not None:
+        pdf = pdfium.PdfDocument(data)
+        try:
+            return len(pdf)
+        finally:
+            pdf.close()
+    import pdfplumber
+    with pdfplumber.open(io.BytesIO(data)) as pdf:
+        return len(pdf.pages)
+
+
+def choose_backend(backend=None):
+    backend = backend or BACKEND
+    if backend == "auto":
+        backend = "pdfplumber"
+    if backend == "pdfium" and _pdfium() is None:
+        backend = "pdfplumber"
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown PDF backend {backend!r}; expected one of {sorted(BACKENDS)} or 'auto'")
+    return backend
+
+
+def _extract_range(data, start, stop, backend):
+    """Process-pool worker: normalized text of pages [start, stop)."""
+    return [normalize_page(text) for text in BACKENDS[backend](data, start, stop)]
+
+
+def _shutdown_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+def _get_pool():
+    """
+    The shared worker pool. Workers are started from a fork server (spawned where that is
+    unavailable) rather than forked from the app process and its threads, and the pool is
+    shut down when the interpreter exits.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+            _pool = ProcessPoolExecutor(max_workers=WORKERS, mp_context=multiprocessing.get_context(method))
+            atexit.register(_shutdown_pool)
+        return _pool
+
+
+def page_ranges(pages, parts):
+    """Splits range(pages) into at most parts contiguous, near-equal (start, stop) ranges."""
+    parts = max(1, min(parts, pages))
+    size, extra = divmod(pages, parts)
+    ranges, start = [], 0
+    for i in range(parts):
+        stop = start + size + (1 if i < extra else 0)
+        ranges.append((start, stop))
+        start = stop
+    return ranges
+
+
+def iter_pages(data, backend=None, workers=None):
+    """
+    Yields (page_number, page_count, normalized_text) for each page of the PDF in data, in
+    order and as soon as each page is ready, so callers can report progress or start work
+    on early pages. workers caps the processes used (default WORKERS; 1 extracts in-process).
+    """
+    pages = page_count(data)
+    backend = choose_backend(backend)
+    workers = WORKERS if workers is None else workers
+    if workers <= 1 or pages < PARALLEL_MIN_PAGES:
+        for number, text in enumerate(BACKENDS[backend](data, 0, pages), 1):
+            yield number, pages, normalize_page(text)
+        return
+
+    pool = _get_pool()
+    futures = [pool.submit(_extract_range, data, start, stop, backend)
+               for start, stop in page_ranges(pages, max(workers, pages // PAGES_PER_TASK))]
+    number = 0
+    try:
+        for future in futures:
+            for text in future.result():
+                number += 1
+                yield number, pages, text
+    finally:
+        # A caller that stops early leaves no queued ranges behind.
+        for future in futures:
+            future.cancel()
+
+
+def extract_pages(data, backend=None, workers=None):
+    """Returns the normalized text of every page of the PDF in data (bytes)."""
+    return [text for _, _, text in iter_pages(data, backend, workers)]
+
+
+def read_bytes(file):
+    """Returns the bytes of a PDF given as bytes, a path or a file-like object."""
+    if isinstance(file, (bytes, bytearray)):
+        return bytes(file)
+    if isinstance(file, (str, os.PathLike)):
+        with open(file, "rb") as f:
+            return f.read()
+    return file.getvalue() if hasattr(file, "getvalue") else file.read()
+
+
+def extract_text(file, backend=None, workers=None):
+    """Extracts the text of a PDF given as bytes, a path or a file-like object; one line per text line."""
+    return "\n".join(text for text in extract_pages(read_bytes(file), backend, workers) if text) + "\n"
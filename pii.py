@@ -0,0 +1,100 @@
+"""
+PII scrubbing shared by both templates.
+
+Every detector is a named group in one precompiled alternation, so a document is
+scrubbed in a single pass whatever the number of detectors, and each match is
+attributed to its category for reporting. Detectors are tried in registration
+order at each token start; register() adds new ones.
+"""
+import re
+import threading
+from collections import Counter
+
+from metrics import instrument
+
+
+_DATE = (r"(?:\d{1,2}[/.-]\d{1,2}[/.-](?:19|20)?\d{2}"
+         r"|\d{1,2}(?:st|nd|rd|th)?\s+[A-Za-z]{3,9}\.?,?\s+(?:19|20)\d{2}"
+         r"|[A-Za-z]{3,9}\.?\s+\d{1,2}(?:st|nd|rd|th)?,?\s+(?:19|20)\d{2})")
+
+# Street names and suffixes must be capitalized so that prose like "2 teams the way" is left alone.
+_STREET_SUFFIXES = ("street", "st", "avenue", "ave", "road", "rd", "boulevard", "blvd", "lane", "ln", "drive",
+                    "dr", "court", "ct", "way", "place", "pl", "terrace", "highway", "hwy", "nagar", "colony",
+                    "layout", "marg")
+_STREET_SUFFIX = "(?:" + "|".join(f"{s.capitalize()}|{s.upper()}" for s in _STREET_SUFFIXES) + ")"
+
+# Every match starts at the beginning of a word. Checking that once, before any detector is
+# tried, keeps the combined pattern fast: mid-word positions are rejected in a single step.
+# Punctuation may come right before a match, as in "Ph.9876543210" or "Mobile:-9876543210".
+TOKEN_START = r"(?<!\w)"
+
+# (category, replacement, pattern). Patterns are case-sensitive (use (?i:...) locally), are
+# implicitly anchored at TOKEN_START and must not define named groups.
+DETECTORS = [
+    # The local part starts with a word character, so leading punctuation ("Mail:-x@y.com") stays.
+    ("email", "[EMAIL]", r"\w[\w.%+-]*@[A-Za-z0-9.-]+\.[A-Za-z]{2,}\b"),
+    ("profile_url", "[PROFILE_URL]",
+     r"(?i:(?:https?://)?(?:www\.)?(?:linkedin\.com/(?:in|pub)|github\.com)/)[\w\-.%/]+"),
+    ("date_of_birth", "[DOB]",
+     r"(?i:date\s+of\s+birth|d\.?\s?o\.?\s?b\b\.?|born(?:\s+on)?)\s*[:\-]?\s*" + _DATE),
+    ("address", "[ADDRESS]",
+     r"\d{1,5}[A-Za-z]?,?[ \t]+(?:[A-Z0-9][\w.'-]*[ \t]+){1,4}" + _STREET_SUFFIX + r"\b\.?"
+     r"(?:,?\s*(?i:apt|suite|unit|flat|#)\.?\s*[\w-]+)?"),
+    # International numbers with a +/00 country code, e.g. +44 20 7946 0958 or 0091-98765-43210.
+    ("phone", "[PHONE]", r"(?:\+|00)\d{1,3}[\s.-]?(?:\(?\d{1,5}\)?[\s.-]?){1,4}\d{2,5}\b"),
+    # North American style (the original pattern) and 5+5 digit mobiles.
+    ("phone", "[PHONE]", r"\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}\b|\d{5}[\s-]\d{5}\b"),
+]
+
+_lock = threading.Lock()
+_compiled = None
+
+
+def _compile():
+    parts = [f"(?P<d{i}>{pattern})" for i, (_, _, pattern) in enumerate(DETECTORS)]
+    pattern = re.compile(TOKEN_START + "(?:" + "|".join(parts) + ")")
+    return pattern, {f"d{i}": (category, replacement) for i, (category, replacement, _) in enumerate(DETECTORS)}
+
+
+def _engine():
+    global _compiled
+    if _compiled is None:
+        with _lock:
+            if _compiled is None:
+                _compiled = _compile()
+    return _compiled
+
+
+def register(category, pattern, replacement=None, first=False):
+    """
+    Adds a detector. Earlier detectors win when two match at the same position, so pass
+    first=True for patterns that must take precedence (e.g. a narrower ID format).
+    """
+    global _compiled
+    detector = (category, replacement or f"[{category.upper()}]", pattern)
+    with _lock:
+        if first:
+            DETECTORS.insert(0, detector)
+        else:
+            DETECTORS.append(detector)
+        _compiled = None
+
+
+def scrub(text):
+    """Returns (scrubbed_text, counts) where counts maps each category to the matches replaced."""
+    pattern, detectors = _engine()
+    counts = Counter()
+
+    def replace(match):
+        category, replacement = detectors[match.lastgroup]
+        counts[category] += 1
+        return replacement
+
+    return pattern.sub(replace, text), dict(counts)
+
+
+@instrument("clean_pii")
+def clean_pii(text):
+    """Removes emails, phone numbers, profile URLs, street addresses and dates of birth."""
+    pattern, detectors = _engine()
+    return pattern.sub(lambda match: detectors[match.lastgroup][1], text)
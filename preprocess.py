@@ -0,0 +1,281 @@
+"""
+Shrinks extracted resume text before it is placed in a prompt.
+
+PDF extraction keeps layout whitespace and, on every page, the running headers, footers and
+page numbers; none of it helps the model but all of it costs input tokens. compress()
+removes that noise and reports token counts before and after. Page furniture is only
+removed when the per-page text is available, since it is recognised by where it sits. For very long resumes,
+map_reduce_condense() condenses job-sized chunks in parallel before the main call.
+"""
+import re
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from llm import complete
+
+
+# Lines that are almost certainly page furniture wherever they appear.
+PAGE_NUMBER = re.compile(r"^\s*(?:page\s*)?\d{1,3}(?:\s*(?:/|of)\s*\d{1,3})?\s*$", re.IGNORECASE)
+INLINE_SPACE = re.compile(r"[ \t\u00a0\u2000-\u200b]+")
+DIGITS = re.compile(r"\d+")
+DATE_RANGE = re.compile(
+    r"((?:jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\.?\s*\d{2,4}|\b(?:19|20)\d{2}\b)"
+    r"\s*(?:-|–|—|to)\s*"
+    r"((?:jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\.?\s*\d{2,4}|\b(?:19|20)\d{2}\b|present|current|till date|now)",
+    re.IGNORECASE,
+)
+
+# A line at the edge of this many pages (digits ignored) is treated as a running header or footer.
+MIN_REPEATS = 3
+# How many lines at the top and at the bottom of a page can be furniture.
+EDGE_LINES = 3
+MAX_FURNITURE_LENGTH = 100
+# Per-job labels repeat legitimately and give the model structure, so they are never dropped.
+SECTION_LABEL = re.compile(
+    r"(responsibilit|environment|project|client|description|technolog|achievement|role|duration|summary|skills)",
+    re.IGNORECASE,
+)
+
+
+def estimate_tokens(text):
+    """Rough token count (about four characters per token for English prose)."""
+    return (len(text) + 3) // 4
+
+
+def collapse_whitespace(lines):
+    """Collapses runs of spaces/tabs inside lines and squeezes consecutive blank lines."""
+    result = []
+    for line in lines:
+        line = INLINE_SPACE.sub(" ", line).strip()
+        if line or (result and result[-1]):
+            result.append(line)
+    while result and not result[-1]:
+        result.pop()
+    return result
+
+
+def _is_furniture_candidate(line):
+    return (line and len(line) <= MAX_FURNITURE_LENGTH and not line.endswith(":")
+            and not line.startswith(("-", "•", "*")) and not SECTION_LABEL.search(line)
+            and not DATE_RANGE.search(line))
+
+
+def _is_section_content(line):
+    return bool(line.endswith(":") or line.startswith(("-", "•", "*")) or SECTION_LABEL.search(line)
+                or DATE_RANGE.search(line))
+
+
+def _edge_lines(lines, edge_lines):
+    """
+    Indexes of the lines a header or footer can occupy: the leading and trailing lines of
+    a page, stopping at the first section label, heading, bullet or date range, so lines
+    inside a section are never candidates.
+    """
+    edges = set()
+    for order in (range(len(lines)), range(len(lines) - 1, -1, -1)):
+        taken = 0
+        for i in order:
+            if not lines[i]:
+                continue
+            if taken == edge_lines or _is_section_content(lines[i]):
+                break
+            edges.add(i)
+            taken += 1
+    return edges
+
+
+def remove_page_furniture(pages, min_repeats=MIN_REPEATS, edge_lines=EDGE_LINES):
+    """
+    Joins pages (each a list of lines) into one list of lines without their page numbers
+    and running headers and footers: short lines found at the top or bottom edge of at least
+    min_repeats pages (digits ignored). The first occurrence of a header is kept since it
+    often carries the candidate's name; repeats anywhere else on a page are content.
+    """
+    edges = [_edge_lines(lines, edge_lines) for lines in pages]
+    counts = Counter(key for lines, page_edges in zip(pages, edges)
+                     for key in {DIGITS.sub("#", lines[i]) for i in page_edges if _is_furniture_candidate(lines[i])})
+    seen = set()
+    result = []
+    for lines, page_edges in zip(pages, edges):
+        filled = [i for i, line in enumerate(lines) if line]
+        for i, line in enumerate(lines):
+            if i in page_edges:
+                if PAGE_NUMBER.match(line) and i in (filled[0], filled[-1]):
+                    continue
+                key = DIGITS.sub("#", line)
+                if _is_furniture_candidate(line) and counts[key] >= min_repeats:
+                    if key in seen:
+                        continue
+                    seen.add(key)
+            result.append(line)
+    return result
+
+
+def dedupe_boilerplate(lines, min_length=40):
+    """Removes exact repeats of long lines, e.g. a disclaimer or summary pasted twice."""
+    seen = set()
+    result = []
+    for line in lines:
+        if len(line) >= min_length:
+            if line in seen:
+                continue
+            seen.add(line)
+        result.append(line)
+    return result
+
+
+def compress(text, pages=None):
+    """
+    Returns (compressed_text, stats) where stats reports characters and estimated tokens before/after.
+    When pages, the page texts text was joined from, are given, page furniture is removed too.
+    """
+    if pages is None:
+        lines = collapse_whitespace(text.split("\n"))
+    else:
+        lines = remove_page_furniture([collapse_whitespace(page.split("\n")) for page in pages if page])
+    lines = dedupe_boilerplate(lines)
+    lines = collapse_whitespace(lines)
+    compressed = "\n".join(lines)
+    before, after = estimate_tokens(text), estimate_tokens(compressed)
+    return compressed, {
+        "chars_before": len(text),
+        "chars_after": len(compressed),
+        "tokens_before": before,
+        "tokens_after": after,
+        "saved_ratio": 1 - after / before if before else 0.0,
+    }
+
+
+def split_into_chunks(text, max_tokens):
+    """
+    Splits text into chunks of at most about max_tokens, cutting at lines that open a
+    new job (a line with a date range) so each chunk holds whole jobs where possible.
+    """
+    chunks, current, size = [], [], 0
+    for line in text.split("\n"):
+        line_tokens = estimate_tokens(line) + 1
+        starts_job = bool(DATE_RANGE.search(line))
+        if current and (size + line_tokens > max_tokens or (starts_job and size > max_tokens // 2)):
+            chunks.append("\n".join(current))
+            current, size = [], 0
+        current.append(line)
+        size += line_tokens
+    if current:
+        chunks.append("\n".join(current))
+    return chunks
+
+
+CONDENSE_INSTRUCTION = """
+The text above is one part of a longer resume. Rewrite it as compact plain text for a later extraction step.
+Keep EVERY fact: candidate name, headings, company names, clients, roles, dates, locations, technologies,
+certifications, education and each distinct responsibility or achievement (shortened to one line each).
+Drop repetition, filler words and formatting. Do not add anything that is not in the text.
+"""
+
+
+def map_reduce_condense(text, api_key, base_url, max_chunk_tokens=3000, workers=4, client=None, cache=None):
+    """
+    Condenses a long resume by summarizing job-sized chunks in parallel and joining the
+    results in order. Returns the text unchanged when it fits in a single chunk.
+    """
+    chunks = split_into_chunks(text, max_chunk_tokens)
+    if len(chunks) <= 1:
+        return text
+
+    def condense(chunk):
+        try:
+            return complete(f"Resume Part:\n{chunk}\n{CONDENSE_INSTRUCTION}", api_key, base_url,
+                            client=client, cache=cache) or chunk
+        except Exception:  # a failed chunk goes to the main call as it is rather than failing extraction
+            return chunk
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return "\n\n".join(pool.map(condense, chunks))
+
+
+def _condensed(future, chunk):
+    """The condensed text of chunk, or chunk itself when condensing it failed or returned nothing."""
+    try:
+        return future.result() or chunk
+    except Exception:
+        return chunk
+
+
+def prepare_resume_text(text, api_key=None, base_url=None, map_reduce_tokens=0, client=None, cache=None):
+    """
+    The preprocessing stage between extraction and prompt(): compress, then condense with
+    map-reduce when the result is still above map_reduce_tokens (0 disables it).
+    Returns (text, stats).
+    """
+    compressed, stats = compress(text)
+    if map_reduce_tokens and stats["tokens_after"] > map_reduce_tokens:
+        condensed = map_reduce_condense(compressed, api_key, base_url, client=client, cache=cache)
+        stats["map_reduce"] = condensed is not compressed
+        compressed = condensed
+        stats["tokens_after"] = estimate_tokens(compressed)
+        stats["chars_after"] = len(compressed)
+        stats["saved_ratio"] = 1 - stats["tokens_after"] / stats["tokens_before"] if stats["tokens_before"] else 0.0
+    return compressed, stats
+
+
+def prepare_resume_pages(pages, api_key=None, base_url=None, map_reduce_tokens=0, max_chunk_tokens=3000,
+                         workers=4, client=None, cache=None, remove_furniture=False):
+    """
+    Streaming counterpart of prepare_resume_text() for an iterator of page texts; with
+    remove_furniture, running headers, footers and page numbers are dropped as well.
+    Once the pages read so far exceed map_reduce_tokens, every completed chunk is sent for
+    condensing straight away, so LLM work on early pages overlaps extraction of later ones.
+    Returns (text, stats) like prepare_resume_text().
+    """
+    seen, buffer, submitted = [], [], []
+    pool = None
+    # Whitespace-collapsed size of the pages so far; an upper bound of the compressed size
+    # that avoids recompressing every page seen on each new one.
+    seen_tokens = 0
+
+    def compress_pages(texts):
+        return compress("\n".join(texts), texts if remove_furniture else None)
+
+    def submit(chunks):
+        for chunk in chunks:
+            future = pool.submit(complete, f"Resume Part:\n{chunk}\n{CONDENSE_INSTRUCTION}", api_key, base_url,
+                                 client=client, cache=cache)
+            submitted.append((future, chunk))
+
+    try:
+        for page in pages:
+            seen.append(page)
+            if not map_reduce_tokens:
+                continue
+            if pool is None:
+                seen_tokens += estimate_tokens("\n".join(collapse_whitespace(page.split("\n")))) + 1
+                if seen_tokens <= map_reduce_tokens:
+                    continue
+                pool = ThreadPoolExecutor(max_workers=workers)
+                buffer = list(seen)
+            else:
+                buffer.append(page)
+            # Furniture is detected within the buffered pages; the carried-over chunk counts as one page.
+            chunks = split_into_chunks(compress_pages(buffer)[0], max_chunk_tokens)
+            if len(chunks) > 1:
+                submit(chunks[:-1])
+                buffer = [chunks[-1]]
+
+        text = "\n".join(seen)
+        if pool is None:
+            return compress_pages(seen)
+        submit(split_into_chunks(compress_pages(buffer)[0], max_chunk_tokens))
+        condensed = "\n\n".join(_condensed(future, chunk) for future, chunk in submitted)
+    finally:
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    before, after = estimate_tokens(text), estimate_tokens(condensed)
+    return condensed, {
+        "chars_before": len(text),
+        "chars_after": len(condensed),
+        "tokens_before": before,
+        "tokens_after": after,
+        "saved_ratio": 1 - after / before if before else 0.0,
+        "map_reduce": True,
+    }
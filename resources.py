@@ -0,0 +1,48 @@
+"""
+Process-wide cache for expensive resources such as ML models.
+
+Heavy libraries are imported inside the factories, so nothing is loaded until a feature
+first needs it. Each resource is then built once per process: concurrent first callers
+wait for the same build instead of loading a second copy of the model.
+"""
+import threading
+
+
+_resources = {}
+_building = {}
+_lock = threading.Lock()
+
+
+def get_resource(key, factory):
+    """Returns the resource stored under key, calling factory() to build it on first use."""
+    try:
+        return _resources[key]
+    except KeyError:
+        pass
+    with _lock:
+        key_lock = _building.setdefault(key, threading.Lock())
+    with key_lock:
+        if key not in _resources:
+            _resources[key] = factory()
+        return _resources[key]
+
+
+def drop_resource(key):
+    """Forgets the resource stored under key, if any, so it can be garbage collected."""
+    with _lock:
+        _resources.pop(key, None)
+        _building.pop(key, None)
+
+
+def loaded():
+    """Keys of the resources built so far in this process."""
+    return list(_resources)
+
+
+def sentence_model(name, device="cpu"):
+    """The shared SentenceTransformer for name; torch and transformers load on the first call."""
+    def load():
+        from sentence_transformers import SentenceTransformer
+        return SentenceTransformer(name, device=device)
+
+    return get_resource(("sentence_transformer", name, device), load)
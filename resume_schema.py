@@ -0,0 +1,499 @@
+"""
+Canonical resume schema shared by both templates.
+
+One LLM call extracts every fact either template needs into a single document;
+parse() (tagged text) or parse_json() (structured output) turns it into a Resume, and
+to_template_1_text()/to_template_2_text() project that into the tagged formats
+template_1.convert_to_docx and template_2.convert_to_docx already understand.
+"""
+import json
+import re
+from dataclasses import asdict, dataclass, field
+
+from metrics import instrument
+
+
+@dataclass
+class Job:
+    company_name: str = ""
+    role: str = ""
+    duration: str = ""
+    client: str = ""
+    description: str = ""
+    responsibilities: list = field(default_factory=list)
+
+
+@dataclass
+class Resume:
+    full_name: str = ""
+    designation: str = ""
+    summary: str = ""
+    roles: list = field(default_factory=list)
+    solutions: list = field(default_factory=list)
+    industries: list = field(default_factory=list)
+    key_technologies: list = field(default_factory=list)
+    technologies: list = field(default_factory=list)  # [(category, skills)]
+    education: str = ""
+    certifications: list = field(default_factory=list)
+    publications: str = ""
+    geographic_locale: str = ""
+    jobs: list = field(default_factory=list)
+
+
+# Section key -> (Resume attribute, kind). "line" sections take the rest of the line,
+# "list" sections are comma/line separated, "text" sections are free multi-line text.
+SECTIONS = {
+    "FullName": ("full_name", "line"),
+    "Designation": ("designation", "line"),
+    "ProfessionalSummary": ("summary", "text"),
+    "Roles": ("roles", "list"),
+    "Solutions": ("solutions", "list"),
+    "Industries": ("industries", "list"),
+    "KeyTechnologies": ("key_technologies", "list"),
+    "Technologies": ("technologies", "pairs"),
+    "Education": ("education", "text"),
+    "Certifications": ("certifications", "lines"),
+    "Publications": ("publications", "text"),
+    "GeographicLocale": ("geographic_locale", "text"),
+}
+
+JOB_FIELDS = {
+    "CompanyName": "company_name",
+    "Role": "role",
+    "Duration": "duration",
+    "Client": "client",
+    "Description": "description",
+}
+
+
+class ResumeValidationError(ValueError):
+    """Raised when structured output does not match the resume schema."""
+
+
+STRING_FIELDS = ("full_name", "designation", "summary", "education", "publications", "geographic_locale")
+LIST_FIELDS = ("roles", "solutions", "industries", "key_technologies", "certifications")
+JOB_STRING_FIELDS = ("company_name", "role", "duration", "client", "description")
+
+_STRING = {"type": "string"}
+_STRING_LIST = {"type": "array", "items": _STRING}
+
+RESUME_JSON_SCHEMA = {
+    "type": "object",
+    "required": ["full_name", "jobs"],
+    "properties": {
+        **{name: _STRING for name in STRING_FIELDS},
+        **{name: _STRING_LIST for name in LIST_FIELDS},
+        "technologies": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "required": ["category", "skills"],
+                "properties": {"category": _STRING, "skills": _STRING},
+            },
+        },
+        "jobs": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    **{name: _STRING for name in JOB_STRING_FIELDS},
+                    "responsibilities": _STRING_LIST,
+                },
+            },
+        },
+    },
+}
+
+
+@instrument("prompt", template="both")
+def prompt(resume_text):
+    """Creates a single prompt whose answer covers both the old and the new template."""
+    template_instruction = """
+You are a resume data extractor. Your task is to extract information from the provided resume and curate it as clean, tagged, plain text.
+MUST BE professional throughout and make sure to use Harvard action words, as used in standard resumes, wherever necessary. DO NOT add any special formatting. The Python script will handle all styling.
+Use exactly the tags below, each at the start of its own line.
+
+---
+
+FullName: [Full Name]
+Designation: [Latest designation]
+
+ProfessionalSummary:
+[A 2-3 sentence summary of the professional profile, extracted from the resume.Generate based on resume if not explicitly mentioned]
+
+Roles: [Professional roles held, separated by commas. Do not repeat same roles.]
+Solutions: [KEY solution areas, separated by commas. GROUP similar items.]
+Industries: [Relevant industries, separated by commas]
+KeyTechnologies: [KEY 5-7 technologies, separated by commas. GROUP related services.]
+
+Technologies:
+[One 'Category: Skills' line per group of related technologies. For example: "ETL Tools: Informatica, IICS"]
+
+Education:
+[Extract content for the education section. DO NOT extract percentages/cgpas]
+
+Certifications:
+- [One certification per line]
+
+Publications:
+[Content for the publications section]
+
+GeographicLocale:
+[Extract geographic locale from resume]
+
+
+---JOB START---
+CompanyName: [Company Name, if available. If not, use 'Project']
+Role: [Role/Job Title]
+Duration: [Start Date - End Date]
+Client: [Client Name for the project. If not applicable, write N/A]
+Description: [Brief project description]
+Responsibilities:
+- [Responsibility point 1]
+- [Responsibility point 2]
+---JOB END---
+
+Repeat the ---JOB START--- to ---JOB END--- block for each job/project. If a section is empty, write "None".
+"""
+    return f"Resume Text:\n{resume_text}\n\n{template_instruction}"
+
+
+def _is_none(value):
+    return not value or value.strip().lower() == "none"
+
+
+def _split_list(lines):
+    items = []
+    for line in lines:
+        for item in line.split(","):
+            item = item.strip().lstrip("-• ").strip()
+            if item and item.lower() != "none" and item not in items:
+                items.append(item)
+    return items
+
+
+def _finish_section(resume, key, lines):
+    attr, kind = SECTIONS[key]
+    lines = [line.strip() for line in lines if line.strip()]
+    if kind == "line":
+        setattr(resume, attr, lines[0] if lines and not _is_none(lines[0]) else "")
+    elif kind == "text":
+        text = "\n".join(lines)
+        setattr(resume, attr, "" if _is_none(text) else text)
+    elif kind == "list":
+        setattr(resume, attr, _split_list(lines))
+    elif kind == "lines":
+        setattr(resume, attr, [line.lstrip("-• ").strip() for line in lines if not _is_none(line.lstrip("-• "))])
+    elif kind == "pairs":
+        pairs = []
+        for line in lines:
+            category, sep, skills = line.lstrip("-• ").partition(":")
+            if sep and category.strip() and skills.strip():
+                pairs.append((category.strip(), skills.strip()))
+        setattr(resume, attr, pairs)
+
+
+def parse(text):
+    """
+    Parses the canonical tagged text into a Resume.
+    Only the known tags open a section, so colons inside descriptions or 'Category: Skills'
+    lines are kept as content instead of being mistaken for keys.
+    """
+    resume = Resume()
+    section, section_lines = None, []
+    job, in_responsibilities = None, False
+
+    def close_section():
+        nonlocal section, section_lines
+        if section is not None:
+            _finish_section(resume, section, section_lines)
+        section, section_lines = None, []
+
+    for line in text.split("\n"):
+        stripped = line.strip()
+
+        if stripped == "---JOB START---":
+            close_section()
+            job, in_responsibilities = Job(), False
+            resume.jobs.append(job)
+            continue
+        if stripped == "---JOB END---":
+            job, in_responsibilities = None, False
+            continue
+
+        key, sep, value = stripped.partition(":")
+        key = key.strip()
+
+        if job is not None:
+            if sep and key in JOB_FIELDS and not stripped.startswith("-"):
+                setattr(job, JOB_FIELDS[key], value.strip())
+                in_responsibilities = False
+            elif sep and key == "Responsibilities":
+                in_responsibilities = True
+                if value.strip():
+                    job.responsibilities.append(value.strip())
+            elif in_responsibilities and stripped:
+                job.responsibilities.append(stripped.lstrip("-• ").strip())
+            elif stripped and job.description:
+                job.description += " " + stripped
+            continue
+
+        if sep and key in SECTIONS and not stripped.startswith("-"):
+            close_section()
+            section = key
+            section_lines = [value] if value.strip() else []
+        elif section is not None:
+            section_lines.append(line)
+
+    close_section()
+    return resume
+
+
+def _or_none(value):
+    return value if value else "None"
+
+
+def to_template_1_text(resume):
+    """Projects a Resume into the tagged format parsed by template_1.parse_portkey_text."""
+    lines = [
+        f"FullName: {resume.full_name}",
+        "",
+        "Professional Summary:",
+        _or_none(resume.summary),
+        "",
+        "Roles:",
+        _or_none(", ".join(resume.roles)),
+        "",
+        "Technologies:",
+    ]
+    if resume.technologies:
+        lines.extend(f"{category}: {skills}" for category, skills in resume.technologies)
+    elif resume.key_technologies:
+        lines.append(f"Key Technologies: {', '.join(resume.key_technologies)}")
+    else:
+        lines.append("None")
+    lines += [
+        "",
+        "Education:",
+        _or_none(resume.education),
+        "",
+        "Certifications:",
+    ]
+    if resume.certifications:
+        lines.extend(f"- {cert}" for cert in resume.certifications)
+    else:
+        lines.append("None")
+    lines += ["", "Geographic locale:", _or_none(resume.geographic_locale), ""]
+
+    for job in resume.jobs:
+        lines += [
+            "---JOB START---",
+            f"CompanyName: {job.company_name or 'Project'}",
+            f"Role: {job.role}",
+            f"Duration: {job.duration}",
+            f"Client: {job.client or 'N/A'}",
+            f"Description: {job.description}",
+            "Responsibilities:",
+        ]
+        lines.extend(f"- {resp}" for resp in job.responsibilities)
+        lines += ["---JOB END---", ""]
+    return "\n".join(lines)
+
+
+# A line template_2's parser reads as a new "Key: value" tag; URLs ("https://") are not tags.
+TEMPLATE_2_TAG = re.compile(r"^(\s*[A-Za-z]\w*)\s*:(?!//)", re.MULTILINE)
+
+
+def _t2(value):
+    # Content lines that look like a tag would cut their section short; only that colon is escaped.
+    return TEMPLATE_2_TAG.sub(r"\1 -", value)
+
+
+def _cell(value):
+    return value.replace("|", "/").replace("\n", " ").strip()
+
+
+def to_template_2_text(resume):
+    """Projects a Resume into the tagged format consumed by template_2.convert_to_docx."""
+    key_technologies = resume.key_technologies or [category for category, _ in resume.technologies]
+    lines = [
+        f"FullName: {resume.full_name}",
+        f"Designation: {resume.designation or (resume.jobs[0].role if resume.jobs else '')}",
+        "",
+        "ProfessionalOverviewSummary:",
+        _or_none(_t2(resume.summary)),
+        "",
+        "ProfessionalOverviewTable:",
+        f"Roles | {_cell(', '.join(resume.roles))}",
+        f"Solutions | {_cell(', '.join(resume.solutions))}",
+        f"Industries | {_cell(', '.join(resume.industries))}",
+        f"Technologies | {_cell(', '.join(key_technologies))}",
+        "",
+        "KeyEngagementsTable:",
+        "Client | Role | Description",
+    ]
+    for job in resume.jobs:
+        client = job.client if job.client and job.client.upper() != "N/A" else job.company_name
+        lines.append(_t2(f"{_cell(client)} | {_cell(job.role)} | {_cell(job.description)}"))
+    lines += [
+        "",
+        "Education:",
+        _or_none(_t2(resume.education)),
+        "",
+        "Publications:",
+        _or_none(_t2(resume.publications)),
+        "",
+        "ProfessionalTrainingCertifications:",
+        _or_none(_t2("\n".join(resume.certifications))),
+        "",
+        "GeographicLocale:",
+        _or_none(_t2(resume.geographic_locale)),
+        "",
+    ]
+    for job in resume.jobs:
+        lines += [
+            "---JOB START---",
+            f"CompanyName: {job.company_name}",
+            f"Role: {job.role}",
+            f"Duration: {job.duration}",
+            f"Client: {job.client or 'N/A'}",
+            "Responsibilities:",
+        ]
+        lines.extend(f"- {resp}" for resp in job.responsibilities)
+        lines += ["---JOB END---", ""]
+    return "\n".join(lines)
+
+
+def project(text):
+    """Parses a canonical response (JSON or tagged) and returns {"T1": text, "T2": text} for the two renderers."""
+    resume = parse_any(text)
+    return {"T1": to_template_1_text(resume), "T2": to_template_2_text(resume)}
+
+
+@instrument("prompt", template="both")
+def json_prompt(resume_text):
+    """Creates the structured-output prompt: the same facts as prompt(), returned as one JSON object."""
+    template_instruction = f"""
+You are a resume data extractor. Extract the information from the provided resume and return it as a single JSON object
+that validates against this JSON schema:
+
+{json.dumps(RESUME_JSON_SCHEMA)}
+
+Field guidance:
+- summary: a 2-3 sentence summary of the professional profile. Generate based on resume if not explicitly mentioned.
+- roles, solutions, industries: distinct items, GROUP similar items.
+- key_technologies: KEY 5-7 technologies. technologies: related technologies grouped by category, e.g. {{"category": "ETL Tools", "skills": "Informatica, IICS"}}.
+- education: DO NOT extract percentages/cgpas.
+- jobs: one object per job/project. client is "N/A" if not applicable. responsibilities use Harvard action words.
+- Use an empty string or empty list when a section is missing.
+
+MUST BE professional throughout. Return ONLY the JSON object, with no commentary and no code fences.
+"""
+    return f"Resume Text:\n{resume_text}\n\n{template_instruction}"
+
+
+def _clean(value):
+    value = value.strip()
+    # Cheap length check first: this runs for every string in the document.
+    if len(value) == 4 and value.lower() == "none":
+        return ""
+    return value
+
+
+def _string(data, name, path):
+    value = data.get(name)
+    if value is None:
+        return ""
+    if value.__class__ is not str:
+        raise ResumeValidationError(f"{path}{name} must be a string")
+    return _clean(value)
+
+
+def _string_list(data, name, path, strip_chars=None):
+    value = data.get(name)
+    if value is None:
+        return []
+    if value.__class__ is not list:
+        raise ResumeValidationError(f"{path}{name} must be a list of strings")
+    items = []
+    for item in value:
+        if item.__class__ is not str:
+            raise ResumeValidationError(f"{path}{name} must be a list of strings")
+        item = _clean(item.lstrip(strip_chars) if strip_chars else item)
+        if item:
+            items.append(item)
+    return items
+
+
+def from_dict(data):
+    """Validates a decoded JSON object against the schema and builds a Resume."""
+    if not isinstance(data, dict):
+        raise ResumeValidationError("resume must be a JSON object")
+    for name in RESUME_JSON_SCHEMA["required"]:
+        if name not in data:
+            raise ResumeValidationError(f"missing required field {name}")
+
+    resume = Resume(
+        **{name: _string(data, name, "") for name in STRING_FIELDS},
+        **{name: _string_list(data, name, "") for name in LIST_FIELDS},
+    )
+
+    technologies = data.get("technologies") or []
+    if not isinstance(technologies, list):
+        raise ResumeValidationError("technologies must be a list")
+    for i, item in enumerate(technologies):
+        if not isinstance(item, dict):
+            raise ResumeValidationError(f"technologies[{i}] must be an object")
+        category = _string(item, "category", f"technologies[{i}].")
+        skills = _string(item, "skills", f"technologies[{i}].")
+        if category and skills:
+            resume.technologies.append((category, skills))
+
+    jobs = data.get("jobs")
+    if not isinstance(jobs, list):
+        raise ResumeValidationError("jobs must be a list")
+    for i, item in enumerate(jobs):
+        if not isinstance(item, dict):
+            raise ResumeValidationError(f"jobs[{i}] must be an object")
+        path = f"jobs[{i}]."
+        resume.jobs.append(Job(
+            **{name: _string(item, name, path) for name in JOB_STRING_FIELDS},
+            responsibilities=_string_list(item, "responsibilities", path, strip_chars="-• "),
+        ))
+    return resume
+
+
+def to_dict(resume):
+    data = asdict(resume)
+    data["technologies"] = [{"category": category, "skills": skills} for category, skills in resume.technologies]
+    return data
+
+
+def looks_like_json(text):
+    stripped = text.lstrip()
+    return stripped.startswith("{") or stripped.startswith("```")
+
+
+def parse_json(text):
+    """Parses a structured-output response: one json.loads plus schema validation."""
+    stripped = text.strip()
+    if stripped.startswith("```"):
+        # Tolerate a fenced block even though the prompt asks for bare JSON.
+        stripped = stripped.split("\n", 1)[1] if "\n" in stripped else ""
+        stripped = stripped.rsplit("```", 1)[0]
+    try:
+        data = json.loads(stripped)
+    except json.JSONDecodeError as e:
+        raise ResumeValidationError(f"invalid JSON: {e}") from e
+    return from_dict(data)
+
+
+@instrument("parse", template="both")
+def parse_any(text):
+    """Parses structured JSON output when present, falling back to the tagged-text parser."""
+    if looks_like_json(text):
+        try:
+            return parse_json(text)
+        except ResumeValidationError:
+            pass
+    return parse(text)
@@ -0,0 +1,231 @@
+"""
+Skill normalization: maps the free-text skills the LLM writes into the Technologies rows
+("AWS S3", "Amazon S3", "s3") onto one canonical taxonomy so they can be aggregated.
+
+Exact alias matches are resolved with a dictionary lookup. Everything else is embedded in
+batches, and each unique string's embedding is kept in an LRU cache. Skills are matched
+to the nearest taxonomy entry with one matrix product per block of skills.
+"""
+import json
+import os
+import re
+from functools import lru_cache
+
+from cache import LRUCache
+from resources import get_resource
+from talent_index import MODEL_NAME, get_encoder
+
+
+# Canonical skill -> aliases. Override with a JSON file of the same shape via TALENTTUNE_SKILL_TAXONOMY.
+SKILL_TAXONOMY = {
+    "Amazon S3": ["AWS S3", "S3", "Simple Storage Service"],
+    "AWS Glue": ["Glue"],
+    "Amazon Redshift": ["Redshift", "AWS Redshift"],
+    "AWS Lambda": ["Lambda"],
+    "Amazon EC2": ["EC2", "AWS EC2"],
+    "Amazon Web Services": ["AWS"],
+    "Microsoft Azure": ["Azure"],
+    "Azure Data Factory": ["ADF"],
+    "Azure Databricks": [],
+    "Google Cloud Platform": ["GCP", "Google Cloud"],
+    "BigQuery": ["Google BigQuery"],
+    "Snowflake": [],
+    "Databricks": [],
+    "Apache Spark": ["Spark", "PySpark"],
+    "Apache Kafka": ["Kafka"],
+    "Apache Airflow": ["Airflow"],
+    "Apache Hadoop": ["Hadoop", "HDFS"],
+    "Informatica PowerCenter": ["Informatica", "PowerCenter"],
+    "Informatica IICS": ["IICS", "Informatica Cloud"],
+    "Talend": [],
+    "dbt": ["data build tool"],
+    "Python": ["Python 3", "Python3"],
+    "Java": ["Core Java", "J2EE"],
+    "JavaScript": ["JS"],
+    "TypeScript": ["TS"],
+    "C#": ["C Sharp", ".NET C#"],
+    ".NET": ["dotnet", "ASP.NET", ".NET Core"],
+    "SQL": ["T-SQL", "PL/SQL", "ANSI SQL"],
+    "MySQL": [],
+    "PostgreSQL": ["Postgres"],
+    "Oracle Database": ["Oracle", "Oracle DB"],
+    "Microsoft SQL Server": ["SQL Server", "MSSQL"],
+    "MongoDB": ["Mongo"],
+    "Power BI": ["PowerBI", "Microsoft Power BI"],
+    "Tableau": [],
+    "Docker": [],
+    "Kubernetes": ["K8s"],
+    "Terraform": [],
+    "Jenkins": [],
+    "Git": ["GitHub", "GitLab", "Bitbucket"],
+    "React": ["ReactJS", "React.js"],
+    "Angular": ["AngularJS"],
+    "Node.js": ["NodeJS", "Node"],
+    "Spring Boot": ["Spring"],
+    "Salesforce": ["SFDC"],
+    "SAP": [],
+    "Machine Learning": ["ML"],
+    "Agile": ["Scrum", "Agile/Scrum"],
+}
+
+SIMILARITY_THRESHOLD = float(os.environ.get("TALENTTUNE_SKILL_THRESHOLD", 0.75))
+# Rows of skills compared against the taxonomy per matrix product; bounds peak memory.
+BLOCK_SIZE = 4096
+
+# "/" only separates skills with spaces around it; "PL/SQL" or "Agile/Scrum" are single skills.
+_SEPARATORS = re.compile(r"[,;|•\n]+|\s+/\s+")
+_PARENTHESES = re.compile(r"\(([^)]*)\)")
+
+
+def load_taxonomy(path=None):
+    path = path or os.environ.get("TALENTTUNE_SKILL_TAXONOMY")
+    if not path:
+        return SKILL_TAXONOMY
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def normalize_key(skill):
+    return " ".join(skill.lower().split())
+
+
+@lru_cache(maxsize=None)
+def _taxonomy_names(path):
+    return frozenset(normalize_key(name) for canonical, aliases in load_taxonomy(path).items()
+                     for name in [canonical, *aliases])
+
+
+def known_skill_names():
+    """Normalized canonical names and aliases of the configured taxonomy."""
+    return _taxonomy_names(os.environ.get("TALENTTUNE_SKILL_TAXONOMY"))
+
+
+def _split_part(part, known):
+    # Only trailing dots are punctuation: a leading one belongs to the skill (".NET").
+    part = part.strip().rstrip(" .")
+    if "/" not in part or normalize_key(part) in known:
+        return [part] if part else []
+    return [piece.strip().rstrip(" .") for piece in part.split("/") if piece.strip().rstrip(" .")]
+
+
+def split_skills(text, known=None):
+    """
+    Splits Technologies text into individual skills. Handles "Category: a, b" lines
+    (template 1), "Technologies | a, b" rows (template 2) and "SQL (MySQL, Postgres)".
+    "a/b" is split unless it is a name in known (default: known_skill_names()), like "PL/SQL".
+    """
+    known = known_skill_names() if known is None else known
+    skills = []
+    for line in text.split("\n"):
+        line = line.strip().lstrip("-• ")
+        if "|" in line:
+            line = line.split("|", 1)[1]
+        elif ":" in line:
+            line = line.split(":", 1)[1]
+        line = _PARENTHESES.sub(lambda match: ", " + match.group(1), line)
+        for part in _SEPARATORS.split(line):
+            skills.extend(_split_part(part, known))
+    return skills
+
+
+def skills_from_resume_data(resume_data, known=None):
+    """Raw skills from either template's parsed resume (Technologies text or table row)."""
+    text = resume_data.get("Technologies") or ""
+    for row in (resume_data.get("ProfessionalOverviewTable") or "").split("\n"):
+        if row.strip().lower().startswith("technologies"):
+            text += "\n" + row
+    return split_skills(text, known)
+
+
+class EmbeddingService:
+    """
+    Embeds strings in batches through encoder (texts -> normalized vectors), caching each
+    unique string's vector in an LRU so repeated skills are embedded once per process.
+    """
+
+    def __init__(self, encoder=None, max_entries=50_000, batch_size=512):
+        self._encoder = encoder
+        self.batch_size = batch_size
+        self.cache = LRUCache(max_entries=max_entries, max_bytes=max_entries * 4 * 1024,
+                              sizeof=lambda vector: vector.nbytes)
+
+    def embed(self, texts):
+        """Returns a (len(texts), dim) float32 array; only strings not in the cache are encoded."""
+        import numpy as np
+
+        keys = [normalize_key(text) for text in texts]
+        vectors = {}
+        missing = []
+        for key in dict.fromkeys(keys):
+            vector = self.cache.get(key)
+            if vector is None:
+                missing.append(key)
+            else:
+                vectors[key] = vector
+        encoder = self._encoder or get_encoder(MODEL_NAME)
+        for start in range(0, len(missing), self.batch_size):
+            batch = missing[start:start + self.batch_size]
+            encoded = np.asarray(encoder(batch), dtype="float32")
+            encoded /= np.maximum(np.linalg.norm(encoded, axis=1, keepdims=True), 1e-12)
+            for key, vector in zip(batch, encoded):
+                vectors[key] = self.cache.put(key, vector.copy())
+        if not keys:
+            return np.zeros((0, 0), dtype="float32")
+        return np.stack([vectors[key] for key in keys])
+
+
+class SkillNormalizer:
+    """Maps raw skill strings to canonical taxonomy names."""
+
+    def __init__(self, taxonomy=None, embedder=None, threshold=SIMILARITY_THRESHOLD):
+        self.taxonomy = taxonomy if taxonomy is not None else load_taxonomy()
+        self.embedder = embedder or EmbeddingService()
+        self.threshold = threshold
+        self._aliases = {}
+        for canonical, aliases in self.taxonomy.items():
+            for name in [canonical, *aliases]:
+                self._aliases.setdefault(normalize_key(name), canonical)
+        self._names = list(self._aliases)
+        self._matrix = None
+
+    def _taxonomy_matrix(self):
+        if self._matrix is None:
+            self._matrix = self.embedder.embed(self._names)
+        return self._matrix
+
+    def normalize(self, skills):
+        """
+        Returns one (canonical, score) pair per skill. Exact alias matches score 1.0;
+        skills below the similarity threshold map to (None, best_score).
+        """
+        import numpy as np
+
+        results = [None] * len(skills)
+        unresolved = {}
+        for position, skill in enumerate(skills):
+            key = normalize_key(skill)
+            canonical = self._aliases.get(key)
+            if canonical is not None:
+                results[position] = (canonical, 1.0)
+            else:
+                unresolved.setdefault(key, []).append(position)
+        if not unresolved:
+            return results
+
+        keys = list(unresolved)
+        matrix = self._taxonomy_matrix()
+        for start in range(0, len(keys), BLOCK_SIZE):
+            block = keys[start:start + BLOCK_SIZE]
+            similarity = self.embedder.embed(block) @ matrix.T
+            best = similarity.argmax(axis=1)
+            scores = similarity[np.arange(len(block)), best]
+            for key, index, score in zip(block, best.tolist(), scores.tolist()):
+                match = (self._aliases[self._names[index]], score) if score >= self.threshold else (None, score)
+                for position in unresolved[key]:
+                    results[position] = match
+        return results
+
+
+def get_normalizer():
+    """The shared SkillNormalizer, so its embedding cache is reused across batch jobs."""
+    return get_resource("skill_normalizer", SkillNormalizer)
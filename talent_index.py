@@ -0,0 +1,268 @@
+"""
+Talent search over formatted resumes.
+
+Each formatted resume is split into sections (summary, skills, one per job). Sections are
+embedded in batches and stored in a FAISS index on disk, with a SQLite table holding the
+section text and candidate metadata. Vectors are L2-normalized, so inner product is
+cosine similarity; a candidate scores as their best-matching section.
+
+The index is an IndexIDMap2 over an exact flat index: adds and removals are incremental
+(no rebuild), search needs no training and everything runs on CPU. faiss and numpy are
+imported where they are used so that importing this module stays cheap.
+"""
+import os
+import sqlite3
+import threading
+import time
+
+from resources import sentence_model
+
+
+MODEL_NAME = os.environ.get("TALENTTUNE_EMBEDDING_MODEL", "all-MiniLM-L6-v2")
+EMBED_BATCH_SIZE = 64
+# Sections fetched per requested candidate, so one candidate's many jobs cannot crowd out others.
+OVERSAMPLE = 8
+
+
+def get_encoder(model_name=MODEL_NAME):
+    """Returns encode(texts) -> float32 array of normalized embeddings using the shared model."""
+    def encode(texts):
+        return sentence_model(model_name).encode(list(texts), batch_size=EMBED_BATCH_SIZE, normalize_embeddings=True,
+                                                 convert_to_numpy=True, show_progress_bar=False)
+
+    return encode
+
+
+def _text(value):
+    if isinstance(value, list):
+        return "\n".join(item.lstrip("-• ").strip() for item in value if item.strip())
+    return (value or "").strip()
+
+
+def resume_sections(resume_data):
+    """
+    Splits a parsed resume (the dictionary either template's parse_portkey_text returns)
+    into (section, text) pairs for embedding.
+    """
+    sections = []
+    summary = _text(resume_data.get("Professional Summary") or resume_data.get("ProfessionalOverviewSummary"))
+    if summary:
+        sections.append(("summary", summary))
+    skills = "\n".join(text for text in (_text(resume_data.get(key)) for key in
+                                          ("Roles", "Technologies", "ProfessionalOverviewTable")) if text)
+    if skills:
+        sections.append(("skills", skills))
+    for number, job in enumerate(resume_data.get("Jobs", []), 1):
+        header = " - ".join(part for part in (job.get("Role"), job.get("CompanyName"), job.get("Client"))
+                            if part and part != "N/A")
+        body = "\n".join(text for text in (_text(job.get("Description")), _text(job.get("Responsibilities"))) if text)
+        if body:
+            sections.append((f"job {number}", f"{header}\n{body}" if header else body))
+    return sections
+
+
+def entry_from_resume_data(candidate_id, resume_data, template="", source=""):
+    """Builds a TalentIndex.add() entry from a parsed resume."""
+    return {"candidate_id": candidate_id, "name": (resume_data.get("FullName") or "Candidate").strip(),
+            "sections": resume_sections(resume_data), "template": template, "source": source}
+
+
+def entry_from_formatted(candidate_id, formatted_text, parse, template="", source=""):
+    """Builds a TalentIndex.add() entry from a formatted resume and its template's parser."""
+    return entry_from_resume_data(candidate_id, parse(formatted_text), template, source)
+
+
+class TalentIndex:
+    """
+    Persistent section-level embedding index. encoder maps a list of texts to normalized
+    vectors (default: the shared sentence-transformers model, loaded on first use).
+    """
+
+    def __init__(self, path, encoder=None):
+        import faiss
+
+        self.path = path
+        self._encoder = encoder
+        self._lock = threading.Lock()
+        os.makedirs(path, exist_ok=True)
+        self._db_path = os.path.join(path, "meta.sqlite")
+        self._index_path = os.path.join(path, "sections.faiss")
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """CREATE TABLE IF NOT EXISTS candidates (
+                    candidate_id TEXT PRIMARY KEY,
+                    name TEXT NOT NULL,
+                    source TEXT NOT NULL,
+                    template TEXT NOT NULL,
+                    added REAL NOT NULL
+                )"""
+            )
+            conn.execute(
+                """CREATE TABLE IF NOT EXISTS sections (
+                    vector_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    candidate_id TEXT NOT NULL,
+                    section TEXT NOT NULL,
+                    text TEXT NOT NULL
+                )"""
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS sections_candidate ON sections (candidate_id)")
+        self._index = faiss.read_index(self._index_path) if os.path.exists(self._index_path) else None
+        self._reconcile()
+
+    def _connect(self):
+        return sqlite3.connect(self._db_path, timeout=30)
+
+    def _encode(self, texts):
+        import faiss
+        import numpy as np
+
+        encoder = self._encoder or get_encoder()
+        vectors = np.asarray(encoder(texts), dtype="float32")
+        faiss.normalize_L2(vectors)
+        return vectors
+
+    def _ensure_index(self, dimension):
+        import faiss
+
+        if self._index is None:
+            self._index = faiss.IndexIDMap2(faiss.IndexFlatIP(dimension))
+
+    def _save(self):
+        import faiss
+
+        # Write-then-rename so a crash never leaves a truncated index behind.
+        temporary = self._index_path + ".tmp"
+        faiss.write_index(self._index, temporary)
+        os.replace(temporary, self._index_path)
+
+    def _reconcile(self):
+        """Repairs drift between the metadata and the vectors after an interrupted write."""
+        import faiss
+        import numpy as np
+
+        with self._connect() as conn:
+            rows = conn.execute("SELECT vector_id, text FROM sections").fetchall()
+        known = {vector_id for vector_id, _ in rows}
+        stored = set()
+        if self._index is not None and self._index.ntotal:
+            stored = set(faiss.vector_to_array(self._index.id_map).tolist())
+        orphans = stored - known
+        missing = [(vector_id, text) for vector_id, text in rows if vector_id not in stored]
+        if orphans:
+            self._index.remove_ids(np.array(sorted(orphans), dtype="int64"))
+        if missing:
+            vectors = self._encode([text for _, text in missing])
+            self._ensure_index(vectors.shape[1])
+            self._index.add_with_ids(vectors, np.array([vector_id for vector_id, _ in missing], dtype="int64"))
+        if orphans or missing:
+            self._save()
+
+    def _remove_locked(self, conn, candidate_ids):
+        import numpy as np
+
+        placeholders = ",".join("?" * len(candidate_ids))
+        vector_ids = [row[0] for row in conn.execute(
+            f"SELECT vector_id FROM sections WHERE candidate_id IN ({placeholders})", candidate_ids)]
+        conn.execute(f"DELETE FROM sections WHERE candidate_id IN ({placeholders})", candidate_ids)
+        conn.execute(f"DELETE FROM candidates WHERE candidate_id IN ({placeholders})", candidate_ids)
+        if vector_ids and self._index is not None:
+            self._index.remove_ids(np.array(vector_ids, dtype="int64"))
+        return len(vector_ids)
+
+    def add(self, entries):
+        """
+        Adds or replaces candidates. entries are dicts with candidate_id, name, sections
+        ((section, text) pairs) and optionally source and template. All sections are
+        embedded in one batched call. Returns the number of sections indexed.
+        """
+        import numpy as np
+
+        entries = [entry for entry in entries if entry["sections"]]
+        if not entries:
+            return 0
+        texts = [text for entry in entries for _, text in entry["sections"]]
+        # Embed outside the lock: it is by far the slowest step and needs no shared state.
+        vectors = self._encode(texts)
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            self._ensure_index(vectors.shape[1])
+            self._remove_locked(conn, [entry["candidate_id"] for entry in entries])
+            vector_ids = []
+            for entry in entries:
+                conn.execute(
+                    "INSERT INTO candidates (candidate_id, name, source, template, added) VALUES (?, ?, ?, ?, ?)",
+                    (entry["candidate_id"], entry["name"], entry.get("source", ""), entry.get("template", ""), now),
+                )
+                for section, text in entry["sections"]:
+                    cursor = conn.execute("INSERT INTO sections (candidate_id, section, text) VALUES (?, ?, ?)",
+                                          (entry["candidate_id"], section, text))
+                    vector_ids.append(cursor.lastrowid)
+            self._index.add_with_ids(vectors, np.array(vector_ids, dtype="int64"))
+            self._save()
+        return len(vector_ids)
+
+    def remove(self, candidate_ids):
+        """Deletes candidates and their vectors. Returns the number of sections removed."""
+        candidate_ids = list(candidate_ids)
+        if not candidate_ids:
+            return 0
+        with self._lock, self._connect() as conn:
+            removed = self._remove_locked(conn, candidate_ids)
+            if removed:
+                self._save()
+        return removed
+
+    def search(self, query, k=10):
+        """
+        Returns the top k candidates for query (e.g. a job description), best first, as
+        dicts with candidate_id, name, source, score and the best-matching section.
+        """
+        if self._index is None or not self._index.ntotal or not query.strip():
+            return []
+        vector = self._encode([query])
+        with self._lock:
+            scores, ids = self._index.search(vector, min(self._index.ntotal, k * OVERSAMPLE))
+        best = {}
+        for score, vector_id in zip(scores[0].tolist(), ids[0].tolist()):
+            if vector_id >= 0 and vector_id not in best:
+                best[vector_id] = score
+        if not best:
+            return []
+
+        placeholders = ",".join("?" * len(best))
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"""SELECT s.vector_id, s.candidate_id, s.section, s.text, c.name, c.source, c.template
+                    FROM sections s JOIN candidates c ON c.candidate_id = s.candidate_id
+                    WHERE s.vector_id IN ({placeholders})""", list(best)).fetchall()
+        results = {}
+        for vector_id, candidate_id, section, text, name, source, template in rows:
+            score = best[vector_id]
+            if candidate_id not in results or score > results[candidate_id]["score"]:
+                results[candidate_id] = {"candidate_id": candidate_id, "name": name, "source": source,
+                                         "template": template, "score": score, "section": section, "text": text}
+        return sorted(results.values(), key=lambda row: row["score"], reverse=True)[:k]
+
+    def stats(self):
+        with self._connect() as conn:
+            candidates = conn.execute("SELECT COUNT(*) FROM candidates").fetchone()[0]
+        return {"candidates": candidates, "sections": self._index.ntotal if self._index is not None else 0}
+
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def get_talent_index(path=None):
+    """
+    Returns the shared TalentIndex for path, falling back to the TALENTTUNE_TALENT_INDEX
+    environment variable. Returns None when talent search is not configured (it is opt-in).
+    """
+    path = path or os.environ.get("TALENTTUNE_TALENT_INDEX")
+    if not path:
+        return None
+    with _indexes_lock:
+        if path not in _indexes:
+            _indexes[path] = TalentIndex(path)
+        return _indexes[path]
@@ -1,49 +1,42 @@
-import pdfplumber
-import docx
+import docx_extract
+import pdf_extract
+from pii import clean_pii
 from io import BytesIO
-from docx import Document
 from docx.shared import RGBColor, Inches, Pt
 from docx.enum.text import WD_ALIGN_PARAGRAPH, WD_TAB_ALIGNMENT
-from docx.oxml.ns import qn
-from docx.oxml import OxmlElement
 import os
-from portkey_ai import Portkey
+from assets import LOGO_PATH, asset_bytes
+from cache import asset_version
+from docx_render import (add_character_style, add_paragraph, add_run, compiled_template, set_font,
+                         set_table_no_border, table_rows)
+from llm import acomplete, complete, stream_complete
+from metrics import instrument, timed
+from resume_schema import ResumeValidationError, looks_like_json, parse_json
 import streamlit as st
-import re
 
 
 M_RED = RGBColor(204, 31, 32)
-def clean_pii(text):
-    """Removes email addresses and phone numbers using regex."""
 
-    email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-    
-    phone_pattern = r'(?:\+\d{1,3}[-.\s]?)?\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}'
-    
-    text = re.sub(email_pattern, '[EMAIL]', text)
-    text = re.sub(phone_pattern, '[PHONE]', text)
-    
-    return text
 
+@instrument("extract_pdf", template="T1")
+def iter_text_from_pdf(file, backend=None, workers=None):
+    """Yields (page_number, page_count, text) with PII removed, one page at a time."""
+    for number, total, text in pdf_extract.iter_pages(pdf_extract.read_bytes(file), backend, workers):
+        yield number, total, clean_pii(text)
 
-def extract_text_from_pdf(file):
+def extract_text_from_pdf(file, backend=None, workers=None):
     """Extracts text from an uploaded PDF file."""
-    text = ""
-    with pdfplumber.open(file) as pdf:
-        for page in pdf.pages:
-            page_text = page.extract_text()
-            if page_text:
-                text += page_text + "\n"
-    return clean_pii(text)
+    return "\n".join(text for _, _, text in iter_text_from_pdf(file, backend, workers) if text) + "\n"
 
+@instrument("extract_docx", template="T1")
 def extract_text_from_docx(file):
     """Extracts text from an uploaded DOCX file."""
-    doc = docx.Document(file)
-    raw_text = "\n".join([para.text for para in doc.paragraphs])
-    return clean_pii(raw_text)
+    # Streams the XML so table cells, text boxes and headers are kept, not just body paragraphs.
+    return clean_pii(docx_extract.extract_text(file))
 
 
 
+@instrument("prompt", template="T1")
 def prompt(resume_text):
     """Creates the prompt for the API based on the template."""
     template_instruction = """
@@ -89,35 +82,76 @@ Responsibilities:
 Repeat the ---JOB START--- to ---JOB END--- block for each job/project. If a section is empty, write "None".
 """
     return f"Resume Text:\n{resume_text}\n\n{template_instruction}"
-def call_portkey_api(prompt, portkey_api_key, portkey_base_url):
+def call_portkey_api(prompt, portkey_api_key, portkey_base_url, cache=None, refresh=False, client=None):
     """
     Calls the Portkey API with the provided prompt and credentials.
+    Pass a ResponseCache to reuse earlier responses; refresh=True forces regeneration.
 """
     try:
-        portkey = Portkey(
-            base_url = portkey_base_url,
-            api_key = portkey_api_key
-            )
-        
-        
-        response = portkey.chat.completions.create(
-            
-            model = "@aws-bedrock-use2/us.anthropic.claude-sonnet-4-20250514-v1:0", 
-            messages = [
-                {"role": "user", "content": prompt}
-            ],
+        return complete(prompt, portkey_api_key, portkey_base_url,
+                        client=client, cache=cache, refresh=refresh)
 
-)
-        
-        return response.choices[0].message.content
+    except Exception as e:
+
+        st.error(f"Portkey API Error: {str(e)}. Check your Portkey credentials and base_url in Streamlit Secrets.")
+        return None
+
+def stream_portkey_api(prompt, portkey_api_key, portkey_base_url, cache=None, refresh=False, client=None):
+    """
+    Streams the Portkey response as text chunks. Joined together they match call_portkey_api.
+    Errors propagate so the caller can discard a partial response.
+"""
+    return stream_complete(prompt, portkey_api_key, portkey_base_url,
+                           client=client, cache=cache, refresh=refresh)
+
+async def acall_portkey_api(prompt, portkey_api_key, portkey_base_url, cache=None, refresh=False, client=None):
+    """
+    asyncio variant of call_portkey_api for batch jobs and concurrent callers.
+"""
+    try:
+        return await acomplete(prompt, portkey_api_key, portkey_base_url,
+                               client=client, cache=cache, refresh=refresh)
 
     except Exception as e:
 
         st.error(f"Portkey API Error: {str(e)}. Check your Portkey credentials and base_url in Streamlit Secrets.")
         return None
 
+def resume_data_from_schema(resume):
+    """Maps a validated resume_schema.Resume onto the dictionary convert_to_docx renders."""
+    resume_data = {
+        "Professional Summary": resume.summary,
+        "Roles": "\n".join(resume.roles),
+        "Technologies": "\n".join(f"{category}: {skills}" for category, skills in resume.technologies)
+                        or (f"Key Technologies: {', '.join(resume.key_technologies)}" if resume.key_technologies else ""),
+        "Education": resume.education,
+        "Certifications": "\n".join(resume.certifications),
+        "Geographic locale": resume.geographic_locale,
+        "Jobs": [],
+    }
+    if resume.full_name:
+        resume_data["FullName"] = resume.full_name
+    for job in resume.jobs:
+        resume_data["Jobs"].append({
+            "CompanyName": job.company_name or "Project",
+            "Role": job.role,
+            "Duration": job.duration,
+            "Client": job.client or "N/A",
+            "Description": job.description,
+            "Responsibilities": list(job.responsibilities),
+        })
+    return resume_data
+
+@instrument("parse", template="T1")
 def parse_portkey_text(text):
-    """Parses the tagged text from AI into a structured dictionary."""
+    """Parses the AI output into a structured dictionary. Structured JSON output is used
+    when present; the tagged-text scanner below is the fallback."""
+    if looks_like_json(text):
+        try:
+            return resume_data_from_schema(parse_json(text))
+        except ResumeValidationError:
+            pass
+
     resume_data = {"Jobs": []}
     lines = text.split('\n')
     current_key = None
@@ -171,29 +205,18 @@ def parse_portkey_text(text):
                  
     return resume_data
 
-def set_table_no_border(table):
-    """Helper function to remove all borders from a table."""
-    for row in table.rows:
-        for cell in row.cells:
-            tcPr = cell._tc.get_or_add_tcPr()
-            tcBorders = OxmlElement('w:tcBorders')
-            for border_name in ['top', 'left', 'bottom', 'right', 'insideH', 'insideV']:
-                border = OxmlElement(f'w:{border_name}')
-                border.set(qn('w:val'), 'nil')
-                tcBorders.append(border)
-            tcPr.append(tcBorders)
-
-def add_heading(doc, text, level=1):
-    """Helper to add a styled heading."""
+def add_heading(doc, text, level=1, style_ids=None):
+    """Helper to add a styled heading. style_ids (CompiledTemplate.style_ids) skips the style-name lookup."""
     if not text or text.strip().lower() == 'none':
         return
     style = f'Heading {level}' if level > 0 else 'Title'
-    p = doc.add_paragraph(text, style=style)
+    text = text.upper() if level == 1 else text
+    # Colour and font come from the heading styles set up in setup_styles().
+    if style_ids is None:
+        p = doc.add_paragraph(text, style=style)
+    else:
+        p = add_paragraph(doc, text, style_ids[style])
     p.alignment = WD_ALIGN_PARAGRAPH.LEFT 
-    p.runs[0].font.color.rgb = M_RED
-    p.runs[0].font.name = 'Calibri'
-    if level == 1:
-        p.runs[0].text = text.upper()
 
 def add_content_para(doc, text):
     """Helper to add styled content as a single justified paragraph."""
@@ -205,18 +228,17 @@ def add_content_para(doc, text):
 
 
 
-def convert_to_docx(text):
-    """
-    Parses the AI-formatted text and builds the DOCX document.
-    """
-    doc = Document()
-    
-    style = doc.styles['Normal']
-    style.font.name = 'Calibri'
-    style.font.size = Pt(11)
+def setup_styles(doc):
+    """Registers the styles convert_to_docx uses, once per process on the compiled template."""
+    set_font(doc.styles['Normal'].font, name='Calibri', size=Pt(11))
+    for heading in ('Title', 'Heading 1', 'Heading 2'):
+        set_font(doc.styles[heading].font, name='Calibri', color=M_RED)
+    add_character_style(doc, 'Candidate Name', name='Calibri', size=Pt(12), bold=True, color=M_RED)
+    add_character_style(doc, 'Section Label', name='Calibri', bold=True, color=M_RED)
 
-    resume_data = parse_portkey_text(text)
-    
+
+def setup_header(doc):
+    """Builds the logo header once per process; each render only fills in the candidate name."""
     header = doc.sections[0].header
     header.is_linked_to_previous = False
     header.paragraphs[0].text = "" 
@@ -224,26 +246,40 @@ def convert_to_docx(text):
     table_header = header.add_table(rows=1, cols=2, width=Inches(6.5))
     set_table_no_border(table_header)
 
-    cell_left = table_header.cell(0, 0)
+    cell_left, cell_right = table_rows(table_header)[0]
     cell_left.width = Inches(1.5)
     p_left = cell_left.paragraphs[0]
     try:
         r_left = p_left.add_run()
-        r_left.add_picture('ui/logo.png', width=Inches(1.5))
+        r_left.add_picture(BytesIO(asset_bytes(LOGO_PATH)), width=Inches(1.5))
     except Exception:
         p_left.text = "[logo.png not found]"
     p_left.alignment = WD_ALIGN_PARAGRAPH.LEFT
     
-    cell_right = table_header.cell(0, 1)
     cell_right.width = Inches(5.0)
-    p_right = cell_right.paragraphs[0]
-    run_name = p_right.add_run(resume_data.get("FullName", "Candidate Name"))
-    run_name.font.color.rgb = M_RED
-    run_name.font.name = 'Calibri'
-    run_name.bold = True
-    run_name.font.size = Pt(12)
-    p_right.alignment = WD_ALIGN_PARAGRAPH.RIGHT
-    add_heading(doc, "PROFESSIONAL OVERVIEW", level=1)
+    cell_right.paragraphs[0].alignment = WD_ALIGN_PARAGRAPH.RIGHT
+
+
+def setup_template(doc):
+    setup_styles(doc)
+    setup_header(doc)
+
+
+@instrument("convert_to_docx", template="T1")
+def convert_to_docx(text):
+    """
+    Parses the AI-formatted text and builds the DOCX document.
+    """
+    # The logo image part is embedded once in the compiled template and shared by every copy.
+    template = compiled_template(("T1", asset_version(LOGO_PATH)), setup=setup_template)
+    doc = template.new_document()
+    style = template.style_ids
+
+    resume_data = parse_portkey_text(text)
+    
+    p_right = table_rows(doc.sections[0].header.tables[0])[0][1].paragraphs[0]
+    add_run(p_right, resume_data.get("FullName", "Candidate Name"), style['Candidate Name'])
+    add_heading(doc, "PROFESSIONAL OVERVIEW", level=1, style_ids=style)
     
     add_content_para(doc, resume_data.get("Professional Summary"))
     doc.add_paragraph() 
@@ -255,11 +291,7 @@ def convert_to_docx(text):
         if content_text.lower() == 'none' or not content_text.strip():
             continue 
 
-        p_heading = doc.add_paragraph()
-        run_heading = p_heading.add_run(heading + ":")
-        run_heading.font.name = 'Calibri'
-        run_heading.bold = True
-        run_heading.font.color.rgb = M_RED
+        add_run(doc.add_paragraph(), heading + ":", style['Section Label'])
 
         if heading == "Roles" and content_text:
             lines = content_text.strip().split('\n')
@@ -268,7 +300,7 @@ def convert_to_docx(text):
                 roles.extend([r.strip() for r in line.split(',') if r.strip()])
             
             for role in roles:
-                doc.add_paragraph(role, style='List Bullet')
+                add_paragraph(doc, role, style['List Bullet'])
 
         elif heading == "Technologies" and content_text:
             tech_table = doc.add_table(rows=1, cols=2)
@@ -299,7 +331,7 @@ def convert_to_docx(text):
             lines = content_text.strip().split('\n')
             for line in lines:
                 if line.strip():
-                    doc.add_paragraph(line.lstrip('- '), style='List Bullet')
+                    add_paragraph(doc, line.lstrip('- '), style['List Bullet'])
 
         #
         else:
@@ -312,11 +344,11 @@ def convert_to_docx(text):
 
     # --- Professional and Experience Summary Section ---
     doc.add_page_break()
-    add_heading(doc, "Professional and Experience Summary", level=1)
+    add_heading(doc, "Professional and Experience Summary", level=1, style_ids=style)
 
     # --- Job/Project Blocks ---
     for i, job_data in enumerate(resume_data.get("Jobs", [])):
-        add_heading(doc, f"Project {i+1}", level=2)
+        add_heading(doc, f"Project {i+1}", level=2, style_ids=style)
 
         if job_data.get("Client"):
             p = doc.add_paragraph()
@@ -341,18 +373,17 @@ def convert_to_docx(text):
         responsibilities = job_data.get('Responsibilities', [])
         if responsibilities:
             p = doc.add_paragraph() 
-            resp_run = p.add_run("Roles and Responsibilities:")
-            resp_run.font.name = 'Calibri'
-            resp_run.bold = True
+            p.add_run("Roles and Responsibilities:").bold = True
             
             for resp in responsibilities:
                 if resp.strip():
-                    doc.add_paragraph(resp.lstrip('- '), style='List Bullet')
+                    add_paragraph(doc, resp.lstrip('- '), style['List Bullet'])
         
         doc.add_paragraph()
     candidate_name = resume_data.get("FullName", "Candidate_Resume")
     
     buffer = BytesIO()
-    doc.save(buffer)
+    with timed("docx_save", template="T1"):
+        doc.save(buffer)
     buffer.seek(0)
     return buffer, candidate_name
\ No newline at end of file
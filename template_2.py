@@ -1,43 +1,41 @@
-import pdfplumber
-import docx
+import docx_extract
+import pdf_extract
+from pii import clean_pii
 from io import BytesIO
-from docx import Document
 from docx.shared import RGBColor, Inches, Pt
-from docx.enum.text import WD_ALIGN_PARAGRAPH, WD_TAB_ALIGNMENT
+from docx.enum.text import WD_ALIGN_PARAGRAPH
 from docx.enum.table import WD_ALIGN_VERTICAL
-from docx.oxml.ns import qn
-from docx.oxml import OxmlElement
 import os
-from portkey_ai import Portkey
+from assets import asset_bytes
+from cache import asset_version
+from docx_render import (add_character_style, add_paragraph, add_paragraph_style, add_run, compiled_template,
+                         set_font, set_paragraph_style, set_table_no_border, table_rows)
+from llm import acomplete, complete, stream_complete
+from metrics import instrument, timed
+from resume_schema import TEMPLATE_2_TAG, ResumeValidationError, looks_like_json, parse_json
 import streamlit as st
-import re
-def clean_pii(text):
-    """Removes email addresses and phone numbers using regex."""
-
-    email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-    
-    phone_pattern = r'(?:\+\d{1,3}[-.\s]?)?\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}'
-    
-    text = re.sub(email_pattern, '[EMAIL]', text)
-    text = re.sub(phone_pattern, '[PHONE]', text)
-    
-    return text
-
-def extract_text_from_pdf(file):
-    text = ""
-    with pdfplumber.open(file) as pdf:
-        for page in pdf.pages:
-            page_text = page.extract_text()
-            if page_text: text += page_text + "\n"
-    return clean_pii(text)
 
+
+M_RED = RGBColor(204, 31, 32)
+TEMPLATE_PATH = 'template_doc.docx'
+
+
+@instrument("extract_pdf", template="T2")
+def iter_text_from_pdf(file, backend=None, workers=None):
+    for number, total, text in pdf_extract.iter_pages(pdf_extract.read_bytes(file), backend, workers):
+        yield number, total, clean_pii(text)
+
+def extract_text_from_pdf(file, backend=None, workers=None):
+    return "\n".join(text for _, _, text in iter_text_from_pdf(file, backend, workers) if text) + "\n"
+
+@instrument("extract_docx", template="T2")
 def extract_text_from_docx(file):
-    doc = docx.Document(file)
-    raw_text = "\n".join([para.text for para in doc.paragraphs])
-    return clean_pii(raw_text)
+    # Streams the XML so table cells, text boxes and headers are kept, not just body paragraphs.
+    return clean_pii(docx_extract.extract_text(file))
 
 
 
+@instrument("prompt", template="T2")
 def prompt(resume_text):
     template_instruction = """
 You are a resume data extractor. Your task is to extract information from the provided resume and curate it as clean, tagged, plain text. 
@@ -88,61 +86,93 @@ Repeat the ---JOB START--- to ---JOB END--- block for each job. If a section is
 """
     return f"Resume Text:\n{resume_text}\n\n{template_instruction}"
 
-def call_portkey_api(prompt, portkey_api_key, portkey_base_url):
+def call_portkey_api(prompt, portkey_api_key, portkey_base_url, cache=None, refresh=False, client=None):
     """
     Calls the Portkey API with the provided prompt and credentials.
+    Pass a ResponseCache to reuse earlier responses; refresh=True forces regeneration.
 """
     try:
-        portkey = Portkey(
-            base_url = portkey_base_url,
-            api_key = portkey_api_key
-            )
-        
-        
-        response = portkey.chat.completions.create(
-           
-            model = "@aws-bedrock-use2/us.anthropic.claude-sonnet-4-20250514-v1:0", 
-            messages = [
-                {"role": "user", "content": prompt}
-            ],
- 
-)
-        
-        return response.choices[0].message.content
+        return complete(prompt, portkey_api_key, portkey_base_url,
+                        client=client, cache=cache, refresh=refresh)
 
     except Exception as e:
 
         st.error(f"Portkey API Error: {str(e)}. Check your Portkey credentials and base_url in Streamlit Secrets.")
         return None
 
+def stream_portkey_api(prompt, portkey_api_key, portkey_base_url, cache=None, refresh=False, client=None):
+    """
+    Streams the Portkey response as text chunks. Joined together they match call_portkey_api.
+    Errors propagate so the caller can discard a partial response.
+"""
+    return stream_complete(prompt, portkey_api_key, portkey_base_url,
+                           client=client, cache=cache, refresh=refresh)
 
-def set_table_no_border(table):
-    for row in table.rows:
-        for cell in row.cells:
-            tcPr = cell._tc.get_or_add_tcPr()
-            tcBorders = OxmlElement('w:tcBorders')
-            for border_name in ['top', 'left', 'bottom', 'right', 'insideH', 'insideV']:
-                border = OxmlElement(f'w:{border_name}'); border.set(qn('w:val'), 'nil'); tcBorders.append(border)
-            tcPr.append(tcBorders)
-
-def populate_table_cell(cell, heading, content):
-    p_heading = cell.paragraphs[0]; run_heading = p_heading.add_run(heading)
-    run_heading.font.name = 'Lato'; run_heading.bold = True; run_heading.font.size = Pt(10)
-    p_content = cell.add_paragraph(content)
-    p_content.style.font.name = 'Lato'; p_content.style.font.size = Pt(9)
-
-def convert_to_docx(text):
-    
+async def acall_portkey_api(prompt, portkey_api_key, portkey_base_url, cache=None, refresh=False, client=None):
+    """
+    asyncio variant of call_portkey_api for batch jobs and concurrent callers.
+"""
     try:
-        doc = Document('template_doc.docx')
+        return await acomplete(prompt, portkey_api_key, portkey_base_url,
+                               client=client, cache=cache, refresh=refresh)
+
     except Exception as e:
-        print(f"Error: Could not find or open 'template_doc.docx'. Make sure it's in the same folder.")
-        print(f"Details: {e}")
-        print("Creating a blank document as a fallback.")
-        doc = Document()
 
-    style = doc.styles['Normal']; font = style.font
-    font.name = 'Lato'; font.size = Pt(11)
+        st.error(f"Portkey API Error: {str(e)}. Check your Portkey credentials and base_url in Streamlit Secrets.")
+        return None
+
+
+def populate_table_cell(cell, heading, content, style_ids):
+    add_run(cell.paragraphs[0], heading, style_ids['Cell Heading'])
+    cell.add_paragraph(content)
+
+def resume_data_from_schema(resume):
+    """Maps a validated resume_schema.Resume onto the dictionary convert_to_docx renders."""
+    def cell(value):
+        return value.replace("|", "/").replace("\n", " ").strip()
+
+    key_technologies = resume.key_technologies or [category for category, _ in resume.technologies]
+    overview_rows = [("Roles", resume.roles), ("Solutions", resume.solutions),
+                     ("Industries", resume.industries), ("Technologies", key_technologies)]
+    engagement_rows = ["Client | Role | Description"]
+    for job in resume.jobs:
+        client = job.client if job.client and job.client.upper() != "N/A" else job.company_name
+        engagement_rows.append(f"{cell(client)} | {cell(job.role)} | {cell(job.description)}")
+
+    resume_data = {
+        "ProfessionalOverviewSummary": resume.summary,
+        "ProfessionalOverviewTable": "\n".join(f"{heading} | {cell(', '.join(items))}" for heading, items in overview_rows),
+        "KeyEngagementsTable": "\n".join(engagement_rows),
+        "Education": resume.education or "None",
+        "Publications": resume.publications or "None",
+        "ProfessionalTrainingCertifications": "\n".join(resume.certifications) or "None",
+        "GeographicLocale": resume.geographic_locale or "None",
+        "Jobs": [],
+    }
+    if resume.full_name:
+        resume_data["FullName"] = resume.full_name
+    designation = resume.designation or (resume.jobs[0].role if resume.jobs else "")
+    if designation:
+        resume_data["Designation"] = designation
+    for job in resume.jobs:
+        resume_data["Jobs"].append({
+            "CompanyName": job.company_name,
+            "Role": job.role,
+            "Duration": job.duration,
+            "Client": job.client or "N/A",
+            "Responsibilities": list(job.responsibilities),
+        })
+    return resume_data
+
+@instrument("parse", template="T2")
+def parse_portkey_text(text):
+    """Parses the AI output into a structured dictionary. Structured JSON output is used
+    when present; the tagged-text scanner below is the fallback."""
+    if looks_like_json(text):
+        try:
+            return resume_data_from_schema(parse_json(text))
+        except ResumeValidationError:
+            pass
 
     resume_data = {}
     lines = text.split('\n'); current_key = None
@@ -160,10 +190,10 @@ def convert_to_docx(text):
             current_key = None
             continue
 
-        # Handle lines with colons
-        if ":" in line and not stripped_line.startswith('-'):
-            key, value = line.split(":", 1)
-            key = key.strip()
+        # Handle "Key: value" tag lines; other colons are content
+        tag = TEMPLATE_2_TAG.match(line)
+        if tag and not stripped_line.startswith('-'):
+            key, value = tag.group(1).strip(), line[tag.end():]
 
             if key in ["ProfessionalOverviewSummary", "Education", "Publications", "ProfessionalTrainingCertifications", "GeographicLocale", "ProfessionalOverviewTable", "KeyEngagementsTable"]:
                 current_key = key
@@ -187,27 +217,57 @@ def convert_to_docx(text):
                 resume_data["Jobs"][-1][current_key].append(stripped_line)
             elif current_key in resume_data:
                 resume_data[current_key] += line + "\n"
+    return resume_data
+
+def setup_styles(doc):
+    """Registers the styles convert_to_docx uses, once per process on the compiled template."""
+    # Body text is 9 pt Lato: populate_table_cell used to set this on Normal during every render.
+    set_font(doc.styles['Normal'].font, name='Lato', size=Pt(9))
+    set_font(doc.styles['Heading 2'].font, color=M_RED)
+    add_character_style(doc, 'Candidate Name', name='Lato', size=Pt(18), bold=True, color=M_RED)
+    add_character_style(doc, 'Designation', name='Lato', size=Pt(12), bold=False, color=RGBColor(0, 0, 0))
+    add_character_style(doc, 'Cell Heading', name='Lato', size=Pt(10), bold=True)
+    add_character_style(doc, 'Overview Heading', name='Lato', bold=True)
+    add_character_style(doc, 'Bullet Mark', name='Lato', color=M_RED)
+    add_character_style(doc, 'Company Name', name='Lato Black', size=Pt(12), bold=True, color=M_RED)
+    add_character_style(doc, 'Label', name='Lato', bold=True)
+    add_character_style(doc, 'Responsibilities Heading', name='Lato', size=Pt(11), bold=True, underline=True)
+    add_paragraph_style(doc, 'Overview Cell', space_before=Pt(0), space_after=Pt(0))
+    add_paragraph_style(doc, 'Overview Bullet', base='Overview Cell', left_indent=Inches(0.25),
+                        first_line_indent=Inches(-0.25))
+    add_paragraph_style(doc, 'Job Header', right_tab=Inches(6.5))
+
+
+def load_template():
+    """The company template with the renderer's styles, parsed once per process and template version."""
+    try:
+        return compiled_template(("T2", asset_version(TEMPLATE_PATH)), BytesIO(asset_bytes(TEMPLATE_PATH)), setup_styles)
+    except Exception as e:
+        print(f"Error: Could not find or open '{TEMPLATE_PATH}'. Make sure it's in the same folder.")
+        print(f"Details: {e}")
+        print("Creating a blank document as a fallback.")
+        return compiled_template("T2 blank", None, setup_styles)
+
 
+@instrument("convert_to_docx", template="T2")
+def convert_to_docx(text):
+    template = load_template()
+    doc = template.new_document()
+    style = template.style_ids
+
+    resume_data = parse_portkey_text(text)
 
     p_name = doc.add_paragraph()
     p_name.alignment = WD_ALIGN_PARAGRAPH.RIGHT
-    run_name = p_name.add_run(resume_data.get("FullName", "Candidates Name"))
-    run_name.font.color.rgb = RGBColor(204, 31, 32) # Red color
-    run_name.font.name = "Lato"
-    run_name.bold = True
-    run_name.font.size = Pt(18)
+    add_run(p_name, resume_data.get("FullName", "Candidates Name"), style['Candidate Name'])
 
     p_des = doc.add_paragraph()
     p_des.alignment = WD_ALIGN_PARAGRAPH.RIGHT
-    run_des = p_des.add_run(resume_data.get("Designation", "Designation(Latest)"))
-    run_des.font.color.rgb = RGBColor(0, 0, 0) # Black color
-    run_des.font.name = "Lato"
-    run_des.bold = False
-    run_des.font.size = Pt(12)
+    add_run(p_des, resume_data.get("Designation", "Designation(Latest)"), style['Designation'])
 
     doc.add_paragraph()
 
-    doc.add_paragraph("Professional Overview:", style='Heading 2').runs[0].font.color.rgb = RGBColor(204, 31, 32)
+    add_paragraph(doc, "Professional Overview:", style['Heading 2'])
     doc.add_paragraph(resume_data.get("ProfessionalOverviewSummary", "").strip())
 
 
@@ -227,53 +287,27 @@ def convert_to_docx(text):
             table.columns[0].width = Inches(1.5)
             table.columns[1].width = Inches(5.0)
 
-            for r, row_data in enumerate(table_data):
+            for row_data, (heading_cell, content_cell) in zip(table_data, table_rows(table)):
                 heading, content = row_data
 
                 # --- Populate heading cell (col 0) ---
-                heading_cell = table.cell(r, 0)
-                heading_cell.text = heading
-
                 heading_cell.vertical_alignment = WD_ALIGN_VERTICAL.TOP
                 p_heading = heading_cell.paragraphs[0]
-                p_heading.runs[0].font.bold = True
-                p_heading.runs[0].font.name = 'Lato'
-                p_heading.paragraph_format.space_before = Pt(0) # Remove gap
-                p_heading.paragraph_format.space_after = Pt(0)  # Remove gap
-
-                content_cell = table.cell(r, 1)
-                content_cell.text = ""
-
+                set_paragraph_style(p_heading, style['Overview Cell'])
+                add_run(p_heading, heading, style['Overview Heading'])
 
                 content_cell.vertical_alignment = WD_ALIGN_VERTICAL.TOP
-                # --- END MODIFICATION ---
-
 
                 items_list = [item.strip() for item in content.split(',') if item.strip()]
                 if not items_list:
                     items_list = [" "] # Add a space if content is empty
 
                 for i, item in enumerate(items_list):
+                    # Hanging indent and zero spacing come from the Overview Bullet style.
                     p_bullet = content_cell.paragraphs[0] if i == 0 else content_cell.add_paragraph()
-
-                    
-                    p_bullet.paragraph_format.space_before = Pt(0)
-                    p_bullet.paragraph_format.space_after = Pt(0)
-                    # --- END MODIFICATION ---
-
-                    run_bullet = p_bullet.add_run('•') # Red bullet
-                    run_bullet.font.color.rgb = RGBColor(204, 31, 32)
-                    run_bullet.font.name = 'Lato'
-
-                    p_bullet.add_run('\t')
-
-                    run_text = p_bullet.add_run(item)
-                    run_text.font.name = 'Lato'
-                    run_text.font.size = Pt(9)
-
-                    # Hanging indent format
-                    p_bullet.paragraph_format.left_indent = Inches(0.25)
-                    p_bullet.paragraph_format.first_line_indent = Inches(-0.25)
+                    set_paragraph_style(p_bullet, style['Overview Bullet'])
+                    add_run(p_bullet, '•', style['Bullet Mark']) # Red bullet
+                    p_bullet.add_run('\t' + item)
 
     doc.add_paragraph()
 
@@ -290,24 +324,24 @@ def convert_to_docx(text):
             if num_cols > 0:
                 table = doc.add_table(rows=len(table_data), cols=num_cols)
                 table.style = 'Table Grid'
-                for r, row_data in enumerate(table_data):
-                    for c, cell_data in enumerate(row_data[:num_cols]):
-                        table.cell(r, c).text = cell_data
+                for row_data, row_cells in zip(table_data, table_rows(table)):
+                    for cell, cell_data in zip(row_cells, row_data):
+                        cell.text = cell_data
 
     doc.add_paragraph()
 
     table_2x2 = doc.add_table(rows=2, cols=2); set_table_no_border(table_2x2)
-    populate_table_cell(table_2x2.cell(0, 0), "Education", resume_data.get("Education", "None").strip())
-    populate_table_cell(table_2x2.cell(0, 1), "Professional Training/Certifications", resume_data.get("ProfessionalTrainingCertifications", "None").strip())
-    populate_table_cell(table_2x2.cell(1, 0), "Publications", resume_data.get("Publications", "None").strip())
-    populate_table_cell(table_2x2.cell(1, 1), "Geographic locale", resume_data.get("GeographicLocale", "None").strip())
+    (education_cell, training_cell), (publications_cell, locale_cell) = table_rows(table_2x2)
+    populate_table_cell(education_cell, "Education", resume_data.get("Education", "None").strip(), style)
+    populate_table_cell(training_cell, "Professional Training/Certifications", resume_data.get("ProfessionalTrainingCertifications", "None").strip(), style)
+    populate_table_cell(publications_cell, "Publications", resume_data.get("Publications", "None").strip(), style)
+    populate_table_cell(locale_cell, "Geographic locale", resume_data.get("GeographicLocale", "None").strip(), style)
     doc.add_paragraph()
 
     doc.add_page_break()
 
-    p_exp_heading = doc.add_paragraph("Professional and Business Experience", style='Heading 2')
+    p_exp_heading = add_paragraph(doc, "Professional and Business Experience", style['Heading 2'])
     p_exp_heading.alignment = WD_ALIGN_PARAGRAPH.RIGHT
-    p_exp_heading.runs[0].font.color.rgb = RGBColor(204, 31, 32)
 
     last_company = None
     project_counter = 0
@@ -323,54 +357,34 @@ def convert_to_docx(text):
             display_company_name = current_company
             last_company = current_company
 
-        # Company Name/Project Number and Duration
-        p = doc.add_paragraph()
-        company_run = p.add_run(display_company_name)
-        company_run.font.color.rgb = RGBColor(204, 31, 32)
-        company_run.font.name = 'Lato Black'
-        company_run.bold = True
-        company_run.font.size = Pt(12)
-        p.add_run('\t')
-        duration_run = p.add_run(job_data.get("Duration", ""))
-        duration_run.font.name = 'Lato'
-        p.paragraph_format.tab_stops.add_tab_stop(Inches(6.5), WD_TAB_ALIGNMENT.RIGHT)
+        # Company Name/Project Number and Duration (right tab stop from the Job Header style)
+        p = add_paragraph(doc, style_id=style['Job Header'])
+        add_run(p, display_company_name, style['Company Name'])
+        p.add_run('\t' + job_data.get("Duration", ""))
 
         # Role
-        p = doc.add_paragraph()
-        role_run = p.add_run(job_data.get("Role", ""))
-        role_run.font.name = 'Lato'
-        role_run.bold = True
+        add_run(doc.add_paragraph(), job_data.get("Role", ""), style['Label'])
         doc.add_paragraph()
 
         # Client
         p = doc.add_paragraph()
-        client_label_run = p.add_run("CLIENT: ")
-        client_label_run.font.name = 'Lato'
-        client_label_run.bold = True
-        client_text_run = p.add_run(job_data.get("Client", "N/A"))
-        client_text_run.font.name = 'Lato'
+        add_run(p, "CLIENT: ", style['Label'])
+        p.add_run(job_data.get("Client", "N/A"))
         doc.add_paragraph()
 
         # Responsibilities Heading
-        p = doc.add_paragraph()
-        resp_run = p.add_run("Responsibilities:")
-        resp_run.bold=True
-        resp_run.font.name = 'Lato'
-        resp_run.underline = True
-        resp_run.font.size = Pt(11)
+        add_run(doc.add_paragraph(), "Responsibilities:", style['Responsibilities Heading'])
 
         # Responsibility Bullets
         for resp in job_data.get('Responsibilities', []):
-            text = resp.lstrip('- ')
-            p = doc.add_paragraph(style='List Bullet')
-            run = p.add_run(text)
-            run.font.name = 'Lato'
+            add_paragraph(doc, resp.lstrip('- '), style['List Bullet'])
         doc.add_paragraph()
     # --- END NEW LOGIC ---
 
     candidate_name = resume_data.get("FullName", "Candidate_Resume")
 
     buffer = BytesIO()
-    doc.save(buffer)
+    with timed("docx_save", template="T2"):
+        doc.save(buffer)
     buffer.seek(0)
     return buffer, candidate_name
\ No newline at end of file
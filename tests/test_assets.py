@@ -0,0 +1,16 @@
+"""Asset caching keeps one version of each file."""
+import os
+
+import assets
+import resources
+
+
+def test_asset_bytes_keeps_only_the_current_version(tmp_path):
+    path = str(tmp_path / "logo.png")
+    for version in range(1, 4):
+        with open(path, "wb") as f:
+            f.write(b"x" * version)
+        os.utime(path, ns=(version * 10**9, version * 10**9))
+        assert assets.asset_bytes(path) == b"x" * version
+    assert [key for key in resources.loaded() if key[:2] == ("asset", path)] == [
+        ("asset", path, assets.asset_version(path))]
@@ -0,0 +1,112 @@
+"""LLM calls against the offline fake_portkey clients: caching, retries, streaming and asyncio."""
+import asyncio
+import threading
+
+import pytest
+
+import llm
+from fake_portkey import SAMPLE_TEMPLATE_1, FakeAsyncPortkey, FakePortkey
+from response_cache import ResponseCache
+
+
+class GatewayError(Exception):
+    def __init__(self, status_code):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+
+
+def failing_then(reply, failures, status_code=503):
+    """A reply function that raises failures times before answering with reply."""
+    calls = {"n": 0}
+
+    def answer(prompt):
+        calls["n"] += 1
+        if calls["n"] <= failures:
+            raise GatewayError(status_code)
+        return reply
+
+    return answer
+
+
+def test_complete_returns_reply_and_records_request():
+    client = FakePortkey()
+    assert llm.complete("Resume:\nJane", None, None, client=client, hedge=False) == SAMPLE_TEMPLATE_1
+    assert client.calls[0]["prompt"] == "Resume:\nJane"
+    assert client.calls[0]["timeout"] <= llm.REQUEST_TIMEOUT
+
+
+def test_complete_uses_and_fills_cache(tmp_path):
+    cache = ResponseCache(str(tmp_path / "responses.db"))
+    client = FakePortkey(reply=lambda prompt: "fresh")
+    assert llm.complete("p", None, None, client=client, cache=cache, hedge=False) == "fresh"
+    assert llm.complete("p", None, None, client=client, cache=cache, hedge=False) == "fresh"
+    assert len(client.calls) == 1
+    llm.complete("p", None, None, client=client, cache=cache, refresh=True, hedge=False)
+    assert len(client.calls) == 2
+
+
+def test_retryable_errors_are_retried(monkeypatch):
+    monkeypatch.setattr(llm, "retry_delay", lambda error, attempt: 0)
+    client = FakePortkey(reply=failing_then("ok", failures=2))
+    assert llm.complete("p", None, None, client=client, hedge=False) == "ok"
+    assert len(client.calls) == 3
+
+
+def test_client_errors_are_not_retried(monkeypatch):
+    monkeypatch.setattr(llm, "retry_delay", lambda error, attempt: 0)
+    client = FakePortkey(reply=failing_then("ok", failures=1, status_code=400))
+    with pytest.raises(GatewayError):
+        llm.complete("p", None, None, client=client, hedge=False)
+    assert len(client.calls) == 1
+
+
+def test_retries_stop_at_the_deadline():
+    with pytest.raises(llm.LLMDeadlineExceeded):
+        llm.call_with_retry(lambda end: (_ for _ in ()).throw(GatewayError(503)), retries=5, deadline=0.01,
+                            sleep=lambda seconds: None)
+
+
+def test_stream_complete_joins_to_complete(tmp_path):
+    cache = ResponseCache(str(tmp_path / "responses.db"))
+    client = FakePortkey(chunk_size=7)
+    chunks = list(llm.stream_complete("p", None, None, client=client, cache=cache))
+    assert len(chunks) > 1
+    assert "".join(chunks) == llm.complete("p", None, None, client=FakePortkey(), hedge=False)
+    assert cache.get(llm.MODEL, "p") == "".join(chunks)
+
+
+def test_acomplete_overlaps_requests():
+    client = FakeAsyncPortkey(reply=lambda prompt: prompt.upper(), latency=0.05)
+
+    async def run():
+        return await asyncio.gather(*(llm.acomplete(f"p{i}", None, None, client=client) for i in range(4)))
+
+    assert asyncio.run(run()) == ["P0", "P1", "P2", "P3"]
+    assert len(client.calls) == 4
+    assert all(call["timeout"] <= llm.REQUEST_TIMEOUT for call in client.calls)
+
+
+def test_acomplete_shares_the_process_wide_limit(monkeypatch):
+    monkeypatch.setattr(llm, "_in_flight", threading.BoundedSemaphore(1))
+    monkeypatch.setattr(llm, "DEADLINE", 0.1)
+    client = FakeAsyncPortkey()
+    # A threaded request holds the only slot, so the coroutine cannot send before the deadline.
+    llm._in_flight.acquire()
+    with pytest.raises(llm.LLMDeadlineExceeded):
+        asyncio.run(llm.acomplete("p", None, None, client=client))
+    assert not client.calls
+    llm._in_flight.release()
+    assert asyncio.run(llm.acomplete("p", None, None, client=client)) == SAMPLE_TEMPLATE_1
+    assert llm._in_flight.acquire(blocking=False)
+
+
+def test_async_clients_are_closed_with_their_loop(monkeypatch):
+    monkeypatch.setenv("TALENTTUNE_FAKE_LLM", "1")
+
+    async def run():
+        await llm.acomplete("p", None, None)
+        return await llm.get_async_client(None, None)
+
+    client = asyncio.run(run())
+    assert len(client.calls) == 1
+    assert client.closed
@@ -0,0 +1,38 @@
+"""Backend choice and parity of page extraction on the sample template PDFs."""
+import glob
+import os
+
+import pytest
+
+import pdf_extract
+
+SAMPLES = sorted(glob.glob(os.path.join(os.path.dirname(__file__), "..", "ui", "sample_template-*.pdf")))
+
+
+def read(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def test_auto_backend_is_pdfplumber(monkeypatch):
+    monkeypatch.setattr(pdf_extract, "BACKEND", "auto")
+    assert pdf_extract.choose_backend() == "pdfplumber"
+    assert pdf_extract.choose_backend("pdfium") in ("pdfium", "pdfplumber")
+    with pytest.raises(ValueError):
+        pdf_extract.choose_backend("ocr")
+
+
+@pytest.mark.parametrize("path", SAMPLES)
+def test_auto_matches_pdfplumber(monkeypatch, path):
+    monkeypatch.setattr(pdf_extract, "BACKEND", "auto")
+    data = read(path)
+    expected = [pdf_extract.normalize_page(text)
+                for text in pdf_extract._pdfplumber_pages(data, 0, pdf_extract.page_count(data))]
+    assert pdf_extract.extract_pages(data, workers=1) == expected
+
+
+@pytest.mark.parametrize("path", SAMPLES)
+def test_worker_pool_matches_sequential(monkeypatch, path):
+    monkeypatch.setattr(pdf_extract, "PARALLEL_MIN_PAGES", 1)
+    data = read(path)
+    assert pdf_extract.extract_pages(data, workers=2) == pdf_extract.extract_pages(data, workers=1)
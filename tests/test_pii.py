@@ -0,0 +1,44 @@
+"""PII scrubbing: contact details in the forms resume headers use are removed, as they were before pii.py."""
+import pytest
+
+import pii
+from benchmarks.bench_pii import original_clean_pii
+
+HEADER_FORMS = [
+    "Ph.9876543210",
+    "Mobile:-9876543210",
+    "Tel-9876543210",
+    "Phone: 987-654-3210",
+    "Cell:(987) 654-3210",
+    "Contact.+1-415-555-2671",
+    "Email:jane.doe@example.com",
+    "E-mail:-jane_doe@mail.co.in",
+    "jane.doe@example.com | +1 415 555 2671",
+    "Call 9876543210.",
+]
+
+
+@pytest.mark.parametrize("text", HEADER_FORMS)
+def test_matches_original_scrubbing(text):
+    assert pii.clean_pii(text) == original_clean_pii(text)
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("+44 20 7946 0958", "[PHONE]"),
+    ("98765 43210", "[PHONE]"),
+    ("linkedin.com/in/jane-doe", "[PROFILE_URL]"),
+    ("DOB: 12/05/1990", "[DOB]"),
+    ("221B Baker Street", "[ADDRESS]"),
+])
+def test_added_detectors(text, expected):
+    assert pii.clean_pii(text) == expected
+
+
+def test_digits_inside_words_are_kept():
+    assert pii.clean_pii("ID12345678901") == "ID12345678901"
+
+
+def test_scrub_counts_categories():
+    text, counts = pii.scrub("Ph.9876543210, jane@example.com, jane2@example.com")
+    assert text == "Ph.[PHONE], [EMAIL], [EMAIL]"
+    assert counts == {"phone": 1, "email": 2}
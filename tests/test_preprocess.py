@@ -0,0 +1,60 @@
+"""Compression and map-reduce condensing; the LLM is the offline fake_portkey client."""
+import preprocess
+from fake_portkey import FakePortkey
+
+
+class GatewayError(Exception):
+    def __init__(self, status_code):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+
+
+def job(company, year):
+    lines = [f"{company} Software Engineer Jan {year} - Dec {year}"]
+    lines += [f"- Built service {n} for {company} with Python and PostgreSQL" for n in range(12)]
+    return "\n".join(lines)
+
+
+def condense_except(company):
+    """A reply function that fails for the chunk mentioning company and condenses the rest."""
+    def answer(prompt):
+        if company in prompt:
+            raise GatewayError(400)
+        return "condensed"
+    return answer
+
+
+def test_compress_drops_layout_whitespace():
+    compressed, stats = preprocess.compress("Jane   Doe\n\n\n\nPython\t\tSQL\n")
+    assert compressed == "Jane Doe\n\nPython SQL"
+    assert stats["tokens_after"] < stats["tokens_before"]
+
+
+def test_map_reduce_falls_back_to_raw_chunk_on_error():
+    text = "\n".join(job(company, 2010 + i) for i, company in enumerate(["Acme", "Globex", "Initech"]))
+    chunks = preprocess.split_into_chunks(text, 150)
+    assert len(chunks) > 1
+    client = FakePortkey(reply=condense_except("Acme"))
+    condensed = preprocess.map_reduce_condense(text, None, None, max_chunk_tokens=150, client=client)
+    parts = condensed.split("\n\n")
+    assert len(parts) == len(chunks)
+    for chunk, part in zip(chunks, parts):
+        assert part == (chunk if "Acme" in chunk else "condensed")
+
+
+def test_prepare_resume_pages_falls_back_to_raw_chunk_on_error():
+    pages = [job(company, 2010 + i) for i, company in enumerate(["Acme", "Globex", "Initech", "Umbrella"])]
+    client = FakePortkey(reply=condense_except("Acme"))
+    text, stats = preprocess.prepare_resume_pages(pages, None, None, map_reduce_tokens=200,
+                                                  max_chunk_tokens=150, client=client)
+    assert stats["map_reduce"]
+    assert "condensed" in text
+    assert "Acme Software Engineer Jan 2010 - Dec 2010" in text
+
+
+def test_prepare_resume_pages_below_threshold_only_compresses():
+    pages = [job("Acme", 2010), job("Globex", 2011)]
+    client = FakePortkey(reply=condense_except("Acme"))
+    text, stats = preprocess.prepare_resume_pages(pages, None, None, map_reduce_tokens=10_000, client=client)
+    assert (text, stats) == preprocess.compress("\n".join(pages))
+    assert not client.calls
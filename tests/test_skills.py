@@ -0,0 +1,29 @@
+"""Splitting Technologies text into skills and resolving taxonomy aliases."""
+import pytest
+
+from skills import SkillNormalizer, split_skills
+
+
+@pytest.mark.parametrize("text, expected", [
+    (".NET, C#, PL/SQL, Agile/Scrum, .NET Core", [".NET", "C#", "PL/SQL", "Agile/Scrum", ".NET Core"]),
+    ("Languages: Python/Java, .NET C# / SQL, Node.js.", ["Python", "Java", ".NET C#", "SQL", "Node.js"]),
+    ("Technologies | AWS (S3, Glue), Oracle/MySQL", ["AWS", "S3", "Glue", "Oracle", "MySQL"]),
+    ("- Cloud: Azure; GCP\n• Tools: Git, Jenkins", ["Azure", "GCP", "Git", "Jenkins"]),
+])
+def test_split_skills(text, expected):
+    assert split_skills(text) == expected
+
+
+def test_slash_aliases_come_from_known_names():
+    assert split_skills("Tools: CI/CD", known=frozenset({"ci/cd"})) == ["CI/CD"]
+    assert split_skills("Tools: CI/CD", known=frozenset()) == ["CI", "CD"]
+
+
+def test_taxonomy_aliases_resolve_without_embeddings():
+    def encoder(texts):
+        raise AssertionError(f"exact aliases should not be embedded: {texts}")
+
+    normalizer = SkillNormalizer(embedder=None)
+    normalizer.embedder._encoder = encoder
+    skills = split_skills(".NET, C#, PL/SQL, Agile/Scrum, .NET Core, .NET C#")
+    assert [canonical for canonical, _ in normalizer.normalize(skills)] == [".NET", "C#", "SQL", "Agile", ".NET", "C#"]